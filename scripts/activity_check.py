@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Change detection through the user events feed
+Before a refresh, the generators poll /users/{username}/events with the ETag of
+their previous poll. A 304 costs no rate limit and means nothing happened; new
+events tell which days and repositories the refresh has to cover. The public
+feed misses private and some organization activity, so stored data is refetched
+in full once it reaches MAX_STATE_AGE.
+"""
+import os
+import time
+from datetime import datetime
+
+from github_api import API_URL
+from stats_cache import SnapshotError, StatsCache
+
+# Events that create or change code in a repository, and so its language bytes
+CODE_EVENTS = {"PushEvent", "CreateEvent", "PublicEvent", "PullRequestEvent"}
+# Seconds after a full refresh before the next one is forced; below a day so the
+# daily scheduled run always refetches while runs in between stay incremental
+MAX_STATE_AGE = 20 * 3600
+
+
+def load_state(path):
+    """Restore the persisted state cache, starting empty if it is missing or unusable"""
+    cache = StatsCache()
+    if os.path.exists(path):
+        try:
+            cache.restore(path)
+        except (OSError, SnapshotError) as e:
+            print(f"  ⚠ Discarding state file {path}: {e}")
+    return cache
+
+
+def check_activity(client, cache, username, consumer, max_age=MAX_STATE_AGE):
+    """Return what changed in the events feed since `consumer` last committed its position
+
+    The result has "changed", "days", "repos" and "pushed"; "complete" is False when the feed
+    cannot prove what changed (first run, more new events than one page holds, or stored
+    data older than max_age), in which case the caller must do a full refresh.
+    """
+    activity = _read_feed(client, cache, username, consumer)
+    now = time.time()
+    full_refresh_at = activity["state"].get("full_refresh_at")
+    if activity["complete"] and (full_refresh_at is None or now - full_refresh_at >= max_age):
+        print("Stored data is too old to trust the events feed alone, refetching it in full")
+        activity["complete"] = False
+    if not activity["complete"]:
+        # Committed with the feed position once the full refresh has succeeded
+        activity["state"] = dict(activity["state"], full_refresh_at=now)
+    return activity
+
+
+def _read_feed(client, cache, username, consumer):
+    state = cache.get_events_state(username, consumer) or {}
+    headers = {"If-None-Match": state["etag"]} if state.get("etag") else None
+    response = client.get(f"{API_URL}/users/{username}/events?per_page=100", headers=headers)
+    activity = {"changed": False, "complete": True, "days": set(), "repos": set(), "pushed": False, "state": state}
+    if response.status_code == 304:
+        return activity
+    response.raise_for_status()
+    events = response.json()
+    last_id = state.get("last_event_id")
+    activity["state"] = {
+        "etag": response.headers.get("ETag"),
+        # "0" marks a user without events, so the next poll can still prove nothing changed
+        "last_event_id": events[0]["id"] if events else (last_id or "0"),
+        "full_refresh_at": state.get("full_refresh_at")
+    }
+    if last_id is None:
+        activity.update(changed=True, complete=False)
+        return activity
+
+    reached_last = False
+    for event in events:
+        # Event IDs increase over time and the feed is newest first
+        if int(event["id"]) <= int(last_id):
+            reached_last = True
+            break
+        activity["changed"] = True
+        activity["days"].add(datetime.fromisoformat(event["created_at"].replace("Z", "+00:00")).date())
+        if event["type"] in CODE_EVENTS:
+            activity["repos"].add(event["repo"]["name"])
+        # Pushed commits count on their author date, which the feed does not carry
+        if event["type"] == "PushEvent":
+            activity["pushed"] = True
+    if not reached_last and len(events) >= 100:
+        activity["complete"] = False
+    return activity
+
+
+def commit_activity(cache, username, consumer, activity):
+    """Record the feed position once the refresh it triggered has succeeded"""
+    cache.put_events_state(username, consumer, activity["state"])
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Generate GitHub Stats SVGs for many users
+Reads usernames from a file or stdin and writes <output-dir>/<username>/ with both
+cards. Users are sharded across a process pool sharing one on-disk HTTP cache and
+one rate-limit budget; a failing user is reported without stopping the batch.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from github_api import DEFAULT_POINTS_PER_HOUR, USERNAME_PATTERN, GitHubClient, HttpCache, SharedRateBudget
+from stats_api import FileSink, StatsService
+
+# Per-process service (client, HTTP cache and output directory), created once by the pool initializer
+_service = None
+
+
+def _init_worker(headers, budget, cache_dir, output_dir, verbose):
+    global _service
+    _service = StatsService(GitHubClient(headers, budget, HttpCache(cache_dir)), sink=FileSink(output_dir, per_user=True))
+    if not verbose:
+        # Keep the generators' per-repository progress lines out of the batch report
+        sys.stdout = open(os.devnull, "w")
+
+
+def generate_user(username):
+    """Render both cards for one user, returning a small status summary"""
+    errors = []
+
+    try:
+        _service.streak_card(username)
+    except Exception as e:
+        errors.append(f"streak: {e}")
+
+    try:
+        _service.languages_card(username)
+    except Exception as e:
+        errors.append(f"languages: {e}")
+
+    return {"username": username, "errors": errors}
+
+
+def read_usernames(source):
+    """Yield usernames lazily, one per line, skipping blanks and # comments"""
+    stream = sys.stdin if source == "-" else open(source, encoding="utf-8")
+    try:
+        for line in stream:
+            username = line.split("#", 1)[0].strip()
+            if username:
+                yield username
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate stats cards for many GitHub users")
+    parser.add_argument("users", nargs="?", default="-", help="file with one username per line, or - for stdin")
+    parser.add_argument("--output-dir", default="stats", help="cards are written to <output-dir>/<username>/")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="worker processes")
+    parser.add_argument("--cache-dir", default=".http-cache", help="HTTP cache shared by all workers")
+    parser.add_argument("--rate-limit", type=int, default=DEFAULT_POINTS_PER_HOUR, help="API points per hour for the whole batch")
+    parser.add_argument("--verbose", action="store_true", help="show per-repository progress from workers")
+    args = parser.parse_args()
+
+    token = os.environ.get("GH_PAT") or os.environ.get("GITHUB_TOKEN")
+    if not token:
+        print("Error: No GitHub token found. Set GH_PAT or GITHUB_TOKEN environment variable.")
+        sys.exit(1)
+
+    headers = {
+        "Authorization": f"Bearer {token}",
+        "Accept": "application/vnd.github.v3+json"
+    }
+    budget = SharedRateBudget(args.rate_limit)
+    # Only a bounded window of users is in flight, so memory does not grow with the list
+    max_in_flight = args.workers * 2
+    started = time.monotonic()
+    done = 0
+    failed = []
+
+    with ProcessPoolExecutor(
+        max_workers=args.workers,
+        initializer=_init_worker,
+        initargs=(headers, budget, args.cache_dir, args.output_dir, args.verbose)
+    ) as pool:
+        pending = {}
+        usernames = read_usernames(args.users)
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < max_in_flight:
+                username = next(usernames, None)
+                if username is None:
+                    exhausted = True
+                    break
+                if not USERNAME_PATTERN.match(username):
+                    # Never let a malformed name escape the output directory
+                    done += 1
+                    failed.append(username)
+                    print(f"  ✗ [{done}] {username}: invalid GitHub username")
+                    continue
+                pending[pool.submit(generate_user, username)] = username
+            if not pending:
+                break
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                username = pending.pop(future)
+                done += 1
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # The worker process itself failed, e.g. it was killed
+                    result = {"username": username, "errors": [f"worker: {e}"]}
+                if result["errors"]:
+                    failed.append(result["username"])
+                    print(f"  ✗ [{done}] {result['username']}: {'; '.join(result['errors'])}")
+                else:
+                    print(f"  ✓ [{done}] {result['username']}")
+
+    elapsed = time.monotonic() - started
+    print(f"\n=== Summary ===")
+    print(f"Users processed: {done} in {elapsed:.1f}s ({len(failed)} failed)")
+    if failed:
+        print(f"Failed: {', '.join(failed)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
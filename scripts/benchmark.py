@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark of both generators
+Runs generate_streak_stats.py and generate_languages_stats.py against a local
+GitHub API stand-in for synthetic accounts of different sizes, with a fixed
+latency per request, and reports wall time, API requests, peak memory and output
+size per scenario. Pass --set to compare fetch strategies under the same load.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from fake_github_api import FakeGitHub, start_fake_api
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+GENERATORS = {
+    "streak": ("generate_streak_stats.py", "streak-stats.svg"),
+    "languages": ("generate_languages_stats.py", "languages-stats.svg"),
+}
+
+# Synthetic accounts: owned repositories and years of contribution history
+SCENARIOS = {
+    "small": {"repos": 5, "years": 1},
+    "typical": {"repos": 40, "years": 5},
+    "1000-repo": {"repos": 1000, "years": 5},
+    "15-year-heavy": {"repos": 30, "years": 15},
+}
+
+
+def run_generator(script, workdir, env):
+    """Run one generator to completion; returns (exit code, seconds, peak RSS in KiB)"""
+    with open(os.path.join(workdir, f"{script}.log"), "w") as log:
+        started = time.perf_counter()
+        process = subprocess.Popen([sys.executable, os.path.join(SCRIPTS_DIR, script)], cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT)
+        # wait4 reports the resource usage of this child alone
+        _, status, usage = os.wait4(process.pid, 0)
+        elapsed = time.perf_counter() - started
+    process.returncode = os.waitstatus_to_exitcode(status)
+    # ru_maxrss is KiB on Linux
+    return process.returncode, elapsed, usage.ru_maxrss
+
+
+def run_scenario(name, latency, runs, overrides):
+    profile = SCENARIOS[name]
+    fake = FakeGitHub(repos_per_user=profile["repos"], years=profile["years"], latency=latency)
+    server, api_url = start_fake_api(fake)
+    env = dict(os.environ, GITHUB_API_URL=api_url, GITHUB_TOKEN="benchmark", GITHUB_USERNAME=f"bench-{name}")
+    env.pop("GH_PAT", None)
+    # Runs start without state or planner statistics unless --set asks for them
+    for key in ("STATE_FILE", "ADDITIONAL_REPOS", "GITHUB_ORG", "LOCAL_REPOS", "CALENDAR_SOURCE"):
+        env.pop(key, None)
+    env["PLANNER_STATS"] = ""
+    env.update(overrides)
+    results = []
+    try:
+        for generator, (script, output) in GENERATORS.items():
+            for run in range(runs):
+                workdir = tempfile.mkdtemp(prefix=f"benchmark-{name}-{generator}-")
+                calls_before = fake.calls
+                exit_code, elapsed, peak_rss_kb = run_generator(script, workdir, env)
+                output_path = os.path.join(workdir, output)
+                results.append({
+                    "scenario": name,
+                    "generator": generator,
+                    "run": run + 1,
+                    "exit_code": exit_code,
+                    "wall_seconds": elapsed,
+                    "requests": fake.calls - calls_before,
+                    "peak_rss_kb": peak_rss_kb,
+                    "output_bytes": os.path.getsize(output_path) if os.path.exists(output_path) else None,
+                    "workdir": workdir,
+                })
+    finally:
+        server.shutdown()
+        server.server_close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark both generators end to end against a local GitHub API stand-in")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="scenario to run (repeatable, default all)")
+    parser.add_argument("--latency", type=float, default=50, help="milliseconds added to every API response")
+    parser.add_argument("--runs", type=int, default=1, help="runs of each generator per scenario")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE", help="environment passed to the generators, e.g. PLANNER_STATS=planner.json")
+    parser.add_argument("--output", default="benchmark-result.json", help="machine-readable result file")
+    args = parser.parse_args()
+
+    overrides = {}
+    for item in args.set:
+        key, separator, value = item.partition("=")
+        if not separator:
+            parser.error(f"--set expects KEY=VALUE (got {item!r})")
+        overrides[key] = value
+
+    results = []
+    for name in args.scenario or list(SCENARIOS):
+        print(f"Running scenario {name} ({SCENARIOS[name]['repos']} repos, {SCENARIOS[name]['years']} years)...")
+        results.extend(run_scenario(name, args.latency / 1000, args.runs, overrides))
+
+    with open(args.output, "w") as f:
+        json.dump({"config": vars(args), "results": results}, f, indent=2)
+
+    print(f"\n=== Benchmark ({args.latency:g} ms per request) ===")
+    print(f"{'scenario':15s} {'generator':10s} {'wall':>9s} {'requests':>9s} {'peak RSS':>10s} {'output':>9s}")
+    failed = False
+    for result in results:
+        if result["exit_code"] != 0:
+            failed = True
+            print(f"{result['scenario']:15s} {result['generator']:10s} ✗ exit code {result['exit_code']} (see {result['workdir']})")
+            continue
+        print(
+            f"{result['scenario']:15s} {result['generator']:10s} {result['wall_seconds']:8.2f}s {result['requests']:9d} "
+            f"{result['peak_rss_kb'] / 1024:8.1f}MB {result['output_bytes']:8d}B"
+        )
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+Local GitHub API stand-in
+Serves deterministic fake data generated from a seed for the endpoints the
+generators use, so they can run without network access by pointing
+GITHUB_API_URL at it. Emulates latency, Link pagination, ETags and 304s, the
+primary and secondary rate limits, and random 5xx failures.
+"""
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+LANGUAGES = ["Python", "Shell", "JavaScript", "TypeScript", "Go", "Rust", "C", "HTML", "CSS", "Dockerfile"]
+RATE_LIMIT_WINDOW = 3600
+
+
+class FakeGitHub:
+    """Deterministic per-user data, a count of the calls served and the emulated limits"""
+
+    def __init__(self, repos_per_user=8, years=3, latency=0.0, seed=None, contributed_per_user=0,
+                 points_per_hour=None, max_concurrent=None, error_rate=0.0):
+        self.repos_per_user = repos_per_user
+        self.years = years
+        self.latency = latency  # Seconds added to every response, to mimic network round trips
+        self.seed = seed  # None keeps the historical data set; any other value generates a different one
+        self.contributed_per_user = contributed_per_user
+        self.points_per_hour = points_per_hour  # Primary rate limit per resource; None disables it
+        self.max_concurrent = max_concurrent  # Secondary rate limit on requests in flight
+        self.error_rate = error_rate  # Share of requests failed with a 502 or 503
+        self.calls = 0
+        self.lock = threading.Lock()
+        self.events_by_user = {}
+        self.next_event_id = 1000
+        self.in_flight = 0
+        self.rate_used = {}
+        self.rate_reset = time.time() + RATE_LIMIT_WINDOW
+        self.error_rng = self._rng("errors")
+
+    def _rng(self, key):
+        return random.Random(key if self.seed is None else f"{self.seed}:{key}")
+
+    def count_call(self):
+        with self.lock:
+            self.calls += 1
+
+    def enter(self):
+        """Admit a request; False when it exceeds the secondary rate limit"""
+        with self.lock:
+            if self.max_concurrent is not None and self.in_flight >= self.max_concurrent:
+                return False
+            self.in_flight += 1
+            return True
+
+    def leave(self):
+        with self.lock:
+            self.in_flight -= 1
+
+    def failure_status(self):
+        """5xx status to fail the current request with, or None"""
+        with self.lock:
+            if self.error_rate > 0 and self.error_rng.random() < self.error_rate:
+                return self.error_rng.choice([502, 503])
+            return None
+
+    def charge(self, resource, points=1):
+        """Spend primary rate-limit points; returns (allowed, rate-limit headers)"""
+        with self.lock:
+            now = time.time()
+            if now >= self.rate_reset:
+                self.rate_used.clear()
+                self.rate_reset = now + RATE_LIMIT_WINDOW
+            used = self.rate_used.get(resource, 0)
+            allowed = used + points <= self.points_per_hour
+            if allowed:
+                used += points
+                self.rate_used[resource] = used
+            return allowed, {
+                "X-RateLimit-Limit": str(self.points_per_hour),
+                "X-RateLimit-Remaining": str(self.points_per_hour - used),
+                "X-RateLimit-Used": str(used),
+                "X-RateLimit-Reset": str(int(self.rate_reset)),
+                "X-RateLimit-Resource": resource
+            }
+
+    def repos(self, username):
+        rng = self._rng(f"repos:{username}")
+        repos = []
+        for index in range(self.repos_per_user):
+            languages = {
+                lang: rng.randint(1_000, 500_000)
+                for lang in rng.sample(LANGUAGES, rng.randint(1, 4))
+            }
+            repos.append({"full_name": f"{username}/repo-{index}", "fork": False, "languages": languages})
+        return repos
+
+    def contributed_repos(self, username):
+        """Repositories of other owners the user contributed to, shared between users"""
+        if not self.contributed_per_user:
+            return []
+        rng = self._rng(f"contributed:{username}")
+        owners = rng.sample(range(self.contributed_per_user * 4), self.contributed_per_user)
+        return [f"upstream-{owner}/repo-0" for owner in owners]
+
+    def add_event(self, username, event_type, repo_name, created_at=None):
+        """Append an event to a user's feed, as if they had just been active"""
+        with self.lock:
+            self.next_event_id += 1
+            event = {
+                "id": str(self.next_event_id),
+                "type": event_type,
+                "repo": {"name": repo_name},
+                "created_at": created_at or datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+            }
+            self.events_by_user.setdefault(username, []).insert(0, event)
+            return event
+
+    def events(self, username):
+        with self.lock:
+            return list(self.events_by_user.get(username, []))
+
+    def repo_languages(self, full_name):
+        owner = full_name.split("/", 1)[0]
+        for repo in self.repos(owner):
+            if repo["full_name"] == full_name:
+                return repo["languages"]
+        return None
+
+    def contribution_count(self, username, day):
+        # Only the last `years` years of history have contributions
+        if (date.today() - day).days > 365 * self.years:
+            return 0
+        rng = self._rng(f"day:{username}:{day.isoformat()}")
+        return rng.choice([0, 0, 1, 2, 3, 5, 8])
+
+    def calendar(self, username, from_date, to_date):
+        days = []
+        day = from_date
+        while day <= to_date:
+            days.append({"date": day.isoformat(), "contributionCount": self.contribution_count(username, day)})
+            day += timedelta(days=1)
+        weeks = [{"contributionDays": days[i:i + 7]} for i in range(0, len(days), 7)]
+        return {"totalContributions": sum(d["contributionCount"] for d in days), "weeks": weeks}
+
+
+def _parse_datetime(value):
+    return datetime.fromisoformat(value.replace("Z", "")).date()
+
+
+def _paginate(items, query):
+    per_page = int(query.get("per_page", ["30"])[0])
+    page = int(query.get("page", ["1"])[0])
+    return items[(page - 1) * per_page:page * per_page], page, max(1, -(-len(items) // per_page))
+
+
+class FakeGitHubHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def _link_header(self, url, page, last_page):
+        """Link header with the next/last (and prev/first) pages, like GitHub's REST API"""
+        base_url = f"http://{self.headers.get('Host')}{url.path}"
+        query = parse_qs(url.query)
+
+        def page_url(number):
+            return f"{base_url}?{urlencode(dict(query, page=[str(number)]), doseq=True)}"
+
+        links = []
+        if page < last_page:
+            links += [f'<{page_url(page + 1)}>; rel="next"', f'<{page_url(last_page)}>; rel="last"']
+        if page > 1:
+            links += [f'<{page_url(page - 1)}>; rel="prev"', f'<{page_url(1)}>; rel="first"']
+        return {"Link": ", ".join(links)} if links else {}
+
+    def _send_json(self, payload, status=200, etag=False, resource=None, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        fake = self.server.fake
+        headers = dict(headers or {})
+        if etag:
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            if self.headers.get("If-None-Match") == etag:
+                # Conditional requests answered 304 cost no rate-limit points
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            headers["ETag"] = etag
+        if resource is not None and fake.points_per_hour is not None:
+            allowed, rate_headers = fake.charge(resource)
+            headers.update(rate_headers)
+            if not allowed:
+                status, body = 403, json.dumps({"message": "API rate limit exceeded"}).encode("utf-8")
+                headers.pop("ETag", None)
+                headers.pop("Link", None)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self, route):
+        fake = self.server.fake
+        fake.count_call()
+        if not fake.enter():
+            self._send_json(
+                {"message": "You have exceeded a secondary rate limit. Please wait a few minutes before you try again."},
+                403, headers={"Retry-After": "60"}
+            )
+            return
+        try:
+            if fake.latency:
+                time.sleep(fake.latency)
+            status = fake.failure_status()
+            if status is not None:
+                self._send_json({"message": "Server Error"}, status)
+                return
+            route()
+        finally:
+            fake.leave()
+
+    def do_GET(self):
+        self._handle(self._route_get)
+
+    def do_POST(self):
+        self._handle(self._route_post)
+
+    def _route_get(self):
+        fake = self.server.fake
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        base_url = f"http://{self.headers.get('Host')}"
+
+        match = re.fullmatch(r"/users/([^/]+)/repos", url.path)
+        if match:
+            repos, page, last_page = _paginate(fake.repos(match.group(1)), query)
+            self._send_json([
+                {
+                    "full_name": repo["full_name"],
+                    "fork": repo["fork"],
+                    "size": sum(repo["languages"].values()) // 1024,
+                    "languages_url": f"{base_url}/repos/{repo['full_name']}/languages"
+                }
+                for repo in repos
+            ], etag=True, resource="core", headers=self._link_header(url, page, last_page))
+            return
+
+        match = re.fullmatch(r"/repos/([^/]+/[^/]+)/languages", url.path)
+        if match:
+            languages = fake.repo_languages(match.group(1))
+            if languages is None:
+                self._send_json({"message": "Not Found"}, 404, resource="core")
+            else:
+                self._send_json(languages, etag=True, resource="core")
+            return
+
+        match = re.fullmatch(r"/repos/([^/]+/[^/]+)", url.path)
+        if match:
+            languages = fake.repo_languages(match.group(1))
+            if languages is None:
+                self._send_json({"message": "Not Found"}, 404, resource="core")
+            else:
+                self._send_json(
+                    {"full_name": match.group(1), "fork": False, "size": sum(languages.values()) // 1024},
+                    etag=True, resource="core"
+                )
+            return
+
+        match = re.fullmatch(r"/users/([^/]+)/events", url.path)
+        if match:
+            self._send_json(fake.events(match.group(1))[:int(query.get("per_page", ["30"])[0])], etag=True, resource="core")
+            return
+
+        if url.path == "/search/issues":
+            author = re.search(r"author:(\S+)", query.get("q", [""])[0])
+            contributed = fake.contributed_repos(author.group(1)) if author else []
+            items = [
+                {"number": number + 1, "repository_url": f"{base_url}/repos/{repo_full_name}"}
+                for number, repo_full_name in enumerate(contributed)
+            ]
+            page_items, page, last_page = _paginate(items, query)
+            self._send_json(
+                {"total_count": len(items), "incomplete_results": False, "items": page_items},
+                etag=True, resource="search", headers=self._link_header(url, page, last_page)
+            )
+            return
+
+        self._send_json({"message": "Not Found"}, 404)
+
+    def _route_post(self):
+        fake = self.server.fake
+        if urlparse(self.path).path != "/graphql":
+            self._send_json({"message": "Not Found"}, 404)
+            return
+        length = int(self.headers.get("Content-Length", "0"))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        query = payload.get("query", "")
+        variables = payload.get("variables", {})
+        username = variables.get("username", "")
+
+        if "repositoriesContributedTo" in query:
+            contributed = fake.contributed_repos(username)
+            offset = int(variables.get("cursor") or 0)
+            nodes = contributed[offset:offset + 100]
+            has_next = offset + 100 < len(contributed)
+            self._send_json({"data": {"user": {
+                "createdAt": (date.today() - timedelta(days=365 * fake.years)).isoformat() + "T00:00:00Z",
+                "repositoriesContributedTo": {
+                    "pageInfo": {"hasNextPage": has_next, "endCursor": str(offset + 100) if has_next else None},
+                    "nodes": [{"nameWithOwner": name} for name in nodes]
+                }
+            }}}, resource="graphql")
+            return
+        data = {}
+        if "rateLimit" in query:
+            data["rateLimit"] = {"cost": 1}
+        repositories = re.findall(r"(\w+): repository\(owner: \$(\w+), name: \$(\w+)\)", query)
+        if repositories:
+            for alias, owner_var, name_var in repositories:
+                languages = fake.repo_languages(f"{variables[owner_var]}/{variables[name_var]}")
+                data[alias] = None if languages is None else {"languages": {"edges": [
+                    {"size": size, "node": {"name": lang}} for lang, size in languages.items()
+                ]}}
+            self._send_json({"data": data}, resource="graphql")
+            return
+        windows = re.findall(r"(\w+): contributionsCollection\(from: \$(\w+), to: \$(\w+)\)", query)
+        if windows:
+            if "contributionCalendar" in query:
+                data["user"] = {
+                    alias: {"contributionCalendar": fake.calendar(
+                        username, _parse_datetime(variables[from_var]), _parse_datetime(variables[to_var])
+                    )}
+                    for alias, from_var, to_var in windows
+                }
+            else:
+                data["user"] = {alias: {"pullRequestContributionsByRepository": []} for alias, _, _ in windows}
+            self._send_json({"data": data}, resource="graphql")
+            return
+
+        collection = {}
+        if "contributionCalendar" in query:
+            to_date = _parse_datetime(variables["to"]) if "to" in variables else date.today()
+            from_date = _parse_datetime(variables["from"]) if "from" in variables else to_date - timedelta(days=365)
+            collection["contributionCalendar"] = fake.calendar(username, from_date, to_date)
+        for field in ("commitContributionsByRepository", "issueContributionsByRepository",
+                      "pullRequestContributionsByRepository", "pullRequestReviewContributionsByRepository"):
+            if field in query:
+                collection[field] = []
+        self._send_json({"data": {"user": {"contributionsCollection": collection}}}, resource="graphql")
+
+
+def start_fake_api(fake=None, host="127.0.0.1", port=0):
+    """Start the stand-in in a background thread and return (server, base_url)"""
+    server = ThreadingHTTPServer((host, port), FakeGitHubHandler)
+    server.fake = fake or FakeGitHub()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a local GitHub API stand-in")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--repos", type=int, default=8, help="repositories per user")
+    parser.add_argument("--years", type=int, default=3, help="years of contribution history per user")
+    parser.add_argument("--latency", type=float, default=0.0, help="milliseconds added to every response")
+    parser.add_argument("--seed", help="generate a different data set from this seed")
+    parser.add_argument("--contributed", type=int, default=0, help="repositories of other owners each user contributed to")
+    parser.add_argument("--rate-limit", type=int, help="points per hour for each rate-limit resource (default unlimited)")
+    parser.add_argument("--max-concurrent", type=int, help="requests in flight before the secondary rate limit answers 403")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests failed with a 502 or 503")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), FakeGitHubHandler)
+    server.fake = FakeGitHub(
+        repos_per_user=args.repos, years=args.years, latency=args.latency / 1000, seed=args.seed,
+        contributed_per_user=args.contributed, points_per_hour=args.rate_limit,
+        max_concurrent=args.max_concurrent, error_rate=args.error_rate
+    )
+    print(f"Fake GitHub API on http://127.0.0.1:{args.port} (set GITHUB_API_URL to use it)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -2,323 +2,80 @@
 """
 Generate GitHub Languages Stats SVG
 Fetches language data from repositories and generates an SVG visualization.
+Configuration comes from the environment; the pipeline itself is stats_api.generate_languages_card.
 """
+import argparse
 import os
 import sys
-import requests
-from collections import defaultdict
-import xml.etree.ElementTree as ET
+
+from metrics import metrics_from_env, write_from_env
+from profiling import PROFILE_MODES, start_profiling
+from stats_api import CardError, generate_languages_card
+from tracing import tracer_from_env
+
 
 def main():
+    parser = argparse.ArgumentParser(description="Generate the languages stats card")
+    parser.add_argument("--deadline", type=float, help="seconds the whole run may take; the card is rendered from what was fetched by then")
+    parser.add_argument("--request-timeout", type=float, help="seconds any single API request may take")
+    parser.add_argument("--profile", choices=PROFILE_MODES, help="profile CPU time or memory allocations of each phase")
+    parser.add_argument("--profile-dir", default=".profiles", help="directory the per-phase profiles are saved to")
+    cassette_mode = parser.add_mutually_exclusive_group()
+    cassette_mode.add_argument("--record", metavar="CASSETTE", help="save every API exchange (token redacted) to a cassette file")
+    cassette_mode.add_argument("--replay", metavar="CASSETTE", help="serve every API request from a recorded cassette, without network")
+    args = parser.parse_args()
+    start_profiling(args.profile, args.profile_dir)
+
     # Get username from environment variable or use default
     username = os.environ.get("GITHUB_USERNAME", "Andreas-Garcia")
+    # Aggregate a whole organization instead of a user when GITHUB_ORG is set
+    org = os.environ.get("GITHUB_ORG")
+    # Analyze local git checkouts instead of calling the API when LOCAL_REPOS is set (comma-separated paths)
+    local_repos_str = os.environ.get("LOCAL_REPOS", "")
+    local_repos = [path.strip() for path in local_repos_str.split(",") if path.strip()]
     token = os.environ.get("GH_PAT") or os.environ.get("GITHUB_TOKEN")
-    
-    if not token:
+
+    if not token and not local_repos and not args.replay:
         print("Error: No GitHub token found. Set GH_PAT or GITHUB_TOKEN environment variable.")
         sys.exit(1)
-    
+
     # Get additional repos from environment variable (comma-separated)
     additional_repos_str = os.environ.get("ADDITIONAL_REPOS", "")
     additional_repos = [repo.strip() for repo in additional_repos_str.split(",") if repo.strip()] if additional_repos_str else []
 
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/vnd.github.v3+json"
-    }
-
-    # Fetch repository languages
-    languages_data = defaultdict(int)
-    processed_repos = set()  # Track repos we've already processed
-    
-    # First, fetch repositories owned by the user
-    print("Fetching owned repositories...")
-    page = 1
-    per_page = 100
-    while True:
-        repos_response = requests.get(
-            f"https://api.github.com/users/{username}/repos?per_page={per_page}&page={page}&type=all",
-            headers=headers
-        )
-        repos_response.raise_for_status()
-        repos = repos_response.json()
-
-        if not repos:
-            break
-
-        for repo in repos:
-            repo_full_name = repo["full_name"]
-            if repo.get("fork"):
-                print(f"  ⊘ Skipped fork: {repo_full_name}")
-                continue
-            
-            repo_full_name = repo["full_name"]
-            if repo_full_name in processed_repos:
-                continue
-            processed_repos.add(repo_full_name)
-            
-            lang_response = requests.get(
-                repo["languages_url"],
-                headers=headers
-            )
-            if lang_response.status_code == 200:
-                repo_langs = lang_response.json()
-                if repo_langs:
-                    total_bytes = sum(repo_langs.values())
-                    for lang, bytes_count in repo_langs.items():
-                        languages_data[lang] += bytes_count
-                    print(f"  ✓ Processed: {repo_full_name} ({total_bytes:,} bytes)")
-                else:
-                    print(f"  ⚠ Skipped {repo_full_name} (no language data)")
-            else:
-                print(f"  ✗ Failed to fetch languages for {repo_full_name} (status: {lang_response.status_code})")
-
-        page += 1
-        if len(repos) < per_page:
-            break
-
-    # Also fetch repositories where user has contributed (using Search API)
-    print("Fetching repositories with contributions...")
-    search_query = f"author:{username} type:pr"
-    search_headers = headers.copy()
-    search_headers["Accept"] = "application/vnd.github.v3+json"
-    
-    page = 1
-    while True:
-        search_response = requests.get(
-            f"https://api.github.com/search/issues?q={search_query}&per_page={per_page}&page={page}",
-            headers=search_headers
+    # METRICS_FILE (JSON) and METRICS_PROM (Prometheus text) enable run metrics
+    metrics = metrics_from_env()
+    # TRACE_FILE records a Chrome trace-event timeline of the run
+    tracer = tracer_from_env()
+    try:
+        languages_data, sorted_languages, repo_count, partial = generate_languages_card(
+            username, token, org, local_repos, additional_repos,
+            # Per-repository languages are kept between runs and only touched repositories refetched
+            state_path=os.environ.get("STATE_FILE"),
+            deadline_seconds=args.deadline,
+            request_timeout=args.request_timeout,
+            record=args.record,
+            replay=args.replay,
+            planner_path=os.environ.get("PLANNER_STATS", ".query-planner.json") or None,
+            local_cache_path=os.environ.get("LOCAL_LANGUAGES_CACHE", ".local-languages-cache.sqlite") or None,
+            org_checkpoint_path=os.environ.get("ORG_CHECKPOINT", f".org-languages-{org}.checkpoint.json"),
+            # HISTORY_DIR keeps one snapshot per day for trend cards
+            history_dir=os.environ.get("HISTORY_DIR"),
+            metrics=metrics,
+            tracer=tracer
         )
-        if search_response.status_code != 200:
-            print(f"  Search API returned {search_response.status_code}, skipping contribution-based repos")
-            break
-            
-        search_data = search_response.json()
-        items = search_data.get("items", [])
-        
-        if not items:
-            break
-        
-        for item in items:
-            repo_url = item.get("repository_url", "")
-            if not repo_url:
-                continue
-            
-            # Extract repo full name from URL
-            repo_full_name = repo_url.replace("https://api.github.com/repos/", "")
-            if repo_full_name in processed_repos:
-                continue
-            
-            # Skip if user owns this repo (already processed)
-            if repo_full_name.startswith(f"{username}/"):
-                continue
-            
-            processed_repos.add(repo_full_name)
-            
-            # Fetch language data for this repo
-            lang_url = f"https://api.github.com/repos/{repo_full_name}/languages"
-            lang_response = requests.get(lang_url, headers=headers)
-            if lang_response.status_code == 200:
-                repo_langs = lang_response.json()
-                if repo_langs:  # Only count if repo has language data
-                    for lang, bytes_count in repo_langs.items():
-                        languages_data[lang] += bytes_count
-                    print(f"  Processed (contribution): {repo_full_name}")
-        
-        page += 1
-        if len(items) < per_page:
-            break
-
-    # Check for additional repositories user might have contributed to
-    if additional_repos:
-        print(f"Checking {len(additional_repos)} additional repositories...")
-        for repo_full_name in additional_repos:
-            if repo_full_name in processed_repos:
-                print(f"  Skipping {repo_full_name} (already processed)")
-                continue
-            
-            lang_url = f"https://api.github.com/repos/{repo_full_name}/languages"
-            lang_response = requests.get(lang_url, headers=headers)
-            if lang_response.status_code == 200:
-                repo_langs = lang_response.json()
-                if repo_langs:
-                    processed_repos.add(repo_full_name)
-                    total_bytes = sum(repo_langs.values())
-                    for lang, bytes_count in repo_langs.items():
-                        languages_data[lang] += bytes_count
-                    print(f"  ✓ Processed (additional): {repo_full_name} ({total_bytes:,} bytes)")
-                else:
-                    print(f"  ⚠ {repo_full_name} has no language data")
-            else:
-                print(f"  ✗ Cannot access {repo_full_name} (status: {lang_response.status_code})")
-                if lang_response.status_code == 404:
-                    print(f"    Repository not found or not accessible with current token")
-                elif lang_response.status_code == 403:
-                    print(f"    Access forbidden - token may need 'repo' scope")
-
-    # Calculate percentages
-    total_bytes = sum(languages_data.values())
-    if total_bytes == 0:
-        raise Exception("No language data found")
-
-    languages_percentages = {
-        lang: (bytes_count / total_bytes) * 100
-        for lang, bytes_count in languages_data.items()
-    }
-
-    # Sort by percentage and get top languages
-    sorted_languages = sorted(
-        languages_percentages.items(),
-        key=lambda x: x[1],
-        reverse=True
-    )
-
-    # Language colors (matching common GitHub language colors)
-    lang_colors = {
-        "Python": "#3776ab",
-        "Shell": "#89e051",
-        "PowerShell": "#012456",
-        "JavaScript": "#f7df1e",
-        "TypeScript": "#3178c6",
-        "Java": "#ed8b00",
-        "Go": "#00add8",
-        "Rust": "#000000",
-        "C++": "#00599c",
-        "C": "#a8b9cc",
-        "HTML": "#e34c26",
-        "CSS": "#1572b6",
-        "Dockerfile": "#384d54",
-        "Makefile": "#427819",
-    }
-
-    # Default color palette if language not in map
-    default_colors = ["#3776ab", "#89e051", "#012456", "#f7df1e", "#3178c6", "#ed8b00", "#00add8"]
-
-    # Theme colors (matching image design)
-    colors = {
-        "bg": "#0d1117",
-        "bg_card": "#161b22",
-        "title": "#ff6e96",
-        "text": "#c9d1d9",
-        "border": "#30363d"
-    }
-
-    # Generate SVG
-    svg_width = 495
-    svg_height = 195
-    bar_height = 10
-    bar_y = 60
-    bar_x_start = 20
-    bar_width = svg_width - 40
-    legend_y_start = 90
-    legend_item_height = 25
-
-    svg = ET.Element("svg", {
-        "width": str(svg_width),
-        "height": str(svg_height),
-        "xmlns": "http://www.w3.org/2000/svg"
-    })
-
-    # Background
-    bg = ET.SubElement(svg, "rect", {
-        "width": str(svg_width),
-        "height": str(svg_height),
-        "fill": colors["bg"],
-        "rx": "8"
-    })
-
-    # Card background
-    card = ET.SubElement(svg, "rect", {
-        "x": "10",
-        "y": "10",
-        "width": str(svg_width - 20),
-        "height": str(svg_height - 20),
-        "fill": colors["bg_card"],
-        "rx": "6"
-    })
-
-    # Title
-    title = ET.SubElement(svg, "text", {
-        "x": str(svg_width // 2),
-        "y": "35",
-        "text-anchor": "middle",
-        "font-family": "Segoe UI, -apple-system, BlinkMacSystemFont, sans-serif",
-        "font-size": "18",
-        "font-weight": "700",
-        "fill": colors["title"]
-    })
-    title.text = "Most Used Languages"
-
-    # Draw stacked bar
-    current_x = bar_x_start
-    color_index = 0
-
-    for lang, percentage in sorted_languages[:10]:  # Top 10 languages
-        segment_width = (bar_width * percentage) / 100
-        if segment_width < 1:  # Skip very small segments
-            continue
-
-        lang_color = lang_colors.get(lang, default_colors[color_index % len(default_colors)])
-        
-        segment = ET.SubElement(svg, "rect", {
-            "x": str(current_x),
-            "y": str(bar_y),
-            "width": str(segment_width),
-            "height": str(bar_height),
-            "fill": lang_color,
-            "rx": "2"
-        })
-
-        current_x += segment_width
-        color_index += 1
-
-    # Draw legend
-    legend_x = bar_x_start
-    legend_y = legend_y_start
-    items_per_row = 3
-    item_width = bar_width / items_per_row
-    current_row = 0
-    current_col = 0
-
-    for lang, percentage in sorted_languages[:10]:
-        if percentage < 0.1:  # Skip languages with less than 0.1%
-            continue
-
-        x_pos = legend_x + (current_col * item_width)
-        y_pos = legend_y + (current_row * legend_item_height)
-
-        # Color dot
-        lang_color = lang_colors.get(lang, default_colors[(current_row * items_per_row + current_col) % len(default_colors)])
-        dot = ET.SubElement(svg, "circle", {
-            "cx": str(x_pos + 6),
-            "cy": str(y_pos + 6),
-            "r": "5",
-            "fill": lang_color
-        })
-
-        # Language name and percentage
-        lang_text = ET.SubElement(svg, "text", {
-            "x": str(x_pos + 18),
-            "y": str(y_pos + 10),
-            "font-family": "Segoe UI, -apple-system, BlinkMacSystemFont, sans-serif",
-            "font-size": "12",
-            "fill": colors["text"]
-        })
-        lang_text.text = f"{lang} {percentage:.2f}%"
-
-        current_col += 1
-        if current_col >= items_per_row:
-            current_col = 0
-            current_row += 1
-
-    # Save SVG
-    tree = ET.ElementTree(svg)
-    ET.indent(tree, space="  ")
-    tree.write("languages-stats.svg", encoding="utf-8", xml_declaration=True)
+    except CardError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    write_from_env(metrics)
+    if tracer is not None:
+        tracer.write()
 
     print(f"\n=== Summary ===")
-    print(f"Total repositories processed: {len(processed_repos)}")
-    print(f"Total language bytes: {total_bytes:,}")
+    if partial:
+        print("⚠ Deadline reached: the card was rendered from partial data")
+    print(f"Total repositories processed: {repo_count}")
+    print(f"Total language bytes: {sum(languages_data.values()):,}")
     print(f"Generated languages stats for {len(sorted_languages)} languages")
     for lang, pct in sorted_languages[:10]:
         bytes_count = languages_data[lang]
@@ -326,4 +83,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-
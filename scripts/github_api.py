@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Shared GitHub API transport
+Wraps a requests session per thread, enforces a shared rate-limit budget and
+revalidates cached GET responses with ETags so unchanged data costs nothing.
+An optional run deadline caps every request's timeout by the time left, and a
+cassette records every exchange or replays a recorded run without network.
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+# requests is imported where a request is made: runs served from local data or a
+# cassette never pay for loading the HTTP stack
+
+# Point at a GitHub Enterprise or local stand-in API with GITHUB_API_URL
+API_URL = os.environ.get("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+GRAPHQL_URL = f"{API_URL}/graphql"
+
+# GitHub logins: alphanumerics and single hyphens, at most 39 characters
+USERNAME_PATTERN = re.compile(r"^[A-Za-z0-9](?:[A-Za-z0-9-]{0,38})$")
+
+# GitHub's primary rate limit for authenticated requests
+DEFAULT_POINTS_PER_HOUR = 5000
+
+
+class RateBudget:
+    """Token bucket shared by every request made through the clients using it"""
+
+    def __init__(self, points_per_hour=DEFAULT_POINTS_PER_HOUR):
+        self.capacity = points_per_hour
+        self.rate = points_per_hour / 3600
+        self.tokens = float(points_per_hour)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, points=1):
+        """Block until `points` can be spent without exceeding the budget"""
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= points:
+                    self.tokens -= points
+                    return
+                wait = (points - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def refund(self, points=1):
+        """Give back points for requests GitHub did not charge (304 Not Modified)"""
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + points)
+
+    def observe(self, response):
+        """Never assume more budget than GitHub reports as remaining"""
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        if remaining is None:
+            return
+        try:
+            remaining = int(remaining)
+        except ValueError:
+            return
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.tokens, remaining)
+
+
+class SharedRateBudget(RateBudget):
+    """RateBudget whose state lives in shared memory, for use across a process pool"""
+
+    def __init__(self, points_per_hour=DEFAULT_POINTS_PER_HOUR):
+        import multiprocessing
+        self.capacity = points_per_hour
+        self.rate = points_per_hour / 3600
+        self._tokens = multiprocessing.Value("d", float(points_per_hour), lock=False)
+        self._updated = multiprocessing.Value("d", time.monotonic(), lock=False)
+        self.lock = multiprocessing.Lock()
+
+    @property
+    def tokens(self):
+        return self._tokens.value
+
+    @tokens.setter
+    def tokens(self, value):
+        self._tokens.value = value
+
+    @property
+    def updated(self):
+        return self._updated.value
+
+    @updated.setter
+    def updated(self, value):
+        self._updated.value = value
+
+
+class DeadlineExceeded(Exception):
+    """Raised instead of sending a request once the run's time budget is spent"""
+
+
+def timeout_errors():
+    """Exceptions meaning the run or a request ran out of time, for use in except clauses"""
+    # Evaluated only while an exception is matched, so requests is loaded lazily here too
+    import requests
+    return DeadlineExceeded, requests.Timeout
+
+
+class Deadline:
+    """Wall-clock budget for a whole run; records whether any data was cut short"""
+
+    def __init__(self, seconds):
+        self.expires = time.monotonic() + seconds
+        self.partial = False
+
+    def remaining(self):
+        return self.expires - time.monotonic()
+
+    def check(self):
+        if self.remaining() <= 0:
+            self.partial = True
+            raise DeadlineExceeded("deadline reached")
+
+
+class HttpCache:
+    """On-disk cache of GET responses keyed by URL, revalidated with If-None-Match"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, url, accept):
+        key = hashlib.sha256(f"{accept}\n{url}".encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, url, accept):
+        try:
+            with open(self._path(url, accept), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, url, accept, response):
+        etag = response.headers.get("ETag")
+        if not etag:
+            return
+        path = self._path(url, accept)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entry = {
+            "etag": etag,
+            "headers": {"Content-Type": response.headers.get("Content-Type", "application/json")},
+            "body": response.content.decode("utf-8")
+        }
+        # Several processes may share the directory, so never expose a partial file
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+
+class CassetteMiss(Exception):
+    """Raised when a replayed run makes a request the cassette did not record"""
+
+
+# Response headers kept in cassettes; everything else (cookies, request ids) is dropped
+CASSETTE_HEADERS = ("content-type", "etag", "link", "retry-after")
+# GraphQL variables holding a date window ($from, $to, $from0, $to0, ...), which move with the day a run is made on
+DATE_WINDOW_VARIABLE = re.compile(r"(from|to)\d*")
+
+
+class Cassette:
+    """Gzipped JSON record of a run's API exchanges, with secrets redacted"""
+
+    def __init__(self, path, mode, secrets=()):
+        self.path = path
+        self.mode = mode  # "record" or "replay"
+        self.secrets = [secret for secret in secrets if secret]
+        self.interactions = []
+        self.recorded_on = None
+        self.lock = threading.Lock()
+        if mode == "replay":
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                saved = json.load(f)
+            self.interactions = saved["interactions"]
+            self.recorded_on = saved["recorded_on"]
+            self._used = [False] * len(self.interactions)
+
+    @property
+    def replaying(self):
+        return self.mode == "replay"
+
+    def _redact(self, text):
+        for secret in self.secrets:
+            text = text.replace(secret, "REDACTED")
+        return text
+
+    def _digest(self, body):
+        text = json.dumps(body, sort_keys=True) if not isinstance(body, str) else body
+        return hashlib.sha256(self._redact(text).encode("utf-8")).hexdigest()
+
+    def _request_key(self, method, url, kwargs):
+        body = kwargs.get("json")
+        shape = body
+        if isinstance(body, dict) and isinstance(body.get("variables"), dict):
+            # The same query for the same user, with its date windows left out
+            variables = {name: value for name, value in body["variables"].items() if not DATE_WINDOW_VARIABLE.fullmatch(name)}
+            shape = dict(body, variables=variables)
+        if body is None:
+            body = shape = str(kwargs.get("data") or "")
+        # URLs are kept relative to the API so a cassette replays against any GITHUB_API_URL
+        if url.startswith(API_URL):
+            url = url[len(API_URL):]
+        # Bodies are stored as digests: GraphQL queries would dominate the file
+        return method, self._redact(url), self._digest(body), self._digest(shape)
+
+    def record(self, method, url, kwargs, response):
+        method, url, body_sha, shape_sha = self._request_key(method, url, kwargs)
+        headers = {
+            name: self._redact(value) for name, value in response.headers.items()
+            if name.lower() in CASSETTE_HEADERS or name.lower().startswith("x-ratelimit-")
+        }
+        with self.lock:
+            self.interactions.append({
+                "method": method, "url": url, "body_sha": body_sha, "shape_sha": shape_sha,
+                "status": response.status_code, "headers": headers,
+                "body": self._redact(response.content.decode("utf-8"))
+            })
+
+    def replay(self, method, url, kwargs):
+        """Return the recorded response for a request, matching its body up to the date windows"""
+        from requests import Response
+        from requests.structures import CaseInsensitiveDict
+
+        method, url, body_sha, shape_sha = self._request_key(method, url, kwargs)
+        with self.lock:
+            candidates = [
+                index for index, entry in enumerate(self.interactions)
+                if not self._used[index] and entry["method"] == method and entry["url"] == url
+            ]
+            if not candidates:
+                raise CassetteMiss(f"{method} {url} was not recorded in {self.path}")
+            exact = [index for index in candidates if self.interactions[index]["body_sha"] == body_sha]
+            # Bodies carry dates, so a replay on a later day matches the query and every
+            # other variable (the user, cursors), in recording order
+            same_shape = [index for index in candidates if self.interactions[index].get("shape_sha") == shape_sha]
+            if not exact and not same_shape:
+                raise CassetteMiss(f"{method} {url} was recorded in {self.path} only with other request bodies")
+            index = (exact or same_shape)[0]
+            self._used[index] = True
+        entry = self.interactions[index]
+        response = Response()
+        response.status_code = entry["status"]
+        response.url = url
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response._content = entry["body"].encode("utf-8")
+        response.encoding = "utf-8"
+        return response
+
+    def save(self):
+        if self.mode != "record":
+            return
+        tmp_path = f"{self.path}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump({"recorded_on": time.strftime("%Y-%m-%d"), "interactions": self.interactions}, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+
+def _cached_response(url, entry):
+    from requests import Response
+    from requests.structures import CaseInsensitiveDict
+
+    response = Response()
+    response.status_code = 200
+    response.url = url
+    response.headers = CaseInsensitiveDict(entry["headers"])
+    response.headers["ETag"] = entry["etag"]
+    response._content = entry["body"].encode("utf-8")
+    response.encoding = "utf-8"
+    response.from_cache = True
+    return response
+
+
+class GitHubClient:
+    """Drop-in replacement for requests.get/post with shared headers, budget and cache"""
+
+    def __init__(self, headers, budget=None, cache=None, timeout=None, deadline=None, metrics=None, tracer=None, cassette=None):
+        self.headers = dict(headers)
+        self.budget = budget
+        self.cache = cache
+        self.timeout = timeout
+        self.deadline = deadline
+        self.metrics = metrics
+        self.tracer = tracer
+        self.cassette = cassette
+        self._local = threading.local()
+
+    @property
+    def session(self):
+        # requests.Session is not guaranteed to be thread-safe, so keep one per thread
+        session = getattr(self._local, "session", None)
+        if session is None:
+            import requests
+            session = requests.Session()
+            session.headers.update(self.headers)
+            self._local.session = session
+        return session
+
+    def request(self, method, url, headers=None, **kwargs):
+        if self.cassette is not None and self.cassette.replaying:
+            # Served from the cassette: no network, budget or deadline involved
+            started = time.monotonic()
+            response = self.cassette.replay(method, url, kwargs)
+            self._observe(method, url, response, time.monotonic() - started)
+            return response
+
+        import requests
+
+        entry = None
+        accept = dict(self.headers, **(headers or {})).get("Accept", "")
+        if self.cache is not None and method == "GET":
+            entry = self.cache.get(url, accept)
+            if entry is not None:
+                headers = dict(headers or {}, **{"If-None-Match": entry["etag"]})
+
+        if self.budget is not None:
+            self.budget.acquire()
+        timeout = self.timeout
+        if self.deadline is not None:
+            self.deadline.check()
+            timeout = self.deadline.remaining() if timeout is None else min(timeout, self.deadline.remaining())
+        if timeout is not None:
+            kwargs.setdefault("timeout", timeout)
+        started = time.monotonic()
+        try:
+            response = self.session.request(method, url, headers=headers, **kwargs)
+        except requests.Timeout:
+            if self.deadline is not None:
+                self.deadline.partial = True
+                if self.deadline.remaining() <= 0:
+                    raise DeadlineExceeded("deadline reached during request")
+            raise
+        if self.budget is not None:
+            self.budget.observe(response)
+
+        if entry is not None and response.status_code == 304:
+            if self.budget is not None:
+                self.budget.refund()
+            response = _cached_response(url, entry)
+        elif self.cache is not None and method == "GET" and response.status_code == 200:
+            self.cache.put(url, accept, response)
+        if self.cassette is not None:
+            self.cassette.record(method, url, kwargs, response)
+        self._observe(method, url, response, time.monotonic() - started)
+        return response
+
+    def _observe(self, method, url, response, elapsed):
+        if self.metrics is not None:
+            self.metrics.observe_request(method, url, response, elapsed)
+        if self.tracer is not None:
+            self.tracer.observe_request(method, url, response, elapsed)
+
+    def get(self, url, headers=None, **kwargs):
+        return self.request("GET", url, headers=headers, **kwargs)
+
+    def post(self, url, headers=None, **kwargs):
+        return self.request("POST", url, headers=headers, **kwargs)
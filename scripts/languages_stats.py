@@ -0,0 +1,627 @@
+#!/usr/bin/env python3
+"""
+GitHub languages stats
+Fetches language bytes of owned, contributed and additional repositories (or of
+an organization) from the GitHub API and renders the languages card SVG.
+"""
+import json
+import math
+import os
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+from activity_check import check_activity, commit_activity
+from github_api import API_URL, GRAPHQL_URL, DeadlineExceeded, timeout_errors
+from phases import phase
+from tracing import span
+
+# Repositories the user contributed commits or pull requests to, excluding their own
+CONTRIBUTED_REPOS_QUERY = """
+query($username: String!, $cursor: String) {
+  user(login: $username) {
+    createdAt
+    repositoriesContributedTo(first: 100, after: $cursor, includeUserRepositories: false, contributionTypes: [COMMIT, PULL_REQUEST]) {
+      pageInfo {
+        hasNextPage
+        endCursor
+      }
+      nodes {
+        nameWithOwner
+      }
+    }
+  }
+}
+"""
+
+# Upper bound on the 1-year windows queried for pull request contributions
+MAX_PR_WINDOWS = 20
+
+# Organization repositories with their languages inline, 100 per page
+ORG_REPOSITORIES_QUERY = """
+query($org: String!, $cursor: String) {
+  organization(login: $org) {
+    repositories(first: 100, after: $cursor, isFork: false) {
+      pageInfo {
+        hasNextPage
+        endCursor
+      }
+      nodes {
+        nameWithOwner
+        languages(first: 100) {
+          edges {
+            size
+            node {
+              name
+            }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+def _graphql(client, query, variables):
+    response = client.post(GRAPHQL_URL, json={"query": query, "variables": variables})
+    response.raise_for_status()
+    data = response.json()
+    if "errors" in data:
+        raise Exception(data["errors"][0].get("message", "GraphQL error"))
+    return data["data"]
+
+def pull_request_repos_query(window_count):
+    """Build one query with an aliased contributionsCollection per 1-year window"""
+    variables = ", ".join(f"$from{i}: DateTime!, $to{i}: DateTime!" for i in range(window_count))
+    windows = "\n".join(
+        f"""    y{i}: contributionsCollection(from: $from{i}, to: $to{i}) {{
+      pullRequestContributionsByRepository(maxRepositories: 100) {{
+        repository {{
+          nameWithOwner
+        }}
+      }}
+    }}"""
+        for i in range(window_count)
+    )
+    return f"""
+query($username: String!, {variables}) {{
+  user(login: $username) {{
+{windows}
+  }}
+}}
+"""
+
+def discover_contributed_repos(client, username):
+    """List distinct repositories (not owned by the user) the user contributed to"""
+    # repositoriesContributedTo and pullRequestContributionsByRepository return each
+    # repository once, unlike the Search API which returns one hit per pull request
+    # and stops at 1000 results
+    repos = {}
+    cursor = None
+    created_at = None
+    while True:
+        user = _graphql(client, CONTRIBUTED_REPOS_QUERY, {"username": username, "cursor": cursor})["user"]
+        created_at = user["createdAt"]
+        contributed = user["repositoriesContributedTo"]
+        for repo in contributed["nodes"]:
+            repos.setdefault(repo["nameWithOwner"], None)
+        if not contributed["pageInfo"]["hasNextPage"]:
+            break
+        cursor = contributed["pageInfo"]["endCursor"]
+
+    # contributionsCollection spans at most one year, so cover the account's whole
+    # history with one aliased window per year in a single request
+    now = datetime.now(timezone.utc)
+    created = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
+    window_count = max(1, min(MAX_PR_WINDOWS, (now - created).days // 365 + 1))
+    variables = {"username": username}
+    for i in range(window_count):
+        variables[f"from{i}"] = (now - timedelta(days=365 * (i + 1))).strftime("%Y-%m-%dT%H:%M:%SZ")
+        variables[f"to{i}"] = (now - timedelta(days=365 * i)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    user = _graphql(client, pull_request_repos_query(window_count), variables)["user"]
+    for i in range(window_count):
+        for repo_data in user[f"y{i}"]["pullRequestContributionsByRepository"]:
+            repos.setdefault(repo_data["repository"]["nameWithOwner"], None)
+    return list(repos)
+
+def fetch_repo_languages(client, repo_full_name):
+    """Return one repository's language bytes, or None if it no longer exists"""
+    lang_response = client.get(f"{API_URL}/repos/{repo_full_name}/languages")
+    if lang_response.status_code == 404:
+        return None
+    lang_response.raise_for_status()
+    return lang_response.json()
+
+# Repositories whose languages are fetched per aliased GraphQL query
+LANGUAGES_BATCH_SIZE = 50
+
+def repository_languages_query(count):
+    """Build one query with an aliased repository lookup per repository"""
+    variables = ", ".join(f"$owner{i}: String!, $name{i}: String!" for i in range(count))
+    lookups = "\n".join(
+        f"""  r{i}: repository(owner: $owner{i}, name: $name{i}) {{
+    languages(first: 100) {{
+      edges {{
+        size
+        node {{
+          name
+        }}
+      }}
+    }}
+  }}"""
+        for i in range(count)
+    )
+    return f"""
+query({variables}) {{
+{lookups}
+  rateLimit {{
+    cost
+  }}
+}}
+"""
+
+def plan_languages(planner, workload, count):
+    """Choose REST (one request per repository) or aliased GraphQL batches"""
+    if planner is None or count == 0:
+        return "rest_languages"
+    return planner.choose(workload, {
+        "rest_languages": count,
+        "graphql_languages": math.ceil(count / LANGUAGES_BATCH_SIZE)
+    })
+
+def _iter_rest_languages(client, repo_names, planner=None, workload=None):
+    for repo_full_name in repo_names:
+        started = time.monotonic()
+        lang_response = client.get(f"{API_URL}/repos/{repo_full_name}/languages")
+        if planner is not None:
+            hit = getattr(lang_response, "from_cache", False)
+            planner.observe(workload, "rest_languages", time.monotonic() - started, 0 if hit else 1, hit)
+        if lang_response.status_code == 200:
+            with span("parse", repo=repo_full_name):
+                repo_langs = lang_response.json()
+            yield repo_full_name, repo_langs, 200
+        else:
+            yield repo_full_name, None, lang_response.status_code
+
+def iter_repo_languages(client, repo_names, access_path="rest_languages", planner=None, workload=None):
+    """Yield (repo, languages, status) for each repository through the chosen access path"""
+    with phase("fetch languages"):
+        if access_path == "rest_languages":
+            yield from _iter_rest_languages(client, repo_names, planner, workload)
+            return
+
+        for start in range(0, len(repo_names), LANGUAGES_BATCH_SIZE):
+            batch = repo_names[start:start + LANGUAGES_BATCH_SIZE]
+            variables = {}
+            for i, repo_full_name in enumerate(batch):
+                variables[f"owner{i}"], variables[f"name{i}"] = repo_full_name.split("/", 1)
+            started = time.monotonic()
+            response = client.post(GRAPHQL_URL, json={"query": repository_languages_query(len(batch)), "variables": variables})
+            # Inaccessible repositories come back as null next to an error, not as a failed query
+            with span("parse", repos=len(batch)):
+                data = (response.json().get("data") or {}) if response.status_code == 200 else {}
+            if not data:
+                # A failed batch (5xx, secondary rate limit) must not abort the run: fetch its
+                # repositories over REST, which reports failures per repository
+                print(f"  ⚠ Aliased languages query failed (status: {response.status_code}), falling back to REST for {len(batch)} repositories")
+                yield from _iter_rest_languages(client, batch, planner, workload)
+                continue
+            if planner is not None:
+                cost = (data.get("rateLimit") or {}).get("cost", 1)
+                planner.observe(workload, access_path, time.monotonic() - started, cost)
+            for i, repo_full_name in enumerate(batch):
+                repository = data.get(f"r{i}")
+                if repository is None:
+                    yield repo_full_name, None, 404
+                    continue
+                yield repo_full_name, {edge["node"]["name"]: edge["size"] for edge in repository["languages"]["edges"]}, 200
+
+def fetch_languages(client, username, additional_repos=(), repo_languages=None, planner=None):
+    """Sum language bytes over owned, contributed and additional repositories"""
+    # Pass a dict as repo_languages to also collect each repository's own bytes, and a
+    # QueryPlanner to let observed costs pick REST or GraphQL for each group of repositories
+    # Fetch repository languages
+    languages_data = defaultdict(int)
+    queued_repos = set()  # Repositories already listed, so none is fetched twice
+    processed_repos = set()  # Repositories whose languages were fetched
+    
+    try:
+        # First, fetch repositories owned by the user
+        print("Fetching owned repositories...")
+        with phase("list repositories"):
+            owned_repos = []
+            page = 1
+            per_page = 100
+            while True:
+                with span("page", page=page):
+                    repos_response = client.get(
+                        f"{API_URL}/users/{username}/repos?per_page={per_page}&page={page}&type=all"
+                    )
+                    repos_response.raise_for_status()
+                    repos = repos_response.json()
+
+                if not repos:
+                    break
+                owned_repos.extend(repos)
+
+                page += 1
+                if len(repos) < per_page:
+                    break
+
+        # Largest repositories first, so a run cut short by a deadline misses the least bytes
+        owned_repos.sort(key=lambda repo: repo.get("size", 0), reverse=True)
+        owned_names = []
+        for repo in owned_repos:
+            repo_full_name = repo["full_name"]
+            if repo.get("fork"):
+                print(f"  ⊘ Skipped fork: {repo_full_name}")
+                continue
+            if repo_full_name in queued_repos:
+                continue
+            queued_repos.add(repo_full_name)
+            owned_names.append(repo_full_name)
+
+        access_path = plan_languages(planner, "owned repositories", len(owned_names))
+        for repo_full_name, repo_langs, status in iter_repo_languages(client, owned_names, access_path, planner, "owned repositories"):
+            if status == 200:
+                processed_repos.add(repo_full_name)
+                if repo_langs:
+                    total_bytes = sum(repo_langs.values())
+                    for lang, bytes_count in repo_langs.items():
+                        languages_data[lang] += bytes_count
+                    if repo_languages is not None:
+                        repo_languages[repo_full_name] = repo_langs
+                    print(f"  ✓ Processed: {repo_full_name} ({total_bytes:,} bytes)")
+                else:
+                    print(f"  ⚠ Skipped {repo_full_name} (no language data)")
+            else:
+                print(f"  ✗ Failed to fetch languages for {repo_full_name} (status: {status})")
+        if planner is not None:
+            planner.report("owned repositories")
+
+        # Also fetch repositories where user has contributed (using GraphQL)
+        print("Fetching repositories with contributions...")
+        with phase("discover contributions"):
+            try:
+                contributed_repos = discover_contributed_repos(client, username)
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                print(f"  Contribution discovery failed ({e}), skipping contribution-based repos")
+                contributed_repos = []
+
+        contributed_names = []
+        for repo_full_name in contributed_repos:
+            if repo_full_name in queued_repos:
+                continue
+        
+            # Skip if user owns this repo (already processed)
+            if repo_full_name.startswith(f"{username}/"):
+                continue
+        
+            queued_repos.add(repo_full_name)
+            contributed_names.append(repo_full_name)
+
+        access_path = plan_languages(planner, "contributed repositories", len(contributed_names))
+        for repo_full_name, repo_langs, status in iter_repo_languages(client, contributed_names, access_path, planner, "contributed repositories"):
+            if status == 200:
+                processed_repos.add(repo_full_name)
+            if status == 200 and repo_langs:  # Only count if repo has language data
+                for lang, bytes_count in repo_langs.items():
+                    languages_data[lang] += bytes_count
+                if repo_languages is not None:
+                    repo_languages[repo_full_name] = repo_langs
+                print(f"  Processed (contribution): {repo_full_name}")
+        if planner is not None:
+            planner.report("contributed repositories")
+
+        # Check for additional repositories user might have contributed to
+        if additional_repos:
+            print(f"Checking {len(additional_repos)} additional repositories...")
+            additional_names = []
+            for repo_full_name in additional_repos:
+                if repo_full_name in queued_repos:
+                    print(f"  Skipping {repo_full_name} (already processed)")
+                    continue
+                additional_names.append(repo_full_name)
+
+            access_path = plan_languages(planner, "additional repositories", len(additional_names))
+            for repo_full_name, repo_langs, status in iter_repo_languages(client, additional_names, access_path, planner, "additional repositories"):
+                if status == 200:
+                    processed_repos.add(repo_full_name)
+                    if repo_langs:
+                        total_bytes = sum(repo_langs.values())
+                        for lang, bytes_count in repo_langs.items():
+                            languages_data[lang] += bytes_count
+                        if repo_languages is not None:
+                            repo_languages[repo_full_name] = repo_langs
+                        print(f"  ✓ Processed (additional): {repo_full_name} ({total_bytes:,} bytes)")
+                    else:
+                        print(f"  ⚠ {repo_full_name} has no language data")
+                else:
+                    print(f"  ✗ Cannot access {repo_full_name} (status: {status})")
+                    if status == 404:
+                        print(f"    Repository not found or not accessible with current token")
+                    elif status == 403:
+                        print(f"    Access forbidden - token may need 'repo' scope")
+            if planner is not None:
+                planner.report("additional repositories")
+
+    except timeout_errors() as e:
+        if client.deadline is None:
+            raise
+        # Render from what was gathered so far
+        client.deadline.partial = True
+        print(f"  ⚠ Stopped early ({e}) after {len(processed_repos)} repositories")
+
+    return languages_data, processed_repos
+
+def refresh_languages(client, username, additional_repos, state, planner=None):
+    """Update the per-repository languages kept in `state`, refetching only touched repositories"""
+    cached = state.get_repo_languages(username)
+    activity = check_activity(client, state, username, "languages")
+    # A changed ADDITIONAL_REPOS list is not visible in the events feed
+    if cached is None or not activity["complete"] or not set(additional_repos) <= set(cached):
+        repo_languages = {}
+        dirty = state.get_dirty(username)
+        fetch_languages(client, username, additional_repos, repo_languages, planner)
+        if client.deadline is not None and client.deadline.partial:
+            # Keep stored data for repositories the deadline cut off, and leave the
+            # feed position uncommitted so the next run backfills with a full fetch
+            state.put_repo_languages(username, {**(cached or {}), **repo_languages})
+            return state.get_languages(username), state.get_repo_languages(username).keys()
+        state.put_repo_languages(username, repo_languages, refreshed_dirty=dirty)
+    elif not activity["repos"]:
+        print("No repository changes since the last run, using the stored languages")
+    else:
+        for repo_full_name in sorted(activity["repos"]):
+            if repo_full_name not in cached and repo_full_name.startswith(f"{username}/"):
+                # A repository new to the totals may be one of the user's forks
+                repo_response = client.get(f"{API_URL}/repos/{repo_full_name}")
+                if repo_response.status_code == 200 and repo_response.json().get("fork"):
+                    print(f"  ⊘ Skipped fork: {repo_full_name}")
+                    continue
+            repo_langs = fetch_repo_languages(client, repo_full_name)
+            state.update_repo_languages(username, repo_full_name, repo_langs)
+            print(f"  ✓ Refreshed: {repo_full_name}")
+    commit_activity(state, username, "languages", activity)
+    return state.get_languages(username), state.get_repo_languages(username).keys()
+
+def fetch_org_languages(client, org, checkpoint_path=None):
+    """Sum language bytes over every non-fork repository of an organization"""
+    # Totals are folded page by page so memory does not grow with the number of
+    # repositories; the cursor and running totals are checkpointed after each page
+    # so an interrupted run resumes where it stopped
+    languages_data = defaultdict(int)
+    repo_count = 0
+    cursor = None
+
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        with open(checkpoint_path, encoding="utf-8") as f:
+            checkpoint = json.load(f)
+        if checkpoint.get("org") == org:
+            cursor = checkpoint["cursor"]
+            repo_count = checkpoint["repo_count"]
+            languages_data.update(checkpoint["languages"])
+            print(f"Resuming {org} from checkpoint ({repo_count} repositories already counted)")
+
+    print(f"Fetching repositories of organization {org}...")
+    while True:
+        try:
+            response = client.post(
+                GRAPHQL_URL,
+                json={"query": ORG_REPOSITORIES_QUERY, "variables": {"org": org, "cursor": cursor}}
+            )
+        except timeout_errors() as e:
+            if client.deadline is None:
+                raise
+            # Render the pages counted so far; the checkpoint lets the next run resume
+            client.deadline.partial = True
+            print(f"  ⚠ Stopped early ({e}) after {repo_count} repositories")
+            return languages_data, repo_count
+        response.raise_for_status()
+        data = response.json()
+        if "errors" in data:
+            raise Exception(f"GraphQL error for organization {org}: {data['errors'][0].get('message', '')}")
+
+        repositories = data["data"]["organization"]["repositories"]
+        for repo in repositories["nodes"]:
+            repo_count += 1
+            for edge in repo["languages"]["edges"]:
+                languages_data[edge["node"]["name"]] += edge["size"]
+        print(f"  ✓ Processed page: {len(repositories['nodes'])} repositories ({repo_count} total)")
+
+        page_info = repositories["pageInfo"]
+        if not page_info["hasNextPage"]:
+            break
+        cursor = page_info["endCursor"]
+
+        if checkpoint_path:
+            tmp_path = f"{checkpoint_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"org": org, "cursor": cursor, "repo_count": repo_count, "languages": languages_data}, f)
+            os.replace(tmp_path, checkpoint_path)
+
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return languages_data, repo_count
+
+def compute_language_percentages(languages_data):
+    """Return (language, percentage) pairs sorted by decreasing share"""
+    # Calculate percentages
+    total_bytes = sum(languages_data.values())
+    if total_bytes == 0:
+        raise Exception("No language data found")
+
+    languages_percentages = {
+        lang: (bytes_count / total_bytes) * 100
+        for lang, bytes_count in languages_data.items()
+    }
+
+    # Sort by percentage and get top languages
+    sorted_languages = sorted(
+        languages_percentages.items(),
+        key=lambda x: x[1],
+        reverse=True
+    )
+
+    return sorted_languages
+
+def render_svg(sorted_languages, partial=False):
+    """Build the languages card SVG document and return it as UTF-8 bytes"""
+    # Imported here so runs that stop before rendering never load the XML stack
+    import xml.etree.ElementTree as ET
+
+    # Language colors (matching common GitHub language colors)
+    lang_colors = {
+        "Python": "#3776ab",
+        "Shell": "#89e051",
+        "PowerShell": "#012456",
+        "JavaScript": "#f7df1e",
+        "TypeScript": "#3178c6",
+        "Java": "#ed8b00",
+        "Go": "#00add8",
+        "Rust": "#000000",
+        "C++": "#00599c",
+        "C": "#a8b9cc",
+        "HTML": "#e34c26",
+        "CSS": "#1572b6",
+        "Dockerfile": "#384d54",
+        "Makefile": "#427819",
+    }
+
+    # Default color palette if language not in map
+    default_colors = ["#3776ab", "#89e051", "#012456", "#f7df1e", "#3178c6", "#ed8b00", "#00add8"]
+
+    # Theme colors (matching image design)
+    colors = {
+        "bg": "#0d1117",
+        "bg_card": "#161b22",
+        "title": "#ff6e96",
+        "text": "#c9d1d9",
+        "border": "#30363d"
+    }
+
+    # Generate SVG
+    svg_width = 495
+    svg_height = 195
+    bar_height = 10
+    bar_y = 60
+    bar_x_start = 20
+    bar_width = svg_width - 40
+    legend_y_start = 90
+    legend_item_height = 25
+
+    svg = ET.Element("svg", {
+        "width": str(svg_width),
+        "height": str(svg_height),
+        "xmlns": "http://www.w3.org/2000/svg"
+    })
+
+    # Background
+    bg = ET.SubElement(svg, "rect", {
+        "width": str(svg_width),
+        "height": str(svg_height),
+        "fill": colors["bg"],
+        "rx": "8"
+    })
+
+    # Card background
+    card = ET.SubElement(svg, "rect", {
+        "x": "10",
+        "y": "10",
+        "width": str(svg_width - 20),
+        "height": str(svg_height - 20),
+        "fill": colors["bg_card"],
+        "rx": "6"
+    })
+
+    # Title
+    title = ET.SubElement(svg, "text", {
+        "x": str(svg_width // 2),
+        "y": "35",
+        "text-anchor": "middle",
+        "font-family": "Segoe UI, -apple-system, BlinkMacSystemFont, sans-serif",
+        "font-size": "18",
+        "font-weight": "700",
+        "fill": colors["title"]
+    })
+    title.text = "Most Used Languages"
+
+    if partial:
+        # Rendered from incomplete data after the deadline; the next run backfills
+        partial_note = ET.SubElement(svg, "text", {
+            "x": str(svg_width - 20),
+            "y": "35",
+            "text-anchor": "end",
+            "font-family": "Segoe UI, -apple-system, BlinkMacSystemFont, sans-serif",
+            "font-size": "10",
+            "fill": colors["text"]
+        })
+        partial_note.text = "partial data"
+
+    # Draw stacked bar
+    current_x = bar_x_start
+    color_index = 0
+
+    for lang, percentage in sorted_languages[:10]:  # Top 10 languages
+        segment_width = (bar_width * percentage) / 100
+        if segment_width < 1:  # Skip very small segments
+            continue
+
+        lang_color = lang_colors.get(lang, default_colors[color_index % len(default_colors)])
+        
+        segment = ET.SubElement(svg, "rect", {
+            "x": str(current_x),
+            "y": str(bar_y),
+            "width": str(segment_width),
+            "height": str(bar_height),
+            "fill": lang_color,
+            "rx": "2"
+        })
+
+        current_x += segment_width
+        color_index += 1
+
+    # Draw legend
+    legend_x = bar_x_start
+    legend_y = legend_y_start
+    items_per_row = 3
+    item_width = bar_width / items_per_row
+    current_row = 0
+    current_col = 0
+
+    for lang, percentage in sorted_languages[:10]:
+        if percentage < 0.1:  # Skip languages with less than 0.1%
+            continue
+
+        x_pos = legend_x + (current_col * item_width)
+        y_pos = legend_y + (current_row * legend_item_height)
+
+        # Color dot
+        lang_color = lang_colors.get(lang, default_colors[(current_row * items_per_row + current_col) % len(default_colors)])
+        dot = ET.SubElement(svg, "circle", {
+            "cx": str(x_pos + 6),
+            "cy": str(y_pos + 6),
+            "r": "5",
+            "fill": lang_color
+        })
+
+        # Language name and percentage
+        lang_text = ET.SubElement(svg, "text", {
+            "x": str(x_pos + 18),
+            "y": str(y_pos + 10),
+            "font-family": "Segoe UI, -apple-system, BlinkMacSystemFont, sans-serif",
+            "font-size": "12",
+            "fill": colors["text"]
+        })
+        lang_text.text = f"{lang} {percentage:.2f}%"
+
+        current_col += 1
+        if current_col >= items_per_row:
+            current_col = 0
+            current_row += 1
+
+    tree = ET.ElementTree(svg)
+    ET.indent(tree, space="  ")
+    return ET.tostring(svg, encoding="utf-8", xml_declaration=True)
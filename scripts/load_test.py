@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Load test the card server
+Starts a local GitHub API stand-in and a card server instance pointed at it, then
+drives card requests with a skewed user population from concurrent clients and
+reports throughput, latency percentiles, upstream calls and server memory growth.
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from fake_github_api import FakeGitHub, start_fake_api
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+CARDS = ["streak-stats.svg", "languages-stats.svg"]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def server_rss_kb(pid):
+    """Resident set size of a process in KiB (Linux only, None elsewhere)"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise Exception(f"Card server did not start listening on port {port}")
+
+
+def fetch_card(port, username, card):
+    started = time.perf_counter()
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+    try:
+        conn.request("GET", f"/{username}/{card}")
+        response = conn.getresponse()
+        response.read()
+        status = response.status
+    except OSError:
+        status = 0
+    finally:
+        conn.close()
+    return status, time.perf_counter() - started
+
+
+def zipf_weights(count, skew):
+    return [1 / (rank ** skew) for rank in range(1, count + 1)]
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_load(port, users, weights, hit_ratio, concurrency, total_requests, seed):
+    """Send total_requests card requests from `concurrency` threads"""
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+    counter = iter(range(total_requests))
+    cold_ids = iter(range(total_requests))
+
+    def worker(worker_id):
+        rng = random.Random(seed * 1000 + worker_id)
+        while True:
+            with lock:
+                if next(counter, None) is None:
+                    return
+                cold_id = next(cold_ids)
+            if rng.random() < hit_ratio:
+                username = rng.choices(users, weights)[0]
+            else:
+                # A user nobody asked for yet is always a cache miss
+                username = f"cold-{seed}-{cold_id}"
+            status, latency = fetch_card(port, username, rng.choice(CARDS))
+            with lock:
+                latencies.append(latency)
+                statuses[status] = statuses.get(status, 0) + 1
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started, sorted(latencies), statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the card server against a local GitHub API stand-in")
+    parser.add_argument("--users", type=int, default=100, help="size of the warm user population")
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent of user popularity (0 = uniform)")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent client threads")
+    parser.add_argument("--requests", type=int, default=2000, help="card requests to send")
+    parser.add_argument("--hit-ratio", type=float, default=0.95, help="share of requests for already-cached users")
+    parser.add_argument("--repos", type=int, default=8, help="repositories per fake user")
+    parser.add_argument("--years", type=int, default=3, help="years of contribution history per fake user")
+    parser.add_argument("--workers", type=int, default=4, help="refresh workers in the card server")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="load-test-result.json", help="machine-readable result file")
+    args = parser.parse_args()
+
+    fake = FakeGitHub(repos_per_user=args.repos, years=args.years)
+    fake_server, api_url = start_fake_api(fake)
+    port = free_port()
+    workdir = tempfile.mkdtemp(prefix="card-load-test-")
+    env = dict(
+        os.environ,
+        GITHUB_TOKEN="load-test",
+        GITHUB_API_URL=api_url,
+        PORT=str(port),
+        REFRESH_WORKERS=str(args.workers),
+        RATE_LIMIT_PER_HOUR=str(10 ** 9),
+        SNAPSHOT_FILE=os.path.join(workdir, "stats-cache.snapshot"),
+    )
+    env.pop("GH_PAT", None)
+    log_path = os.path.join(workdir, "server.log")
+    with open(log_path, "w") as log:
+        server = subprocess.Popen(
+            [sys.executable, os.path.join(SCRIPTS_DIR, "serve_cards.py")],
+            env=env, stdout=log, stderr=subprocess.STDOUT
+        )
+    try:
+        wait_for_port(port)
+        users = [f"user-{index}" for index in range(args.users)]
+        weights = zipf_weights(args.users, args.skew)
+
+        # Warm every user of the population so hit_ratio controls the miss rate
+        print(f"Warming {len(users)} users...")
+        for username in users:
+            for card in CARDS:
+                fetch_card(port, username, card)
+        rss_before = server_rss_kb(server.pid)
+        calls_before = fake.calls
+
+        print(f"Sending {args.requests} requests from {args.concurrency} clients...")
+        elapsed, latencies, statuses = run_load(
+            port, users, weights, args.hit_ratio, args.concurrency, args.requests, args.seed
+        )
+        rss_after = server_rss_kb(server.pid)
+        upstream_calls = fake.calls - calls_before
+    finally:
+        server.terminate()
+        server.wait()
+        fake_server.shutdown()
+
+    result = {
+        "config": vars(args),
+        "requests": len(latencies),
+        "elapsed_seconds": elapsed,
+        "throughput_rps": len(latencies) / elapsed if elapsed else None,
+        "latency_ms": {
+            "p50": percentile(latencies, 50) * 1000,
+            "p90": percentile(latencies, 90) * 1000,
+            "p99": percentile(latencies, 99) * 1000,
+            "max": latencies[-1] * 1000,
+        } if latencies else None,
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "upstream_calls": upstream_calls,
+        "upstream_calls_per_request": upstream_calls / len(latencies) if latencies else None,
+        "server_rss_kb": {"before": rss_before, "after": rss_after},
+        "server_rss_growth_kb": rss_after - rss_before if rss_before is not None and rss_after is not None else None,
+        "server_log": log_path,
+    }
+    with open(args.output, "w") as f:
+        json.dump(result, f, indent=2)
+
+    print(f"\n=== Load test ===")
+    print(f"Throughput: {result['throughput_rps']:.1f} req/s over {elapsed:.2f}s")
+    if latencies:
+        lat = result["latency_ms"]
+        print(f"Latency: p50 {lat['p50']:.1f} ms, p90 {lat['p90']:.1f} ms, p99 {lat['p99']:.1f} ms, max {lat['max']:.1f} ms")
+    print(f"Statuses: {result['statuses']}")
+    print(f"Upstream calls: {upstream_calls} ({result['upstream_calls_per_request']:.2f} per request)")
+    if result["server_rss_growth_kb"] is not None:
+        print(f"Server RSS growth: {result['server_rss_growth_kb']:,} KiB")
+    print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
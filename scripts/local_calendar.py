@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Local contribution calendar
+Builds the {date: count} contribution calendar from the history of local clones,
+without any API calls. Commits on every branch are counted, and a commit reachable
+from several clones (forks, mirrors) is counted once.
+"""
+import argparse
+import subprocess
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+
+def commit_dates(repo_path, authors):
+    """Return [(sha, date)] for the commits of the given authors on every ref of a clone"""
+    command = ["git", "-C", repo_path, "log", "--all", "--format=%H %ad", "--date=short"]
+    # --author patterns are OR-ed together by git
+    command += [f"--author={author}" for author in authors]
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    commits = []
+    for line in output.splitlines():
+        sha, _, day = line.partition(" ")
+        if day:
+            commits.append((sha, date.fromisoformat(day)))
+    return commits
+
+
+def local_calendar(repo_paths, authors, workers=None):
+    """Count commits per day across local clones, deduplicated by commit SHA"""
+    seen = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [(repo_path, pool.submit(commit_dates, repo_path, authors)) for repo_path in repo_paths]
+        for repo_path, future in futures:
+            try:
+                commits = future.result()
+            except subprocess.CalledProcessError as e:
+                print(f"  ✗ Error reading history of {repo_path}: {e.stderr.strip()}")
+                continue
+            for sha, day in commits:
+                seen.setdefault(sha, day)
+            print(f"  ✓ Read: {repo_path} ({len(commits):,} commits)")
+
+    contributions_by_date = defaultdict(int)
+    for day in seen.values():
+        contributions_by_date[day] += 1
+    return dict(contributions_by_date)
+
+
+def merge_calendars(*calendars):
+    """Merge {date: count} calendars, keeping the maximum count per day"""
+    # The sources overlap (a pushed commit is in both), so summing would double count
+    merged = {}
+    for calendar in calendars:
+        for day, count in calendar.items():
+            merged[day] = max(merged.get(day, 0), count)
+    return merged
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count commits per day across local git clones")
+    parser.add_argument("clones", nargs="+", help="paths to git clones")
+    parser.add_argument("--author", action="append", required=True, help="author name or email pattern (repeatable)")
+    parser.add_argument("--workers", type=int, help="worker processes")
+    args = parser.parse_args()
+    contributions_by_date = local_calendar(args.clones, args.author, args.workers)
+    for day in sorted(contributions_by_date):
+        print(f"  {day.isoformat()}: {contributions_by_date[day]}")
+    print(f"Total: {sum(contributions_by_date.values()):,} commits on {len(contributions_by_date):,} days")
+
+if __name__ == "__main__":
+    main()
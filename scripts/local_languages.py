@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+"""
+Local checkout language analysis
+Classifies the tracked files of git checkouts with Linguist-compatible rules and
+sums their bytes per language, without any API calls. With a blob cache, only
+blobs never seen before are classified; everything else is summed from the cache.
+"""
+import argparse
+import mmap
+import os
+import re
+import subprocess
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+# Bytes read from the start of a file when its content decides the language
+HEADER_BYTES = 1024
+# Files handed to a worker process at a time
+CHUNK_SIZE = 2000
+# SQLite's default limit on bound parameters is 999
+LOOKUP_BATCH = 900
+
+# Only programming and markup languages count towards GitHub's language stats;
+# data and prose (JSON, YAML, Markdown, ...) are left out just like Linguist does
+EXTENSIONS = {
+    ".py": "Python", ".pyw": "Python", ".pyi": "Python", ".pyx": "Cython",
+    ".sh": "Shell", ".bash": "Shell", ".zsh": "Shell", ".ksh": "Shell",
+    ".ps1": "PowerShell", ".psm1": "PowerShell", ".psd1": "PowerShell",
+    ".js": "JavaScript", ".mjs": "JavaScript", ".cjs": "JavaScript", ".jsx": "JavaScript",
+    ".ts": "TypeScript", ".mts": "TypeScript", ".cts": "TypeScript", ".tsx": "TypeScript",
+    ".java": "Java", ".kt": "Kotlin", ".kts": "Kotlin", ".scala": "Scala", ".groovy": "Groovy",
+    ".go": "Go", ".rs": "Rust", ".swift": "Swift", ".dart": "Dart",
+    ".c": "C", ".h": "C",
+    ".cc": "C++", ".cpp": "C++", ".cxx": "C++", ".c++": "C++", ".hh": "C++", ".hpp": "C++", ".hxx": "C++",
+    ".m": "Objective-C", ".mm": "Objective-C++",
+    ".cs": "C#", ".fs": "F#", ".vb": "Visual Basic .NET",
+    ".rb": "Ruby", ".php": "PHP", ".pl": "Perl", ".pm": "Perl", ".lua": "Lua", ".r": "R",
+    ".jl": "Julia", ".ex": "Elixir", ".exs": "Elixir", ".erl": "Erlang", ".hs": "Haskell",
+    ".clj": "Clojure", ".cljs": "Clojure", ".ml": "OCaml", ".zig": "Zig", ".nim": "Nim",
+    ".v": "Verilog", ".sv": "SystemVerilog", ".vhd": "VHDL", ".vhdl": "VHDL",
+    ".sql": "SQL", ".pls": "PLSQL",
+    ".html": "HTML", ".htm": "HTML", ".xhtml": "HTML",
+    ".css": "CSS", ".scss": "SCSS", ".sass": "Sass", ".less": "Less",
+    ".vue": "Vue", ".svelte": "Svelte",
+    ".jinja": "Jinja", ".j2": "Jinja", ".hbs": "Handlebars", ".ejs": "EJS",
+    ".tex": "TeX", ".cmake": "CMake", ".mk": "Makefile", ".mak": "Makefile",
+    ".dockerfile": "Dockerfile", ".tf": "HCL", ".hcl": "HCL", ".nix": "Nix",
+    ".asm": "Assembly", ".s": "Assembly", ".wasm": "WebAssembly", ".sol": "Solidity",
+    ".bat": "Batchfile", ".cmd": "Batchfile", ".awk": "Awk", ".vim": "Vim Script",
+    ".el": "Emacs Lisp", ".lisp": "Common Lisp", ".scm": "Scheme", ".rkt": "Racket",
+    ".coffee": "CoffeeScript", ".elm": "Elm", ".purs": "PureScript", ".cr": "Crystal",
+    ".d": "D", ".f90": "Fortran", ".f": "Fortran", ".pas": "Pascal", ".ada": "Ada",
+    ".gd": "GDScript", ".glsl": "GLSL", ".hlsl": "HLSL", ".cu": "Cuda", ".proto": "Protocol Buffer",
+}
+
+FILENAMES = {
+    "Dockerfile": "Dockerfile", "Containerfile": "Dockerfile",
+    "Makefile": "Makefile", "GNUmakefile": "Makefile", "makefile": "Makefile",
+    "CMakeLists.txt": "CMake", "Rakefile": "Ruby", "Gemfile": "Ruby", "Podfile": "Ruby",
+    "Vagrantfile": "Ruby", "Jenkinsfile": "Groovy", "BUILD": "Starlark", "BUILD.bazel": "Starlark",
+    "WORKSPACE": "Starlark", "meson.build": "Meson", "justfile": "Just", "PKGBUILD": "Shell",
+}
+
+# Interpreters named on a #! line of files without a known extension
+INTERPRETERS = {
+    "python": "Python", "python2": "Python", "python3": "Python",
+    "sh": "Shell", "bash": "Shell", "zsh": "Shell", "ksh": "Shell", "dash": "Shell",
+    "node": "JavaScript", "deno": "TypeScript", "ts-node": "TypeScript",
+    "ruby": "Ruby", "perl": "Perl", "php": "PHP", "lua": "Lua", "pwsh": "PowerShell",
+    "Rscript": "R", "escript": "Erlang", "make": "Makefile", "awk": "Awk",
+}
+
+# Extensions shared by several languages, resolved by looking at the file header
+AMBIGUOUS = {".h", ".m", ".pl", ".ts", ".v"}
+
+# Subset of Linguist's vendor.yml and documentation.yml
+VENDORED = re.compile(
+    r"(^|/)(node_modules|bower_components|vendor|vendors|third[-_]?party|deps|Godeps|Carthage|Pods)/"
+    r"|(^|/)\.(git|yarn|venv|tox)/"
+    r"|(^|/)(venv|\.?virtualenv)/"
+    r"|(^|/)(jquery|bootstrap|modernizr|d3)([.-][\d.]+)?(\.min)?\.(js|css)$"
+    r"|(^|/)gradlew(\.bat)?$|(^|/)mvnw(\.cmd)?$"
+)
+DOCUMENTATION = re.compile(r"^(docs?|Documentation|documentation)/|(^|/)(examples?|samples?)/")
+# Subset of Linguist's generated.rb: path-based rules
+GENERATED_PATHS = re.compile(
+    r"\.min\.(js|css)$|\.(js|css)\.map$|\.pb\.(go|cc|h)$|_pb2(_grpc)?\.py$|\.designer\.cs$"
+    r"|(^|/)(package-lock\.json|yarn\.lock|pnpm-lock\.yaml|Cargo\.lock|poetry\.lock|go\.sum)$"
+    r"|(^|/)__generated__/|\.g\.dart$|\.freezed\.dart$"
+)
+# ...and content-based rules, checked in the header of files that may carry them
+GENERATED_MARKERS = re.compile(rb"Code generated .* DO NOT EDIT|@generated|<auto-generated|Generated by the protocol buffer compiler")
+MARKER_LANGUAGES = {"Go", "C#", "Java", "Kotlin", "JavaScript", "TypeScript", "Python", "Dart", "Swift"}
+# Bump when the classification code changes meaning; rule table edits are picked up by rules_fingerprint
+CLASSIFIER_VERSION = 1
+
+
+def read_header(path, size=HEADER_BYTES):
+    """Return the first `size` bytes of a file through a read-only mmap"""
+    with open(path, "rb") as f:
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return mapped[:size]
+        except ValueError:
+            # Empty files cannot be mapped
+            return b""
+
+
+def _disambiguate(extension, header):
+    if extension == ".h":
+        if re.search(rb"^\s*(@interface|@protocol|@end|#import)\b", header, re.M):
+            return "Objective-C"
+        if re.search(rb"\b(class|namespace|template\s*<|std::|public:|private:)", header):
+            return "C++"
+        return "C"
+    if extension == ".m":
+        if re.search(rb"^\s*(@interface|@implementation|@protocol|#import)\b", header, re.M):
+            return "Objective-C"
+        if re.search(rb"^\s*(%|function\b)", header, re.M):
+            return "MATLAB"
+        return "Objective-C"
+    if extension == ".pl":
+        if re.search(rb"^\s*:-|^[a-z]\w*\(.*\)\s*:-", header, re.M):
+            return "Prolog"
+        return "Perl"
+    if extension == ".ts":
+        if header.lstrip().startswith((b"<?xml", b"<TS")):
+            # Qt Linguist translation files are XML data
+            return None
+        return "TypeScript"
+    if extension == ".v":
+        if re.search(rb"^\s*(Require|Theorem|Lemma|Proof|Inductive|Definition)\b", header, re.M):
+            return "Coq"
+        return "Verilog"
+    return EXTENSIONS.get(extension)
+
+
+def _interpreter_language(header):
+    if not header.startswith(b"#!"):
+        return None
+    words = header[2:].split(b"\n", 1)[0].decode("utf-8", "replace").split()
+    if not words:
+        return None
+    interpreter = os.path.basename(words[0])
+    if interpreter == "env":
+        arguments = [word for word in words[1:] if not word.startswith("-")]
+        interpreter = arguments[0] if arguments else ""
+    # python3.12 -> python3 -> python
+    return INTERPRETERS.get(interpreter) or INTERPRETERS.get(re.sub(r"[\d.]+$", "", interpreter))
+
+
+def path_rules(path, attributes):
+    """Apply the rules that depend only on a file's path: (excluded, forced language)"""
+    # .gitattributes overrides, as honoured by Linguist
+    if attributes.get("linguist-vendored") == "set" or attributes.get("linguist-generated") == "set":
+        return True, None
+    if attributes.get("linguist-documentation") == "set":
+        return True, None
+    forced = attributes.get("linguist-language")
+    if forced and forced not in ("unspecified", "unset", "set"):
+        return False, forced
+
+    if attributes.get("linguist-vendored") != "unset" and VENDORED.search(path):
+        return True, None
+    if attributes.get("linguist-documentation") != "unset" and DOCUMENTATION.search(path):
+        return True, None
+    if attributes.get("linguist-generated") != "unset" and GENERATED_PATHS.search(path):
+        return True, None
+    return False, None
+
+
+def name_rule(path):
+    """Return (language suggested by the file name, whether the header must be read)"""
+    name = os.path.basename(path)
+    language = FILENAMES.get(name)
+    if language is not None:
+        return language, False
+    extension = os.path.splitext(name)[1].lower()
+    if extension in AMBIGUOUS or not extension:
+        return None, True
+    language = EXTENSIONS.get(extension)
+    return language, language in MARKER_LANGUAGES
+
+
+def rule_key(path, check_generated):
+    """Identify which name-based rule a file falls under, for caching its verdict"""
+    name = os.path.basename(path)
+    if name in FILENAMES:
+        return f"name:{name}:{int(check_generated)}"
+    return f"ext:{os.path.splitext(name)[1].lower()}:{int(check_generated)}"
+
+
+def content_language(path, language, header, check_generated=True):
+    """Finish classifying a file from its header, given its name_rule language"""
+    if b"\0" in header:
+        # Binary content never counts
+        return None
+    if check_generated and GENERATED_MARKERS.search(header):
+        return None
+    extension = os.path.splitext(os.path.basename(path))[1].lower()
+    if extension in AMBIGUOUS:
+        return _disambiguate(extension, header)
+    if language is None:
+        return _interpreter_language(header)
+    return language
+
+
+def classify(path, full_path, attributes=None):
+    """Return the language a tracked file counts towards, or None if it is excluded"""
+    attributes = attributes or {}
+    excluded, forced = path_rules(path, attributes)
+    if excluded:
+        return None
+    if forced:
+        return forced
+    language, needs_header = name_rule(path)
+    if not needs_header:
+        return language
+    return content_language(path, language, read_header(full_path), attributes.get("linguist-generated") != "unset")
+
+
+def _scan_chunk(repo_path, entries):
+    totals = Counter()
+    for path, attributes in entries:
+        full_path = os.path.join(repo_path, path)
+        try:
+            # Symlinks and submodules are not counted
+            if os.path.islink(full_path) or not os.path.isfile(full_path):
+                continue
+            language = classify(path, full_path, attributes)
+            if language:
+                totals[language] += os.path.getsize(full_path)
+        except OSError:
+            continue
+    return totals
+
+
+def tracked_files(repo_path):
+    """List the files tracked in a checkout's index"""
+    output = subprocess.run(
+        ["git", "-C", repo_path, "ls-files", "-z"],
+        check=True, capture_output=True
+    ).stdout
+    return [path for path in output.decode("utf-8", "surrogateescape").split("\0") if path]
+
+
+def linguist_attributes(repo_path, paths):
+    """Return {path: {attribute: value}} for paths with any linguist-* attribute set"""
+    names = ["linguist-vendored", "linguist-generated", "linguist-documentation", "linguist-language"]
+    output = subprocess.run(
+        ["git", "-C", repo_path, "check-attr", "-z", "--stdin"] + names,
+        input="\0".join(paths).encode("utf-8", "surrogateescape"),
+        check=True, capture_output=True
+    ).stdout
+    fields = output.decode("utf-8", "surrogateescape").split("\0")
+    attributes = defaultdict(dict)
+    for i in range(0, len(fields) - 2, 3):
+        path, name, value = fields[i:i + 3]
+        if value != "unspecified":
+            attributes[path][name] = value
+    return attributes
+
+
+def rules_fingerprint():
+    """Hash of every rule table and constant a cached classification depends on"""
+    import hashlib
+
+    rules = (
+        CLASSIFIER_VERSION, HEADER_BYTES, sorted(EXTENSIONS.items()), sorted(FILENAMES.items()),
+        sorted(INTERPRETERS.items()), sorted(AMBIGUOUS), VENDORED.pattern, DOCUMENTATION.pattern,
+        GENERATED_PATHS.pattern, GENERATED_MARKERS.pattern, sorted(MARKER_LANGUAGES)
+    )
+    return hashlib.sha256(repr(rules).encode()).hexdigest()
+
+
+class BlobCache:
+    """Persistent classification of git blobs, keyed by blob SHA and naming rule"""
+    # The same content can classify differently under another file name, so the
+    # rule_key is part of the key; path-only rules are cheap and re-applied every run.
+    # Classifications made under other rule tables are dropped when the cache is opened
+
+    def __init__(self, path):
+        # Only runs with a blob cache pay for loading sqlite3
+        import sqlite3
+
+        self.db = sqlite3.connect(path)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS blobs ("
+            "sha TEXT NOT NULL, rule TEXT NOT NULL, language TEXT, size INTEGER NOT NULL, "
+            "PRIMARY KEY (sha, rule)) WITHOUT ROWID"
+        )
+        self.db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        fingerprint = rules_fingerprint()
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'rules'").fetchone()
+        if row is None or row[0] != fingerprint:
+            if row is not None:
+                print(f"  ⚠ Classification rules changed, discarding the blob cache {path}")
+            with self.db:
+                self.db.execute("DELETE FROM blobs")
+                self.db.execute("INSERT OR REPLACE INTO meta VALUES ('rules', ?)", (fingerprint,))
+
+    def lookup(self, keys):
+        """Return {(sha, rule): language} for the keys already classified"""
+        found = {}
+        shas = sorted({sha for sha, _ in keys})
+        for i in range(0, len(shas), LOOKUP_BATCH):
+            batch = shas[i:i + LOOKUP_BATCH]
+            rows = self.db.execute(
+                f"SELECT sha, rule, language FROM blobs WHERE sha IN ({','.join('?' * len(batch))})",
+                batch
+            )
+            for sha, rule, language in rows:
+                found[(sha, rule)] = language
+        return found
+
+    def store(self, rows):
+        """Record (sha, rule, language, size) rows"""
+        with self.db:
+            self.db.executemany("INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?)", rows)
+
+    def close(self):
+        self.db.close()
+
+
+def list_tree(repo_path, rev="HEAD"):
+    """Yield (path, blob SHA, size) for every file blob of a commit"""
+    output = subprocess.run(
+        ["git", "-C", repo_path, "ls-tree", "-r", "-l", "-z", rev],
+        check=True, capture_output=True
+    ).stdout
+    for record in output.split(b"\0"):
+        if not record:
+            continue
+        meta, path = record.split(b"\t", 1)
+        mode, kind, sha, size = meta.split()
+        # Submodules (commits) and symlinks are not counted
+        if kind != b"blob" or mode == b"120000":
+            continue
+        yield path.decode("utf-8", "surrogateescape"), sha.decode("ascii"), int(size)
+
+
+def _classify_blobs(repo_path, items):
+    """Classify blobs from their content, read through one git cat-file process"""
+    results = []
+    with subprocess.Popen(
+        ["git", "-C", repo_path, "cat-file", "--batch"],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE
+    ) as process:
+        for sha, rule, path, language, check_generated in items:
+            process.stdin.write(f"{sha}\n".encode("ascii"))
+            process.stdin.flush()
+            header_line = process.stdout.readline().split()
+            if len(header_line) < 3 or header_line[1] != b"blob":
+                results.append((sha, rule, None))
+                continue
+            content = process.stdout.read(int(header_line[2]) + 1)
+            results.append((sha, rule, content_language(path, language, content[:HEADER_BYTES], check_generated)))
+        process.stdin.close()
+    return results
+
+
+def scan_tree(repo_path, cache, pool, rev="HEAD"):
+    """Sum bytes per language over a commit's blobs, classifying only unseen blobs"""
+    entries = list(list_tree(repo_path, rev))
+    attributes = linguist_attributes(repo_path, [path for path, _, _ in entries]) if entries else {}
+    totals = defaultdict(int)
+    candidates = []
+    for path, sha, size in entries:
+        file_attributes = attributes.get(path) or {}
+        excluded, forced = path_rules(path, file_attributes)
+        if excluded:
+            continue
+        if forced:
+            totals[forced] += size
+            continue
+        check_generated = file_attributes.get("linguist-generated") != "unset"
+        candidates.append((sha, rule_key(path, check_generated), path, size, check_generated))
+
+    known = cache.lookup([(sha, rule) for sha, rule, _, _, _ in candidates])
+    new_rows = {}
+    to_read = {}
+    waiting = []
+    for sha, rule, path, size, check_generated in candidates:
+        key = (sha, rule)
+        if key in known:
+            language = known[key]
+        elif key in new_rows:
+            language = new_rows[key][2]
+        else:
+            language, needs_header = name_rule(path)
+            if needs_header:
+                to_read.setdefault(key, (sha, rule, path, language, check_generated, size))
+                waiting.append((key, size))
+                continue
+            new_rows[key] = (sha, rule, language, size)
+        if language:
+            totals[language] += size
+
+    items = [item[:5] for item in to_read.values()]
+    futures = [
+        pool.submit(_classify_blobs, repo_path, items[i:i + CHUNK_SIZE])
+        for i in range(0, len(items), CHUNK_SIZE)
+    ]
+    read_languages = {}
+    for future in futures:
+        for sha, rule, language in future.result():
+            read_languages[(sha, rule)] = language
+            new_rows[(sha, rule)] = (sha, rule, language, to_read[(sha, rule)][5])
+    for key, size in waiting:
+        if read_languages.get(key):
+            totals[read_languages[key]] += size
+
+    cache.store(list(new_rows.values()))
+    print(f"  ✓ Scanned: {repo_path} ({len(entries):,} blobs, {len(new_rows):,} newly classified)")
+    return totals
+
+
+def scan_checkouts(repo_paths, workers=None, cache_path=None):
+    """Sum bytes per language over the tracked files of local git checkouts"""
+    languages_data = defaultdict(int)
+    if cache_path:
+        # Incremental mode: classify the committed tree (HEAD) through the blob cache
+        cache = BlobCache(cache_path)
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for repo_path in repo_paths:
+                    for language, bytes_count in scan_tree(repo_path, cache, pool).items():
+                        languages_data[language] += bytes_count
+        finally:
+            cache.close()
+        return languages_data
+
+    # Without a cache, classify the checked-out files of the index directly
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = []
+        for repo_path in repo_paths:
+            paths = tracked_files(repo_path)
+            attributes = linguist_attributes(repo_path, paths) if paths else {}
+            entries = [(path, attributes.get(path)) for path in paths]
+            for i in range(0, len(entries), CHUNK_SIZE):
+                futures.append(pool.submit(_scan_chunk, repo_path, entries[i:i + CHUNK_SIZE]))
+            print(f"  ✓ Listed: {repo_path} ({len(paths):,} tracked files)")
+        for future in futures:
+            for language, bytes_count in future.result().items():
+                languages_data[language] += bytes_count
+    return languages_data
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sum language bytes over local git checkouts")
+    parser.add_argument("checkouts", nargs="+", help="paths to git checkouts")
+    parser.add_argument("--cache", help="blob classification cache (SQLite file) for incremental scans")
+    parser.add_argument("--workers", type=int, help="worker processes")
+    args = parser.parse_args()
+    languages_data = scan_checkouts(args.checkouts, args.workers, args.cache)
+    total_bytes = sum(languages_data.values())
+    for lang, bytes_count in sorted(languages_data.items(), key=lambda x: x[1], reverse=True):
+        print(f"  {lang:15s}: {bytes_count / total_bytes * 100:6.2f}% ({bytes_count:,} bytes)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Run metrics
+Counts API requests by endpoint and status with latency histograms, bytes
+received, rate-limit points, cache hits, time per phase and peak RSS, and writes
+them as JSON and optionally in Prometheus text exposition format. Enabled with
+METRICS_FILE and/or METRICS_PROM; otherwise nothing is collected.
+"""
+import json
+import os
+import re
+import resource
+import threading
+import time
+from urllib.parse import urlparse
+
+import phases
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# URL paths reduced to endpoint templates, so labels do not grow with users or repositories
+ENDPOINT_PATTERNS = [
+    (re.compile(r"^/users/[^/]+/repos$"), "/users/{user}/repos"),
+    (re.compile(r"^/users/[^/]+/events$"), "/users/{user}/events"),
+    (re.compile(r"^/orgs/[^/]+/repos$"), "/orgs/{org}/repos"),
+    (re.compile(r"^/repos/[^/]+/[^/]+/languages$"), "/repos/{repo}/languages"),
+    (re.compile(r"^/repos/[^/]+/[^/]+$"), "/repos/{repo}"),
+]
+
+
+def endpoint_label(url):
+    path = urlparse(url).path
+    # GitHub Enterprise serves the API under /api/v3
+    if path.startswith("/api/v3/"):
+        path = path[len("/api/v3"):]
+    for pattern, label in ENDPOINT_PATTERNS:
+        if pattern.match(path):
+            return label
+    return path if path in ("/graphql", "/search/issues") else "other"
+
+
+def peak_rss_kb():
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class Metrics:
+    """Thread-safe collector fed by GitHubClient and the phase observers"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = {}
+        self.latency = {}
+        self.bytes_received = 0
+        self.points = 0
+        self.cache_hits = 0
+        self.phases = {}
+        self._phase_starts = {}
+        self._rate_used = {}
+
+    def observe_request(self, method, url, response, seconds):
+        """Record one API call; `response` may come from the ETag cache"""
+        endpoint = endpoint_label(url)
+        status = response.status_code
+        cache_hit = getattr(response, "from_cache", False)
+        with self.lock:
+            key = (method, endpoint, status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            histogram = self.latency.setdefault(endpoint, {"buckets": [0] * len(LATENCY_BUCKETS), "sum": 0.0, "count": 0})
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    histogram["buckets"][index] += 1
+            histogram["sum"] += seconds
+            histogram["count"] += 1
+            if cache_hit:
+                self.cache_hits += 1
+            else:
+                self.bytes_received += len(response.content)
+            self.points += self._points(response, cache_hit)
+
+    def _points(self, response, cache_hit):
+        # X-RateLimit-Used grows by what a request cost (GraphQL queries can cost more
+        # than one point); without a previous value, count one point per charged request
+        resource_name = response.headers.get("X-RateLimit-Resource", "core")
+        try:
+            used = int(response.headers["X-RateLimit-Used"])
+        except (KeyError, ValueError):
+            return 0 if cache_hit else 1
+        previous = self._rate_used.get(resource_name)
+        self._rate_used[resource_name] = used
+        if previous is None or used < previous:
+            return 0 if cache_hit else 1
+        return used - previous
+
+    def observe_phase(self, event, name):
+        now = time.perf_counter()
+        key = (threading.get_ident(), name)
+        with self.lock:
+            if event == "start":
+                self._phase_starts[key] = now
+                return
+            started = self._phase_starts.pop(key, None)
+            if started is None:
+                return
+            entry = self.phases.setdefault(name, {"seconds": 0.0, "count": 0})
+            entry["seconds"] += now - started
+            entry["count"] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "requests": [
+                    {"method": method, "endpoint": endpoint, "status": status, "count": count}
+                    for (method, endpoint, status), count in sorted(self.requests.items())
+                ],
+                "latency_seconds": {
+                    endpoint: {
+                        "buckets": dict(zip((str(bound) for bound in LATENCY_BUCKETS), histogram["buckets"])),
+                        "sum": histogram["sum"],
+                        "count": histogram["count"]
+                    }
+                    for endpoint, histogram in sorted(self.latency.items())
+                },
+                "bytes_received": self.bytes_received,
+                "rate_limit_points": self.points,
+                "cache_hits": self.cache_hits,
+                "phases": {name: dict(entry) for name, entry in self.phases.items()},
+                "peak_rss_kb": peak_rss_kb()
+            }
+
+    def to_prometheus(self):
+        """Render the metrics in Prometheus text exposition format"""
+        data = self.snapshot()
+        lines = [
+            "# HELP github_stats_requests_total API requests by endpoint and status",
+            "# TYPE github_stats_requests_total counter"
+        ]
+        for entry in data["requests"]:
+            lines.append(
+                f'github_stats_requests_total{{method="{entry["method"]}",endpoint="{entry["endpoint"]}",'
+                f'status="{entry["status"]}"}} {entry["count"]}'
+            )
+        lines += [
+            "# HELP github_stats_request_duration_seconds API request latency",
+            "# TYPE github_stats_request_duration_seconds histogram"
+        ]
+        for endpoint, histogram in data["latency_seconds"].items():
+            for bound, count in histogram["buckets"].items():
+                lines.append(f'github_stats_request_duration_seconds_bucket{{endpoint="{endpoint}",le="{bound}"}} {count}')
+            lines.append(f'github_stats_request_duration_seconds_bucket{{endpoint="{endpoint}",le="+Inf"}} {histogram["count"]}')
+            lines.append(f'github_stats_request_duration_seconds_sum{{endpoint="{endpoint}"}} {histogram["sum"]}')
+            lines.append(f'github_stats_request_duration_seconds_count{{endpoint="{endpoint}"}} {histogram["count"]}')
+        for name, kind, help_text, value in (
+            ("bytes_received_total", "counter", "Response bytes received from the API", data["bytes_received"]),
+            ("rate_limit_points_total", "counter", "Rate-limit points consumed", data["rate_limit_points"]),
+            ("cache_hits_total", "counter", "Requests answered from the ETag cache", data["cache_hits"]),
+            ("peak_rss_kilobytes", "gauge", "Peak resident set size of the process", data["peak_rss_kb"]),
+        ):
+            lines += [f"# HELP github_stats_{name} {help_text}", f"# TYPE github_stats_{name} {kind}", f"github_stats_{name} {value}"]
+        lines += [
+            "# HELP github_stats_phase_seconds_total Wall time spent in each phase",
+            "# TYPE github_stats_phase_seconds_total counter"
+        ]
+        for name, entry in data["phases"].items():
+            lines.append(f'github_stats_phase_seconds_total{{phase="{name}"}} {entry["seconds"]}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, json_path=None, prom_path=None):
+        for path, content in ((json_path, lambda: json.dumps(self.snapshot(), indent=2)), (prom_path, self.to_prometheus)):
+            if not path:
+                continue
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(content())
+            os.replace(tmp_path, path)
+
+
+def metrics_from_env():
+    """Return a Metrics observing every phase if METRICS_FILE or METRICS_PROM is set, else None"""
+    if not (os.environ.get("METRICS_FILE") or os.environ.get("METRICS_PROM")):
+        return None
+    metrics = Metrics()
+    phases.add_observer(metrics.observe_phase)
+    return metrics
+
+
+def write_from_env(metrics):
+    if metrics is not None:
+        metrics.write(os.environ.get("METRICS_FILE"), os.environ.get("METRICS_PROM"))
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks of the CPU-bound steps
+Times calendar merging, week rebuilding, streak computation, language
+aggregation and sorting, and SVG construction over synthetic inputs of 1 to 50
+years and 10 to 10,000 languages/repositories. `run` saves the results as a
+JSON baseline; `compare` fails when a benchmark got slower than the threshold.
+
+Timings only compare on the same machine, so the baseline is not committed
+(.microbench-baseline.json is ignored) and the gate is run by hand before
+merging changes to these steps: `run` on the base revision, then
+`compare .microbench-baseline.json` on the change.
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import timeit
+from datetime import date, timedelta
+
+import languages_stats
+import streak_stats
+from local_calendar import merge_calendars
+from stats_cache import _sum_languages
+
+YEARS = (1, 10, 50)
+LANGUAGE_COUNTS = (10, 1000, 10000)
+REPEATS = 5
+# Slowdowns smaller than this are timer noise, whatever their share of the baseline
+NOISE_SECONDS = 0.00002
+
+
+def synthetic_calendar(years, seed=0):
+    """{date: count} for `years` years up to today, with gaps and bursts"""
+    rng = random.Random(f"calendar:{years}:{seed}")
+    today = date.today()
+    return {
+        today - timedelta(days=offset): rng.choice([0, 0, 0, 1, 2, 3, 5, 13])
+        for offset in range(365 * years)
+    }
+
+
+def synthetic_weeks(calendar):
+    """The calendar as GraphQL contributionCalendar weeks, with the yearly windows overlapping by a week"""
+    days = [{"date": day.isoformat(), "contributionCount": count} for day, count in sorted(calendar.items())]
+    weeks = [{"contributionDays": days[i:i + 7]} for i in range(0, len(days), 7)]
+    # Consecutive 1-year windows share their boundary week
+    return weeks + weeks[::52]
+
+
+def synthetic_repos(count, seed=0):
+    """{repo: {language: bytes}} for `count` repositories over `count` distinct languages"""
+    rng = random.Random(f"repos:{count}:{seed}")
+    languages = [f"Language{index}" for index in range(count)]
+    return {
+        f"owner/repo-{index}": {lang: rng.randint(1_000, 500_000) for lang in rng.sample(languages, min(count, 4))}
+        for index in range(count)
+    }
+
+
+def benchmarks():
+    """{name: zero-argument callable} for every benchmark and input size"""
+    cases = {}
+    for years in YEARS:
+        calendar = synthetic_calendar(years)
+        local = synthetic_calendar(years, seed=1)
+        weeks = synthetic_weeks(calendar)
+        stats = streak_stats.compute_streaks(calendar)
+        cases[f"merge_contribution_weeks[{years}y]"] = lambda weeks=weeks: streak_stats.merge_contribution_weeks(weeks)
+        cases[f"merge_calendars[{years}y]"] = lambda calendar=calendar, local=local: merge_calendars(local, calendar)
+        cases[f"rebuild_weeks[{years}y]"] = lambda calendar=calendar: streak_stats.rebuild_weeks(calendar)
+        cases[f"compute_streaks[{years}y]"] = lambda calendar=calendar: streak_stats.compute_streaks(calendar)
+        cases[f"render_streak_svg[{years}y]"] = lambda stats=stats: streak_stats.render_svg(stats)
+    for count in LANGUAGE_COUNTS:
+        repos = synthetic_repos(count)
+        languages_data = _sum_languages(repos)
+        sorted_languages = languages_stats.compute_language_percentages(languages_data)
+        cases[f"sum_languages[{count}]"] = lambda repos=repos: _sum_languages(repos)
+        cases[f"compute_language_percentages[{count}]"] = lambda data=languages_data: languages_stats.compute_language_percentages(data)
+        cases[f"render_languages_svg[{count}]"] = lambda langs=sorted_languages: languages_stats.render_svg(langs)
+    return cases
+
+
+def run(selected=None):
+    """Best-of-REPEATS seconds per call of each benchmark"""
+    results = {}
+    for name, case in benchmarks().items():
+        if selected and not any(pattern in name for pattern in selected):
+            continue
+        timer = timeit.Timer(case)
+        # Enough calls per repeat to take at least 0.2s, so short cases are not noise
+        number, _ = timer.autorange()
+        results[name] = min(timer.repeat(repeat=REPEATS, number=number)) / number
+        print(f"  {name:45s} {results[name] * 1000:10.3f} ms")
+    return results
+
+
+def compare(baseline, current, threshold):
+    """Print the change of every benchmark; returns the names slower than 1 + threshold"""
+    regressions = []
+    print(f"{'benchmark':45s} {'baseline':>11s} {'current':>11s} {'change':>8s}")
+    for name, seconds in sorted(current.items()):
+        before = baseline.get(name)
+        if before is None:
+            print(f"{name:45s} {'-':>11s} {seconds * 1000:9.3f}ms {'new':>8s}")
+            continue
+        ratio = seconds / before
+        marker = ""
+        if ratio > 1 + threshold and seconds - before > NOISE_SECONDS:
+            regressions.append(name)
+            marker = " ✗"
+        print(f"{name:45s} {before * 1000:9.3f}ms {seconds * 1000:9.3f}ms {ratio - 1:+7.0%}{marker}")
+    return regressions
+
+
+def load_results(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["results"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks of calendar, streak, language and SVG code")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    run_parser = subparsers.add_parser("run", help="run the benchmarks and save the results")
+    run_parser.add_argument("--output", default=".microbench-baseline.json", help="JSON file the results are saved to")
+    run_parser.add_argument("--only", action="append", help="run benchmarks whose name contains this (repeatable)")
+    compare_parser = subparsers.add_parser("compare", help="fail if results regressed against a baseline")
+    compare_parser.add_argument("baseline", help="baseline JSON saved by run")
+    compare_parser.add_argument("current", nargs="?", help="results to check (default: run the benchmarks now)")
+    compare_parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown, as a share of the baseline")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        print("Running micro-benchmarks...")
+        results = run(args.only)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(), "results": results}, f, indent=2)
+        print(f"✓ Saved {len(results)} results to {args.output}")
+        return
+
+    baseline = load_results(args.baseline)
+    if args.current:
+        current = load_results(args.current)
+    else:
+        print("Running micro-benchmarks...")
+        current = run(list(baseline))
+    regressions = compare(baseline, current, args.threshold)
+    if regressions:
+        print(f"✗ {len(regressions)} benchmarks regressed by more than {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+    print(f"✓ No benchmark regressed by more than {args.threshold:.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Run phases
+The generators mark their phases (listing, fetching, computing, rendering) with
+phase(); metrics, tracing and profiling subscribe as observers. With no observer
+registered a phase costs a single list check.
+"""
+from contextlib import contextmanager
+
+_observers = []
+
+
+def add_observer(observer):
+    """Register observer(event, name), called with "start" and "end" around every phase"""
+    _observers.append(observer)
+
+
+def remove_observer(observer):
+    _observers.remove(observer)
+
+
+@contextmanager
+def phase(name):
+    if not _observers:
+        yield
+        return
+    for observer in list(_observers):
+        observer("start", name)
+    try:
+        yield
+    finally:
+        for observer in reversed(list(_observers)):
+            observer("end", name)
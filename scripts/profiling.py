@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Per-phase profiling
+With --profile cpu every phase runs under cProfile; with --profile mem the
+allocations made during every phase are compared with tracemalloc snapshots.
+Each phase gets a report of its hot spots and a profile file saved for later
+comparison (pstats .prof, or a tracemalloc snapshot).
+"""
+import cProfile
+import os
+import re
+import tracemalloc
+
+import phases
+
+PROFILE_MODES = ("cpu", "mem")
+TOP_ENTRIES = 15
+
+
+def _file_stem(name):
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+
+class Profiler:
+    """Phase observer profiling CPU time or memory allocations of each phase"""
+
+    def __init__(self, mode, directory):
+        self.mode = mode
+        self.directory = directory
+        self.runs = {}
+        self._active = None
+        self._snapshots = {}
+        os.makedirs(directory, exist_ok=True)
+        if mode == "mem" and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def _path(self, name, extension):
+        # A phase entered several times gets one file per run
+        count = self.runs.get(name, 1)
+        suffix = f"-{count}" if count > 1 else ""
+        return os.path.join(self.directory, f"{_file_stem(name)}{suffix}.{extension}")
+
+    def observe_phase(self, event, name):
+        if self.mode == "cpu":
+            self._observe_cpu(event, name)
+        else:
+            self._observe_mem(event, name)
+
+    def _observe_cpu(self, event, name):
+        # Only one cProfile can run at a time: nested phases count towards the outer one
+        if event == "start":
+            if self._active is None:
+                self._active = (name, cProfile.Profile())
+                self._active[1].enable()
+            return
+        if self._active is None or self._active[0] != name:
+            return
+        _, profile = self._active
+        profile.disable()
+        self._active = None
+        self.runs[name] = self.runs.get(name, 0) + 1
+        path = self._path(name, "prof")
+        profile.dump_stats(path)
+        print(f"\n=== CPU profile: {name} ({path}) ===")
+        # pstats is slow to import and only needed once a phase has been profiled
+        import pstats
+        pstats.Stats(profile).strip_dirs().sort_stats("cumulative").print_stats(TOP_ENTRIES)
+
+    def _snapshot(self):
+        # Leave out what the snapshots themselves allocate
+        return tracemalloc.take_snapshot().filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),))
+
+    def _observe_mem(self, event, name):
+        if event == "start":
+            self._snapshots[name] = self._snapshot()
+            return
+        before = self._snapshots.pop(name, None)
+        if before is None:
+            return
+        after = self._snapshot()
+        self.runs[name] = self.runs.get(name, 0) + 1
+        path = self._path(name, "tracemalloc")
+        after.dump(path)
+        current, peak = tracemalloc.get_traced_memory()
+        print(f"\n=== Memory profile: {name} ({path}) ===")
+        print(f"Traced memory: {current / 1024:,.0f} KiB current, {peak / 1024:,.0f} KiB peak")
+        print("Top allocation sites during the phase:")
+        growth = [stat for stat in after.compare_to(before, "lineno") if stat.size_diff > 0]
+        for stat in growth[:TOP_ENTRIES]:
+            print(f"  {stat}")
+
+
+def start_profiling(mode, directory):
+    """Profile every following phase in `mode` ("cpu" or "mem"); returns None when mode is None"""
+    if mode is None:
+        return None
+    profiler = Profiler(mode, directory)
+    phases.add_observer(profiler.observe_phase)
+    return profiler
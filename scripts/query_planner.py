@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Cost-based choice between access paths
+Keeps running averages of what each way of fetching data actually cost per request
+(latency, rate-limit points, cache hit rate) and picks the cheapest plan for the
+work at hand, logging the estimate next to what the run really spent.
+"""
+import json
+import math
+import os
+
+from github_api import DEFAULT_POINTS_PER_HOUR
+
+# A rate-limit point is worth the seconds it takes the budget to refill it
+POINT_SECONDS = 3600 / DEFAULT_POINTS_PER_HOUR
+SMOOTHING = 0.3  # Weight of the newest observation in the running averages
+
+# Per-request costs assumed until a path has been observed
+PRIORS = {
+    "rest_languages": {"latency": 0.3, "points": 1.0, "hit_rate": 0.0},     # one repository
+    "graphql_languages": {"latency": 0.8, "points": 1.0, "hit_rate": 0.0},  # one batch of repositories
+    "calendar_yearly": {"latency": 0.6, "points": 1.0, "hit_rate": 0.0},    # one 1-year window
+    "calendar_aliased": {"latency": 1.5, "points": 1.0, "hit_rate": 0.0},   # every window at once
+}
+
+
+class QueryPlanner:
+    """Observed per-request cost of each access path, persisted between runs"""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.stats = {}
+        self.hints = {}
+        self.actual = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    saved = json.load(f)
+                self.stats = saved.get("paths", {})
+                self.hints = saved.get("hints", {})
+            except (OSError, ValueError) as e:
+                print(f"  ⚠ Discarding planner statistics {path}: {e}")
+
+    def _path_stats(self, access_path):
+        return self.stats.get(access_path) or dict(PRIORS[access_path], samples=0)
+
+    def estimate(self, access_path, requests):
+        """Expected seconds, points and combined cost of `requests` requests on a path"""
+        stats = self._path_stats(access_path)
+        seconds = requests * stats["latency"]
+        # Conditional requests answered 304 are free
+        points = requests * stats["points"] * (1 - stats["hit_rate"])
+        return {"requests": requests, "seconds": seconds, "points": points, "cost": seconds + points * POINT_SECONDS}
+
+    def choose(self, workload, options):
+        """Pick the cheapest of {access_path: request_count} for a workload and log why"""
+        estimates = {access_path: self.estimate(access_path, requests) for access_path, requests in options.items()}
+        chosen = min(estimates, key=lambda access_path: estimates[access_path]["cost"])
+        alternatives = ", ".join(
+            f"{access_path} {est['points']:.1f} pts/{est['seconds']:.1f}s"
+            for access_path, est in estimates.items() if access_path != chosen
+        )
+        est = estimates[chosen]
+        print(f"  Plan for {workload}: {chosen} (est. {est['points']:.1f} pts/{est['seconds']:.1f}s; {alternatives})")
+        self.actual[workload] = {"path": chosen, "estimate": est, "requests": 0, "seconds": 0.0, "points": 0.0}
+        return chosen
+
+    def observe(self, workload, access_path, seconds, points, hit=False):
+        """Record one request's real cost in the running averages and the workload's totals"""
+        stats = self._path_stats(access_path)
+        if stats["samples"] == 0:
+            # The first observation replaces the prior entirely
+            stats.update(latency=seconds, points=points, hit_rate=1.0 if hit else 0.0)
+        else:
+            stats["latency"] += SMOOTHING * (seconds - stats["latency"])
+            if not hit:
+                stats["points"] += SMOOTHING * (points - stats["points"])
+            stats["hit_rate"] += SMOOTHING * ((1.0 if hit else 0.0) - stats["hit_rate"])
+        stats["samples"] += 1
+        self.stats[access_path] = stats
+        totals = self.actual.get(workload)
+        if totals is not None:
+            totals["requests"] += 1
+            totals["seconds"] += seconds
+            totals["points"] += points
+
+    def report(self, workload):
+        """Log estimated against actual cost once a workload is done"""
+        totals = self.actual.pop(workload, None)
+        if totals is None:
+            return
+        est = totals["estimate"]
+        print(
+            f"  Cost of {workload} via {totals['path']}: {totals['points']:.1f} pts/{totals['seconds']:.1f}s "
+            f"in {totals['requests']} requests (est. {est['points']:.1f} pts/{est['seconds']:.1f}s "
+            f"in {math.ceil(est['requests'])})"
+        )
+
+    def hint(self, name, default=None):
+        return self.hints.get(name, default)
+
+    def set_hint(self, name, value):
+        self.hints[name] = value
+
+    def save(self):
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"paths": self.stats, "hints": self.hints}, f, indent=2)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Background refresh scheduler
+Keeps a priority queue of users ordered by when their cards should next be refreshed,
+based on request popularity, data age and each user's usual contribution time,
+and drains it continuously with a bounded pool of worker threads.
+Failed refreshes back off exponentially, users GitHub does not know are not
+retried for a day, and users nobody requested for a week are forgotten.
+"""
+import heapq
+import itertools
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+MIN_INTERVAL = 15 * 60  # Hottest users are refreshed at most every 15 minutes
+MAX_INTERVAL = 24 * 3600  # Coldest users are refreshed at least once a day
+POPULARITY_HALF_LIFE = 6 * 3600  # Request counts lose half their weight every 6 hours
+MIN_HOUR_SAMPLES = 3  # Observations needed before trusting a user's usual contribution hour
+UNKNOWN_USER_TTL = 24 * 3600  # Users GitHub reported as missing are not fetched again for a day
+IDLE_EVICTION = 7 * 24 * 3600  # Users not requested for a week are dropped
+EVICTION_SWEEP_INTERVAL = 3600  # Seconds between sweeps for idle users
+
+
+class UnknownUser(Exception):
+    """Raised by a refresh callable when GitHub has no such user"""
+
+
+class _UserState:
+    def __init__(self):
+        self.popularity = 0.0
+        self.popularity_at = time.time()
+        # Last card request, or when the user was added; pinned users are never evicted
+        self.requested_at = self.popularity_at
+        self.pinned = False
+        self.refreshed_at = None
+        self.due = math.inf
+        self.version = 0
+        self.running = False
+        self.retry_at = None
+        self.failures = 0
+        self.unknown_until = None
+        # Histogram of UTC hours at which refreshes found new contributions
+        self.activity_hours = [0] * 24
+
+    def current_popularity(self, now):
+        return self.popularity * 0.5 ** ((now - self.popularity_at) / POPULARITY_HALF_LIFE)
+
+    def usual_hour(self):
+        samples = sum(self.activity_hours)
+        if samples < MIN_HOUR_SAMPLES:
+            return None
+        return max(range(24), key=self.activity_hours.__getitem__)
+
+
+class RefreshScheduler:
+    """Refresh users' cards in the background, hot users often and cold users lazily"""
+
+    def __init__(self, refresh, workers=4, min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL,
+                 unknown_ttl=UNKNOWN_USER_TTL, idle_eviction=IDLE_EVICTION, on_evict=None):
+        # refresh(username) fetches and stores fresh data, returning True when it
+        # found new contributions since the previous refresh, and raises UnknownUser
+        # for users GitHub does not have; on_evict(username) drops a forgotten user's data
+        self.refresh = refresh
+        self.workers = workers
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.unknown_ttl = unknown_ttl
+        self.idle_eviction = idle_eviction
+        self.on_evict = on_evict
+        self.swept_at = time.time()
+        self.cond = threading.Condition()
+        self.queue = []
+        self.states = {}
+        self.counter = itertools.count()
+        self.threads = []
+        self.stopping = False
+
+    def _next_due(self, state, now):
+        if state.retry_at is not None:
+            return state.retry_at
+        if state.refreshed_at is None:
+            return now
+
+        # Popular users get shorter refresh intervals, down to min_interval
+        interval = max(self.min_interval, self.max_interval / (1 + state.current_popularity(now)))
+        due = state.refreshed_at + interval
+
+        # Refresh shortly after the hour the user usually contributes at, so new
+        # activity shows up quickly without polling them all day long
+        hour = state.usual_hour()
+        if hour is not None:
+            last = datetime.fromtimestamp(state.refreshed_at, timezone.utc)
+            peak = last.replace(hour=hour, minute=30, second=0, microsecond=0)
+            if peak <= last:
+                peak += timedelta(days=1)
+            due = min(due, max(peak.timestamp(), state.refreshed_at + self.min_interval))
+        return due
+
+    def _schedule(self, username, state, now):
+        # Only push when the user becomes due earlier; older heap entries are
+        # invalidated through the version counter and skipped when popped
+        if state.running or state.unknown_until is not None:
+            return
+        due = self._next_due(state, now)
+        if due >= state.due:
+            return
+        state.due = due
+        state.version += 1
+        heapq.heappush(self.queue, (due, next(self.counter), username, state.version))
+        self.cond.notify()
+
+    def add_user(self, username, refreshed_at=None, pinned=False):
+        """Track a user without counting it as a card request; pinned users are kept warm forever"""
+        with self.cond:
+            if username in self.states:
+                self.states[username].pinned |= pinned
+                return
+            state = self.states[username] = _UserState()
+            # Users restored from a snapshot keep their data age
+            state.refreshed_at = refreshed_at
+            state.pinned = pinned
+            self._schedule(username, state, time.time())
+
+    def record_request(self, username):
+        """Count a card request, which may move the user's refresh earlier
+
+        Returns False, without scheduling anything, while the user is known not to exist.
+        """
+        now = time.time()
+        with self.cond:
+            state = self.states.get(username)
+            if state is not None and state.unknown_until is not None:
+                if now < state.unknown_until:
+                    return False
+                # The name may have been registered since: look it up again
+                state = None
+            if state is None:
+                state = self.states[username] = _UserState()
+            state.popularity = state.current_popularity(now) + 1
+            state.popularity_at = state.requested_at = now
+            self._schedule(username, state, now)
+            return True
+
+    def is_unknown(self, username):
+        """True when the last refresh found that GitHub has no such user"""
+        with self.cond:
+            state = self.states.get(username)
+            return state is not None and state.unknown_until is not None and time.time() < state.unknown_until
+
+    def _evict_idle(self, now):
+        # Called with the lock held; forgotten users lose their state and cached data
+        self.swept_at = now
+        evicted = []
+        for username, state in self.states.items():
+            if state.running:
+                continue
+            if state.unknown_until is not None:
+                # Missing users are only remembered until their negative result expires;
+                # configured users are looked up again instead
+                if now < state.unknown_until:
+                    continue
+                if state.pinned:
+                    state.unknown_until = None
+                    self._schedule(username, state, now)
+                else:
+                    evicted.append(username)
+            elif not state.pinned and now - state.requested_at > self.idle_eviction:
+                evicted.append(username)
+        for username in evicted:
+            del self.states[username]
+            if self.on_evict is not None:
+                self.on_evict(username)
+        if evicted:
+            print(f"  ⊘ Evicted {len(evicted)} idle or missing users")
+
+    def _next_job(self):
+        with self.cond:
+            while not self.stopping:
+                now = time.time()
+                if now - self.swept_at >= EVICTION_SWEEP_INTERVAL:
+                    self._evict_idle(now)
+                # Wake up for the next sweep even when no refresh is due before it
+                next_sweep = self.swept_at + EVICTION_SWEEP_INTERVAL
+                if not self.queue:
+                    self.cond.wait(next_sweep - now)
+                    continue
+                due, _, username, version = self.queue[0]
+                state = self.states.get(username)
+                # Entries of evicted users and superseded entries are skipped
+                if state is None or version != state.version:
+                    heapq.heappop(self.queue)
+                    continue
+                now = time.time()
+                if due > now:
+                    self.cond.wait(min(due, next_sweep) - now)
+                    continue
+                heapq.heappop(self.queue)
+                state.running = True
+                state.due = math.inf
+                return username, state
+            return None, None
+
+    def _work(self):
+        while True:
+            username, state = self._next_job()
+            if username is None:
+                return
+            found_activity = False
+            failed = False
+            unknown = False
+            try:
+                found_activity = self.refresh(username)
+            except UnknownUser:
+                unknown = True
+                print(f"  ⊘ {username} does not exist on GitHub, not refreshing it for {self.unknown_ttl // 3600} hours")
+            except Exception as e:
+                failed = True
+                print(f"  ✗ Refresh failed for {username}: {e}")
+            now = time.time()
+            with self.cond:
+                state.running = False
+                if unknown:
+                    state.unknown_until = now + self.unknown_ttl
+                    state.retry_at = None
+                    state.failures = 0
+                elif failed:
+                    # Back off exponentially, so a user that keeps failing costs at most a refresh a day
+                    state.failures += 1
+                    state.retry_at = now + min(self.min_interval * 2 ** (state.failures - 1), self.max_interval)
+                else:
+                    state.retry_at = None
+                    state.failures = 0
+                    state.refreshed_at = now
+                    if found_activity:
+                        hours = state.activity_hours
+                        hours[datetime.fromtimestamp(now, timezone.utc).hour] += 1
+                        if sum(hours) > 100:
+                            # Slowly forget old habits
+                            state.activity_hours = [count // 2 for count in hours]
+                self._schedule(username, state, now)
+
+    def start(self):
+        for _ in range(self.workers):
+            thread = threading.Thread(target=self._work, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def stop(self):
+        with self.cond:
+            self.stopping = True
+            self.cond.notify_all()
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
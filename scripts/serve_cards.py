@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Serve GitHub Stats cards over HTTP
+Cards are rendered from an in-memory cache kept fresh by the background refresh
+scheduler, so requests never wait on the GitHub API unless the user is new.
+With WEBHOOK_SECRET set, POST /webhook applies GitHub events as they happen.
+"""
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from github_api import DEFAULT_POINTS_PER_HOUR, USERNAME_PATTERN, GitHubClient, RateBudget
+from refresh_scheduler import RefreshScheduler, UnknownUser
+from stats_api import LANGUAGES_CARD, STREAK_CARD, StatsService
+from stats_cache import SnapshotError, StatsCache
+from webhooks import WebhookIngest, render_languages, render_streak, verify_signature
+CARD_MAX_AGE = 300  # Seconds clients may reuse a card before revalidating
+COLD_WAIT_TIMEOUT = 30  # Seconds a request for a new user waits for its first refresh
+COLD_WAIT_POLL = 1  # Seconds between checks that the new user exists while waiting
+SNAPSHOT_INTERVAL = 300  # Seconds between cache snapshots
+
+
+def make_refresh(client, cache):
+    """Return the scheduler's refresh callable for a shared client and cache"""
+    # The cache is the service's store: calendars and per-repository bytes (which let
+    # webhook events refetch only the repositories they touch) are kept there, and
+    # refreshes only fetch what the events feed shows has changed
+    service = StatsService(client, state=cache)
+
+    def refresh(username):
+        previous = cache.get_calendar(username)
+        try:
+            svg, stats = service.streak_card(username)
+        except Exception as e:
+            # The events feed, fetched first, answers 404 for users that do not exist
+            response = getattr(e, "response", None)
+            if response is not None and response.status_code == 404:
+                raise UnknownUser(username) from e
+            raise
+        cache.put_card(username, STREAK_CARD, svg)
+        svg, _ = service.languages_card(username)
+        cache.put_card(username, LANGUAGES_CARD, svg)
+        return previous is not None and stats["total_contributions"] > sum(previous.values())
+    return refresh
+
+
+def restore_snapshot(cache, path):
+    """Warm the cache from a snapshot, discarding it if it is unusable"""
+    if not os.path.exists(path):
+        return 0
+    try:
+        users = cache.restore(path)
+    except (OSError, SnapshotError) as e:
+        print(f"  ⚠ Discarding cache snapshot {path}: {e}")
+        return 0
+    print(f"Restored {users} users from cache snapshot {path}")
+    return users
+
+
+def snapshot_periodically(cache, path, interval, stop_event):
+    while not stop_event.wait(interval):
+        try:
+            cache.snapshot(path)
+        except OSError as e:
+            print(f"  ✗ Failed to write cache snapshot {path}: {e}")
+
+
+class CardRequestHandler(BaseHTTPRequestHandler):
+    """GET /<username>/streak-stats.svg and /<username>/languages-stats.svg, POST /webhook"""
+
+    def do_POST(self):
+        if self.path.split("?", 1)[0] != "/webhook" or self.server.webhook_secret is None:
+            self.send_error(404)
+            return
+        body = self.rfile.read(int(self.headers.get("Content-Length", "0")))
+        if not verify_signature(self.server.webhook_secret, body, self.headers.get("X-Hub-Signature-256")):
+            self.send_error(401)
+            return
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            self.send_error(400)
+            return
+        handled = self.server.webhooks.handle(self.headers.get("X-GitHub-Event", ""), payload, self.headers.get("X-GitHub-Delivery"))
+        self.send_response(202 if handled else 204)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        parts = self.path.split("?", 1)[0].strip("/").split("/")
+        if len(parts) != 2 or parts[1] not in (STREAK_CARD, LANGUAGES_CARD) or not USERNAME_PATTERN.match(parts[0]):
+            self.send_error(404)
+            return
+        username, name = parts
+
+        # Names GitHub does not know are answered from the scheduler's negative cache
+        if not self.server.scheduler.record_request(username):
+            self.send_error(404)
+            return
+        card = self.server.cache.get_card(username, name)
+        waited = 0
+        # Wait in slices, so a first refresh that finds no such user answers 404 right away
+        while card is None and waited < COLD_WAIT_TIMEOUT and not self.server.scheduler.is_unknown(username):
+            card = self.server.cache.wait_for_card(username, name, COLD_WAIT_POLL)
+            waited += COLD_WAIT_POLL
+        if card is None and self.server.scheduler.is_unknown(username):
+            self.send_error(404)
+            return
+        if card is None:
+            self.send_response(503)
+            self.send_header("Retry-After", str(COLD_WAIT_TIMEOUT))
+            self.end_headers()
+            return
+
+        if self.headers.get("If-None-Match") == card["etag"]:
+            self.send_response(304)
+            self.send_header("ETag", card["etag"])
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "image/svg+xml; charset=utf-8")
+        self.send_header("Content-Length", str(len(card["svg"])))
+        self.send_header("ETag", card["etag"])
+        self.send_header("Cache-Control", f"public, max-age={CARD_MAX_AGE}")
+        self.end_headers()
+        self.wfile.write(card["svg"])
+
+
+def main():
+    token = os.environ.get("GH_PAT") or os.environ.get("GITHUB_TOKEN")
+    if not token:
+        print("Error: No GitHub token found. Set GH_PAT or GITHUB_TOKEN environment variable.")
+        sys.exit(1)
+
+    port = int(os.environ.get("PORT", "8080"))
+    workers = int(os.environ.get("REFRESH_WORKERS", "4"))
+    points_per_hour = int(os.environ.get("RATE_LIMIT_PER_HOUR", DEFAULT_POINTS_PER_HOUR))
+    # Users to keep warm from startup (comma-separated), others are added on first request
+    usernames_str = os.environ.get("GITHUB_USERNAMES", "")
+    snapshot_path = os.environ.get("SNAPSHOT_FILE", "stats-cache.snapshot")
+    snapshot_interval = int(os.environ.get("SNAPSHOT_INTERVAL", SNAPSHOT_INTERVAL))
+    # Secret configured on the GitHub webhook; the endpoint is disabled without it
+    webhook_secret = os.environ.get("WEBHOOK_SECRET") or None
+
+    headers = {
+        "Authorization": f"Bearer {token}",
+        "Accept": "application/vnd.github.v3+json"
+    }
+    client = GitHubClient(headers, RateBudget(points_per_hour))
+    cache = StatsCache()
+    # Restore before binding the listener so the first requests are served warm
+    restore_snapshot(cache, snapshot_path)
+    scheduler = RefreshScheduler(make_refresh(client, cache), workers=workers, on_evict=cache.drop)
+    for username, updated_at in cache.updated_at().items():
+        scheduler.add_user(username, refreshed_at=updated_at)
+    for username in usernames_str.split(","):
+        if username.strip():
+            scheduler.add_user(username.strip(), pinned=True)
+    scheduler.start()
+    webhooks = WebhookIngest(
+        client, cache,
+        on_streak=lambda username: cache.put_card(username, STREAK_CARD, render_streak(cache, username)),
+        on_languages=lambda username: cache.put_card(username, LANGUAGES_CARD, render_languages(cache, username))
+    )
+    webhooks.start()
+
+    stop_snapshots = threading.Event()
+    snapshot_thread = threading.Thread(
+        target=snapshot_periodically,
+        args=(cache, snapshot_path, snapshot_interval, stop_snapshots),
+        daemon=True
+    )
+    snapshot_thread.start()
+
+    server = ThreadingHTTPServer(("", port), CardRequestHandler)
+    server.cache = cache
+    server.scheduler = scheduler
+    server.webhooks = webhooks
+    server.webhook_secret = webhook_secret
+    print(f"Serving cards on http://localhost:{port}/<username>/{STREAK_CARD}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        scheduler.stop()
+        webhooks.stop()
+        stop_snapshots.set()
+        snapshot_thread.join()
+        cache.snapshot(snapshot_path)
+
+if __name__ == "__main__":
+    main()
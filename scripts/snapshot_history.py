@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Daily snapshot history
+Each run appends the day's aggregates (streak values, total contributions,
+language bytes per language and their total) to a local columnar store, so trend
+cards can be rendered from history instead of re-crawling it. Every user has a
+directory of append-only columns: day.col holds the day of each row and every
+other column one little-endian int64 per row, -1 where the column was not
+recorded that day. Rows are written column by column with day.col last, so a
+run interrupted mid-row leaves longer columns whose torn tail is dropped on the
+next write.
+"""
+import argparse
+import os
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+
+MISSING = -1
+LANGUAGE_PREFIX = "language:"
+LANGUAGE_TOTAL = "languages.total_bytes"
+PERIODS = ("day", "week", "month", "year")
+AGGREGATES = ("last", "max", "mean", "delta")
+ROW_BYTES = 8
+
+
+def _read_column(path, rows):
+    """The first `rows` values of a column file, padded with MISSING"""
+    values = array("q")
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            values.frombytes(f.read(rows * ROW_BYTES))
+        if sys.byteorder == "big":
+            values.byteswap()
+    values.extend([MISSING] * (rows - len(values)))
+    return values
+
+
+def _pack(values):
+    packed = array("q", values)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def period_start(day, period):
+    """First day of the week (Monday), month or year containing `day`"""
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    if period == "month":
+        return day.replace(day=1)
+    if period == "year":
+        return day.replace(month=1, day=1)
+    return day
+
+
+def streak_values(stats):
+    """History columns of a compute_streaks() result"""
+    return {
+        "streak.current": stats["current_streak"],
+        "streak.longest": stats["longest_streak"],
+        "contributions.total": stats["total_contributions"],
+    }
+
+
+class SnapshotHistory:
+    """Append-only columnar store of daily aggregates, one directory per user"""
+    # Single writer per user: the generators of one user run one after the other
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _user_dir(self, username):
+        return os.path.join(self.directory, username)
+
+    def _manifest(self, username):
+        # Column names in creation order; column i is stored in i.col
+        path = os.path.join(self._user_dir(username), "columns")
+        if not os.path.exists(path):
+            return []
+        with open(path, encoding="utf-8") as f:
+            return [line.rstrip("\n") for line in f if line.strip()]
+
+    def _rows(self, username):
+        path = os.path.join(self._user_dir(username), "day.col")
+        return os.path.getsize(path) // ROW_BYTES if os.path.exists(path) else 0
+
+    def columns(self, username):
+        return self._manifest(username)
+
+    def last_day(self, username):
+        rows = self._rows(username)
+        if not rows:
+            return None
+        with open(os.path.join(self._user_dir(username), "day.col"), "rb") as f:
+            f.seek((rows - 1) * ROW_BYTES)
+            day = array("q")
+            day.frombytes(f.read(ROW_BYTES))
+        if sys.byteorder == "big":
+            day.byteswap()
+        return date.fromordinal(day[0])
+
+    def record(self, username, day, values):
+        """Store `values` ({column: int}) as the snapshot of `day`
+
+        A later run on the same day overwrites the columns it records in that day's
+        row. Returns False, leaving the history untouched, for a day before the last one.
+        """
+        directory = self._user_dir(username)
+        os.makedirs(directory, exist_ok=True)
+        rows = self._rows(username)
+        last = self.last_day(username)
+        if last is not None and day < last:
+            return False
+        row = rows - 1 if day == last else rows
+        manifest = self._manifest(username)
+        new_columns = [name for name in values if name not in manifest]
+        if new_columns:
+            with open(os.path.join(directory, "columns"), "a", encoding="utf-8") as f:
+                f.write("".join(f"{name}\n" for name in new_columns))
+            manifest += new_columns
+        for index, name in enumerate(manifest):
+            path = os.path.join(directory, f"{index}.col")
+            if name not in values and row < rows:
+                continue
+            value = values.get(name, MISSING)
+            with open(path, "r+b" if os.path.exists(path) else "w+b") as f:
+                size = f.seek(0, os.SEEK_END)
+                # Drop a torn tail, then back-fill a column created after the first row
+                if size > row * ROW_BYTES:
+                    f.truncate(row * ROW_BYTES)
+                elif size < row * ROW_BYTES:
+                    f.write(_pack([MISSING] * (row - size // ROW_BYTES)))
+                f.seek(row * ROW_BYTES)
+                f.write(_pack([value]))
+        if row == rows:
+            with open(os.path.join(directory, "day.col"), "ab") as f:
+                f.write(_pack([day.toordinal()]))
+        return True
+
+    def record_languages(self, username, day, languages_data):
+        """Record bytes per language, 0 for languages seen before but gone now, and their total"""
+        values = {name: 0 for name in self._manifest(username) if name.startswith(LANGUAGE_PREFIX)}
+        values.update({f"{LANGUAGE_PREFIX}{lang}": bytes_count for lang, bytes_count in languages_data.items()})
+        values[LANGUAGE_TOTAL] = sum(languages_data.values())
+        return self.record(username, day, values)
+
+    def query(self, username, columns=None, start=None, end=None):
+        """Return (days, {column: values}) for the rows from `start` to `end` inclusive
+
+        Values are None on days the column was not recorded.
+        """
+        directory = self._user_dir(username)
+        rows = self._rows(username)
+        manifest = self._manifest(username)
+        days = [date.fromordinal(ordinal) for ordinal in _read_column(os.path.join(directory, "day.col"), rows)]
+        first = bisect_left(days, start) if start is not None else 0
+        stop = bisect_right(days, end) if end is not None else rows
+        result = {}
+        for name in columns if columns is not None else manifest:
+            if name not in manifest:
+                raise Exception(f"Unknown history column {name!r} for {username}")
+            values = _read_column(os.path.join(directory, f"{manifest.index(name)}.col"), rows)[first:stop]
+            result[name] = [None if value == MISSING else value for value in values]
+        return days[first:stop], result
+
+    def downsample(self, username, column, period="month", aggregate="last", start=None, end=None):
+        """[(period start, value)] of one column per week, month or year
+
+        "last" and "max" suit levels (bytes, streaks); "delta" turns a running
+        total into the amount added in each period.
+        """
+        if period not in PERIODS:
+            raise Exception(f"Unknown period {period!r} (expected one of {', '.join(PERIODS)})")
+        if aggregate not in AGGREGATES:
+            raise Exception(f"Unknown aggregate {aggregate!r} (expected one of {', '.join(AGGREGATES)})")
+        days, values = self.query(username, [column], start, end)
+        buckets = {}
+        for day, value in zip(days, values[column]):
+            if value is not None:
+                buckets.setdefault(period_start(day, period), []).append(value)
+        points = []
+        previous = None
+        for key in sorted(buckets):
+            bucket = buckets[key]
+            if aggregate == "last":
+                points.append((key, bucket[-1]))
+            elif aggregate == "max":
+                points.append((key, max(bucket)))
+            elif aggregate == "mean":
+                points.append((key, sum(bucket) / len(bucket)))
+            else:
+                # The first period has no baseline: count what it added within itself
+                points.append((key, bucket[-1] - (previous if previous is not None else bucket[0])))
+                previous = bucket[-1]
+        return points
+
+    def share(self, username, language, period="month", start=None, end=None):
+        """[(period start, percentage)] of one language in the total language bytes"""
+        days, values = self.query(username, [f"{LANGUAGE_PREFIX}{language}", LANGUAGE_TOTAL], start, end)
+        daily = {}
+        for day, part, total in zip(days, values[f"{LANGUAGE_PREFIX}{language}"], values[LANGUAGE_TOTAL]):
+            if part is not None and total:
+                daily[period_start(day, period)] = part * 100 / total
+        return sorted(daily.items())
+
+
+def render_sparkline(points, title, width=300, height=60):
+    """Small SVG line chart of (day, value) points, as UTF-8 bytes"""
+    # Imported here so runs that only record history never load the XML stack
+    import xml.etree.ElementTree as ET
+
+    colors = {"bg": "#0d1117", "line": "#ff6e96", "text": "#58a6ff"}
+    padding = 6
+    chart_top = 22
+    svg = ET.Element("svg", {"width": str(width), "height": str(height), "xmlns": "http://www.w3.org/2000/svg"})
+    ET.SubElement(svg, "rect", {"width": str(width), "height": str(height), "fill": colors["bg"], "rx": "6"})
+    label = ET.SubElement(svg, "text", {
+        "x": str(padding),
+        "y": "15",
+        "font-family": "Segoe UI, -apple-system, BlinkMacSystemFont, sans-serif",
+        "font-size": "12",
+        "fill": colors["text"]
+    })
+    label.text = title
+    if points:
+        values = [value for _, value in points]
+        low, high = min(values), max(values)
+        span = (high - low) or 1
+        step = (width - 2 * padding) / max(1, len(points) - 1)
+        coordinates = [
+            (padding + index * step, height - padding - (value - low) / span * (height - chart_top - padding))
+            for index, value in enumerate(values)
+        ]
+        if len(coordinates) == 1:
+            coordinates.append((width - padding, coordinates[0][1]))
+        ET.SubElement(svg, "polyline", {
+            "points": " ".join(f"{x:.1f},{y:.1f}" for x, y in coordinates),
+            "fill": "none",
+            "stroke": colors["line"],
+            "stroke-width": "2",
+            "stroke-linejoin": "round"
+        })
+        last = ET.SubElement(svg, "text", {
+            "x": str(width - padding),
+            "y": "15",
+            "text-anchor": "end",
+            "font-family": "Segoe UI, -apple-system, BlinkMacSystemFont, sans-serif",
+            "font-size": "12",
+            "fill": colors["line"]
+        })
+        last.text = f"{values[-1]:,.1f}" if isinstance(values[-1], float) else f"{values[-1]:,}"
+    return ET.tostring(svg, encoding="utf-8", xml_declaration=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the daily snapshot history and render trend sparklines")
+    parser.add_argument("--dir", default=os.environ.get("HISTORY_DIR", ".stats-history"), help="history directory (default HISTORY_DIR)")
+    parser.add_argument("--user", default=os.environ.get("GITHUB_USERNAME", "Andreas-Garcia"), help="user whose history is read")
+    parser.add_argument("--column", help="column to read, e.g. streak.current or language:Python")
+    parser.add_argument("--share", metavar="LANGUAGE", help="percentage of this language in all language bytes instead of a column")
+    parser.add_argument("--period", choices=PERIODS, default="day", help="downsample to one value per period")
+    parser.add_argument("--aggregate", choices=AGGREGATES, default="last", help="value kept per period")
+    parser.add_argument("--start", type=date.fromisoformat, help="first day (YYYY-MM-DD)")
+    parser.add_argument("--end", type=date.fromisoformat, help="last day (YYYY-MM-DD)")
+    parser.add_argument("--sparkline", metavar="SVG", help="render the series as a sparkline to this file")
+    args = parser.parse_args()
+
+    history = SnapshotHistory(args.dir)
+    if not args.column and not args.share:
+        days, _ = history.query(args.user, [])
+        print(f"Columns of {args.user} ({len(days)} days, last {history.last_day(args.user)}):")
+        for name in history.columns(args.user):
+            print(f"  {name}")
+        return
+    if args.share:
+        points = history.share(args.user, args.share, args.period, args.start, args.end)
+        title = f"{args.share} share (%)"
+    else:
+        points = history.downsample(args.user, args.column, args.period, args.aggregate, args.start, args.end)
+        title = args.column if args.period == "day" else f"{args.column} per {args.period} ({args.aggregate})"
+    if args.sparkline:
+        svg = render_sparkline(points, title)
+        tmp_path = f"{args.sparkline}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(svg)
+        os.replace(tmp_path, args.sparkline)
+        print(f"✓ Rendered {len(points)} points to {args.sparkline}")
+        return
+    for day, value in points:
+        print(f"{day.isoformat()}  {value:,.2f}" if isinstance(value, float) else f"{day.isoformat()}  {value:,}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Embeddable stats API
+Fetch, compute and render steps of both cards as plain functions, the full
+pipelines behind the generator CLIs, and a StatsService that runs the steps with
+an injected transport (GitHubClient), store (StatsCache), output sink and
+optional SnapshotHistory. One process can render many users' cards while
+sessions, ETag caches and stored calendars stay warm.
+"""
+import os
+from datetime import datetime
+
+import languages_stats
+import streak_stats
+from activity_check import load_state
+from github_api import Cassette, Deadline, GitHubClient, HttpCache, RateBudget, timeout_errors
+from phases import phase
+from query_planner import QueryPlanner
+from snapshot_history import SnapshotHistory, streak_values
+
+STREAK_CARD = "streak-stats.svg"
+LANGUAGES_CARD = "languages-stats.svg"
+
+
+class CardError(Exception):
+    """Raised when no card can be rendered and the existing one should be kept"""
+
+
+def make_client(token, cache_dir=None, budget=None, **options):
+    """GitHubClient for both cards; options (timeout, deadline, metrics, ...) are passed through"""
+    headers = {
+        "Authorization": f"Bearer {token}",
+        "Accept": "application/vnd.github.v3+json"
+    }
+    return GitHubClient(headers, budget or RateBudget(), HttpCache(cache_dir) if cache_dir else None, **options)
+
+
+def fetch_calendar(client, username, state=None, planner=None):
+    """All-time {date: count} calendar; with a StatsCache only what changed is fetched"""
+    if state is not None:
+        return streak_stats.refresh_contribution_calendar(client, username, state, planner)
+    return streak_stats.fetch_contribution_calendar(client, username, planner=planner)
+
+
+def compute_streaks(calendar, today=None):
+    return streak_stats.compute_streaks(calendar, today=today)
+
+
+def fetch_languages(client, username, additional_repos=(), state=None, planner=None):
+    """Return ({language: bytes}, repositories counted); with a StatsCache only touched repositories are fetched"""
+    if state is not None:
+        return languages_stats.refresh_languages(client, username, additional_repos, state, planner)
+    return languages_stats.fetch_languages(client, username, additional_repos, planner=planner)
+
+
+def aggregate_languages(languages_data):
+    """(language, percentage) pairs by decreasing share"""
+    return languages_stats.compute_language_percentages(languages_data)
+
+
+def render_streak(stats, partial=False):
+    return streak_stats.render_svg(stats, partial=partial)
+
+
+def render_languages(sorted_languages, partial=False):
+    return languages_stats.render_svg(sorted_languages, partial=partial)
+
+
+def streak_card_from_calendar(calendar, today=None, partial=False):
+    """Compute and render the streak card of a calendar; returns (svg, stats)"""
+    with phase("streaks"):
+        stats = compute_streaks(calendar, today)
+    with phase("render"):
+        svg = render_streak(stats, partial=partial)
+    return svg, stats
+
+
+def languages_card_from_totals(languages_data, partial=False):
+    """Aggregate and render the languages card of {language: bytes}; returns (svg, sorted languages)"""
+    with phase("compute"):
+        sorted_languages = aggregate_languages(languages_data)
+    with phase("render"):
+        svg = render_languages(sorted_languages, partial=partial)
+    return svg, sorted_languages
+
+
+def _open_cassette(record, replay, token):
+    # A recorded run is replayed request for request, so the planner must not pick other queries
+    if not (record or replay):
+        return None
+    return Cassette(record or replay, "record" if record else "replay", secrets=[token])
+
+
+def _replay_day(cassette):
+    # A replayed run belongs to the day it was recorded
+    if cassette is not None and cassette.replaying:
+        return datetime.strptime(cassette.recorded_on, "%Y-%m-%d").date()
+    return None
+
+
+def _write_card(path, svg):
+    with phase("write"), open(path, "wb") as f:
+        f.write(svg)
+
+
+def _report_history(recorded, day, history_dir):
+    if recorded:
+        print(f"✓ Recorded the {day} snapshot in {history_dir}")
+    else:
+        print(f"⚠ {history_dir} already has snapshots after {day}; not recorded")
+
+
+def generate_streak_card(username, token=None, source="api", local_repos=(), authors=(), state_path=None,
+                         deadline_seconds=None, request_timeout=None, record=None, replay=None, planner_path=None,
+                         history_dir=None, metrics=None, tracer=None, output=STREAK_CARD):
+    """Fetch, compute, render and write the streak card; returns (stats, partial)
+
+    `source` is "api" (GitHub's calendar), "local" (git history of local_repos by
+    authors) or "merged". Raises CardError when the deadline passed before any
+    contribution data was fetched.
+    """
+    contributions_by_date = {}
+    if source in ("local", "merged"):
+        with phase("local calendar"):
+            from local_calendar import local_calendar
+            contributions_by_date = local_calendar(local_repos, authors)
+
+    # With a state file, the calendar is kept between runs and only refreshed where
+    # the events feed shows new activity
+    state = load_state(state_path) if state_path and source != "local" else None
+    deadline = None
+    cassette = None
+
+    if source != "local":
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json"
+        }
+        # Queries run most recent year first, so a deadline only costs the oldest history
+        deadline = Deadline(deadline_seconds) if deadline_seconds else None
+        cassette = _open_cassette(record, replay, token)
+        client = GitHubClient(headers, timeout=request_timeout, deadline=deadline, metrics=metrics, tracer=tracer, cassette=cassette)
+        # Observed query costs decide between yearly and aliased calendar queries
+        planner = QueryPlanner(planner_path) if planner_path and cassette is None else None
+
+        try:
+            with phase("calendar"):
+                api_calendar = fetch_calendar(client, username, state, planner)
+        except timeout_errors() as e:
+            if deadline is None or not deadline.partial:
+                raise
+            # Nothing came back in time: fall back to the stored calendar, if any
+            api_calendar = state.get_calendar(username) if state is not None else None
+            if not api_calendar:
+                raise CardError(f"{e} before any contribution data was fetched; keeping the existing card.")
+        if planner is not None:
+            planner.save()
+        with phase("merge"):
+            from local_calendar import merge_calendars
+            contributions_by_date = merge_calendars(contributions_by_date, api_calendar)
+
+    # Rebuild weeks structure from combined data
+    with phase("merge"):
+        weeks = streak_stats.rebuild_weeks(contributions_by_date)
+
+    partial = deadline is not None and deadline.partial
+    # The per-repository breakdown does not feed the card, so it is skipped under a deadline
+    if source != "local" and state is None and deadline is None:
+        # Query per repository for each year range (same approach as calendar query)
+        with phase("repository contributions"):
+            repo_contributions, total_type_counts = streak_stats.fetch_repo_contributions(client, username)
+
+    # A replayed calendar ends on the day it was recorded
+    today = _replay_day(cassette)
+    svg, stats = streak_card_from_calendar(contributions_by_date, today, partial)
+    _write_card(output, svg)
+    if cassette is not None:
+        cassette.save()
+    if state is not None:
+        state.snapshot(state_path)
+    # One snapshot per day for trend cards; partial data would show as a dip
+    if history_dir and not partial:
+        day = today or datetime.now().date()
+        _report_history(SnapshotHistory(history_dir).record(username, day, streak_values(stats)), day, history_dir)
+    return stats, partial
+
+
+def generate_languages_card(username, token=None, org=None, local_repos=(), additional_repos=(), state_path=None,
+                            deadline_seconds=None, request_timeout=None, record=None, replay=None, planner_path=None,
+                            local_cache_path=None, org_checkpoint_path=None, history_dir=None, metrics=None, tracer=None,
+                            output=LANGUAGES_CARD):
+    """Fetch, aggregate, render and write the languages card
+
+    Counts local_repos checkouts when given, else every repository of `org` when
+    given, else the user's owned, contributed and additional repositories.
+    Returns (languages_data, sorted_languages, repo_count, partial). Raises
+    CardError when the deadline passed before any language data was fetched.
+    """
+    headers = {
+        "Authorization": f"Bearer {token}",
+        "Accept": "application/vnd.github.v3+json"
+    }
+    deadline = Deadline(deadline_seconds) if deadline_seconds else None
+    cassette = _open_cassette(record, replay, token)
+    client = GitHubClient(headers, timeout=request_timeout, deadline=deadline, metrics=metrics, tracer=tracer, cassette=cassette)
+    # Observed query costs decide between REST and aliased GraphQL language lookups
+    planner = QueryPlanner(planner_path) if planner_path and cassette is None else None
+
+    if local_repos:
+        print(f"Scanning {len(local_repos)} local checkouts...")
+        # Blob classifications are cached across runs so unchanged files are never re-read
+        with phase("scan checkouts"):
+            from local_languages import scan_checkouts
+            languages_data = scan_checkouts(local_repos, cache_path=local_cache_path)
+        repo_count = len(local_repos)
+    elif org:
+        with phase("organization languages"):
+            languages_data, repo_count = languages_stats.fetch_org_languages(client, org, org_checkpoint_path)
+    elif state_path:
+        # Per-repository languages are kept between runs and only touched repositories refetched
+        state = load_state(state_path)
+        try:
+            languages_data, processed_repos = fetch_languages(client, username, additional_repos, state, planner)
+        except timeout_errors() as e:
+            if deadline is None:
+                raise
+            if state.get_repo_languages(username) is None:
+                raise CardError(f"{e} before any language data was fetched; keeping the existing card.")
+            # Out of time while refetching changed repositories: render the stored totals
+            deadline.partial = True
+            print(f"  ⚠ Stopped early ({e}), using the stored languages")
+            languages_data, processed_repos = state.get_languages(username), state.get_repo_languages(username).keys()
+        repo_count = len(processed_repos)
+        state.snapshot(state_path)
+    else:
+        languages_data, processed_repos = fetch_languages(client, username, additional_repos, planner=planner)
+        repo_count = len(processed_repos)
+    if planner is not None:
+        planner.save()
+    partial = deadline is not None and deadline.partial
+    if partial and not sum(languages_data.values()):
+        raise CardError("Deadline reached before any language data was fetched; keeping the existing card.")
+
+    svg, sorted_languages = languages_card_from_totals(languages_data, partial)
+    _write_card(output, svg)
+    if cassette is not None:
+        cassette.save()
+    # One snapshot per day for trend cards; partial data would show as a dip
+    if history_dir and not partial:
+        day = _replay_day(cassette) or datetime.now().date()
+        _report_history(SnapshotHistory(history_dir).record_languages(org or username, day, languages_data), day, history_dir)
+    return languages_data, sorted_languages, repo_count, partial
+
+
+class FileSink:
+    """Writes cards atomically to `directory`, or `directory/<username>/` with per_user"""
+
+    def __init__(self, directory, per_user=False):
+        self.directory = directory
+        self.per_user = per_user
+
+    def write(self, username, card, data):
+        directory = os.path.join(self.directory, username) if self.per_user else self.directory
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, card)
+        # Readers (a web server, git) never see a partial file
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+
+class MemorySink:
+    """Keeps the latest card of each user in a {(username, card): bytes} dict"""
+
+    def __init__(self):
+        self.cards = {}
+
+    def write(self, username, card, data):
+        self.cards[(username, card)] = data
+
+
+class StatsService:
+    """Renders cards for any number of users through shared client, store and planner"""
+
+    def __init__(self, client, state=None, planner=None, sink=None, history=None):
+        self.client = client
+        self.state = state
+        self.planner = planner
+        self.sink = sink
+        self.history = history
+
+    def _partial(self):
+        return self.client.deadline is not None and self.client.deadline.partial
+
+    def streak_card(self, username, today=None):
+        """Fetch, compute and render the streak card; returns (svg, stats)"""
+        calendar = fetch_calendar(self.client, username, self.state, self.planner)
+        partial = self._partial()
+        svg, stats = streak_card_from_calendar(calendar, today, partial)
+        if self.sink is not None:
+            self.sink.write(username, STREAK_CARD, svg)
+        if self.history is not None and not partial:
+            self.history.record(username, today or datetime.now().date(), streak_values(stats))
+        return svg, stats
+
+    def languages_card(self, username, additional_repos=()):
+        """Fetch, aggregate and render the languages card; returns (svg, sorted languages)"""
+        languages_data, _ = fetch_languages(self.client, username, additional_repos, self.state, self.planner)
+        partial = self._partial()
+        svg, sorted_languages = languages_card_from_totals(languages_data, partial)
+        if self.sink is not None:
+            self.sink.write(username, LANGUAGES_CARD, svg)
+        if self.history is not None and not partial:
+            self.history.record_languages(username, datetime.now().date(), languages_data)
+        return svg, sorted_languages
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+In-memory stats cache
+Holds per-user contribution calendars, per-repository language bytes, rendered
+cards and the IDs of applied webhook deliveries, and snapshots them to a single compact file so a restarted process starts warm.
+"""
+import base64
+import hashlib
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from datetime import date, timedelta
+
+# Snapshot layout: magic, format version, payload length, SHA-256 of the payload,
+# then the zlib-compressed JSON payload. Bump the version on any layout change.
+SNAPSHOT_MAGIC = b"GHSTATS\0"
+SNAPSHOT_VERSION = 4
+SNAPSHOT_HEADER = struct.Struct(">8sHI32s")
+RECENT_DELIVERIES = 10000  # Webhook delivery IDs remembered to drop GitHub's redeliveries
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot is corrupt or was written by an incompatible version"""
+
+
+def _encode_calendar(contributions_by_date):
+    # Dense day-by-day counts from the first date; -1 marks days absent from the calendar
+    if not contributions_by_date:
+        return {"start": None, "counts": []}
+    start = min(contributions_by_date)
+    days = (max(contributions_by_date) - start).days + 1
+    counts = [-1] * days
+    for date_obj, count in contributions_by_date.items():
+        counts[(date_obj - start).days] = count
+    return {"start": start.isoformat(), "counts": counts}
+
+
+def _decode_calendar(encoded):
+    if encoded["start"] is None:
+        return {}
+    start = date.fromisoformat(encoded["start"])
+    return {
+        start + timedelta(days=offset): count
+        for offset, count in enumerate(encoded["counts"])
+        if count >= 0
+    }
+
+
+def _sum_languages(repos):
+    languages_data = {}
+    for langs in repos.values():
+        for lang, bytes_count in langs.items():
+            languages_data[lang] = languages_data.get(lang, 0) + bytes_count
+    return languages_data
+
+
+class StatsCache:
+    """Thread-safe store shared by the card server and its refresh workers"""
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.users = {}
+        self.deliveries = OrderedDict()
+
+    def _entry(self, username):
+        return self.users.setdefault(username, {
+            "calendar": None, "languages": None, "repos": None, "dirty": set(), "events": {}, "cards": {},
+            "updated_at": None
+        })
+
+    def get_calendar(self, username):
+        # A copy: webhook events add contributions in place while cards are rendered
+        with self.cond:
+            calendar = self.users.get(username, {}).get("calendar")
+            return None if calendar is None else dict(calendar)
+
+    def put_calendar(self, username, contributions_by_date):
+        """Store a calendar and return how many contributions it adds to the previous one"""
+        with self.cond:
+            entry = self._entry(username)
+            previous = entry["calendar"]
+            entry["calendar"] = dict(contributions_by_date)
+            entry["updated_at"] = time.time()
+            if previous is None:
+                return 0
+            return max(0, sum(contributions_by_date.values()) - sum(previous.values()))
+
+    def add_contributions(self, username, day, count=1):
+        """Add contributions to one day of a cached calendar and return the updated calendar"""
+        # Users without a calendar yet get one on their first full refresh
+        with self.cond:
+            entry = self.users.get(username)
+            if entry is None or entry["calendar"] is None:
+                return None
+            entry["calendar"][day] = entry["calendar"].get(day, 0) + count
+            return dict(entry["calendar"])
+
+    def get_languages(self, username):
+        with self.cond:
+            return self.users.get(username, {}).get("languages")
+
+    def put_languages(self, username, languages_data):
+        with self.cond:
+            self._entry(username)["languages"] = dict(languages_data)
+
+    def put_repo_languages(self, username, repo_languages, refreshed_dirty=()):
+        """Store per-repository language bytes and their totals
+
+        Only the dirty marks in `refreshed_dirty` (from get_dirty() when the fetch
+        started) are cleared; repositories marked during the fetch stay dirty.
+        """
+        with self.cond:
+            entry = self._entry(username)
+            entry["repos"] = {repo: dict(langs) for repo, langs in repo_languages.items()}
+            entry["dirty"] -= set(refreshed_dirty)
+            entry["languages"] = _sum_languages(entry["repos"])
+
+    def get_repo_languages(self, username):
+        with self.cond:
+            repos = self.users.get(username, {}).get("repos")
+            return None if repos is None else {repo: dict(langs) for repo, langs in repos.items()}
+
+    def has_repo(self, username, repo):
+        with self.cond:
+            return repo in (self.users.get(username, {}).get("repos") or {})
+
+    def mark_dirty(self, username, repo):
+        """Flag a repository's language data for refetch; False if the user has no per-repo data"""
+        with self.cond:
+            entry = self.users.get(username)
+            if entry is None or entry["repos"] is None:
+                return False
+            entry["dirty"].add(repo)
+            return True
+
+    def get_dirty(self, username):
+        """Return the repositories currently flagged for refetch, without clearing them"""
+        with self.cond:
+            return set(self.users.get(username, {}).get("dirty", ()))
+
+    def take_dirty(self, username):
+        """Return and clear the repositories flagged for refetch"""
+        with self.cond:
+            entry = self.users.get(username)
+            if entry is None:
+                return set()
+            dirty, entry["dirty"] = entry["dirty"], set()
+            return dirty
+
+    def update_repo_languages(self, username, repo, languages):
+        """Replace one repository's language bytes (None removes it) and return the new totals"""
+        with self.cond:
+            entry = self.users.get(username)
+            if entry is None or entry["repos"] is None:
+                return None
+            if languages:
+                entry["repos"][repo] = dict(languages)
+            else:
+                entry["repos"].pop(repo, None)
+            entry["languages"] = _sum_languages(entry["repos"])
+            return dict(entry["languages"])
+
+    def get_events_state(self, username, consumer):
+        """Return the events feed position ({"etag", "last_event_id"}) a consumer has processed"""
+        with self.cond:
+            return self.users.get(username, {}).get("events", {}).get(consumer)
+
+    def put_events_state(self, username, consumer, state):
+        with self.cond:
+            self._entry(username)["events"][consumer] = dict(state)
+
+    def get_card(self, username, name):
+        with self.cond:
+            return self.users.get(username, {}).get("cards", {}).get(name)
+
+    def put_card(self, username, name, svg):
+        card = {
+            "svg": svg,
+            "etag": f'"{hashlib.sha1(svg).hexdigest()}"',
+            "generated_at": time.time()
+        }
+        with self.cond:
+            self._entry(username)["cards"][name] = card
+            self.cond.notify_all()
+        return card
+
+    def wait_for_card(self, username, name, timeout):
+        """Block until the card has been rendered, or return None after `timeout` seconds"""
+        deadline = time.monotonic() + timeout
+        with self.cond:
+            while True:
+                card = self.users.get(username, {}).get("cards", {}).get(name)
+                remaining = deadline - time.monotonic()
+                if card is not None or remaining <= 0:
+                    return card
+                self.cond.wait(remaining)
+
+    def drop(self, username):
+        """Forget everything stored for a user"""
+        with self.cond:
+            self.users.pop(username, None)
+
+    def seen_delivery(self, delivery_id):
+        """Return True for a webhook delivery applied before; otherwise remember it and return False"""
+        # Deliveries without an ID cannot be told apart, so they are always applied
+        if not delivery_id:
+            return False
+        with self.cond:
+            if delivery_id in self.deliveries:
+                return True
+            self.deliveries[delivery_id] = None
+            if len(self.deliveries) > RECENT_DELIVERIES:
+                self.deliveries.popitem(last=False)
+            return False
+
+    def updated_at(self):
+        """Return {username: time of the last calendar refresh} for every cached user"""
+        with self.cond:
+            return {username: entry["updated_at"] for username, entry in self.users.items()}
+
+    def snapshot(self, path):
+        """Atomically write the whole cache to `path`"""
+        with self.cond:
+            users = {
+                username: {
+                    "updated_at": entry["updated_at"],
+                    "calendar": _encode_calendar(entry["calendar"]) if entry["calendar"] is not None else None,
+                    "languages": entry["languages"],
+                    "repos": entry["repos"],
+                    "dirty": sorted(entry["dirty"]),
+                    "events": entry["events"],
+                    "cards": {
+                        name: {
+                            "svg": base64.b64encode(card["svg"]).decode("ascii"),
+                            "etag": card["etag"],
+                            "generated_at": card["generated_at"]
+                        }
+                        for name, card in entry["cards"].items()
+                    }
+                }
+                for username, entry in self.users.items()
+            }
+            deliveries = list(self.deliveries)
+        payload = zlib.compress(json.dumps({"users": users, "deliveries": deliveries}, separators=(",", ":")).encode("utf-8"), 6)
+        header = SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(payload), hashlib.sha256(payload).digest())
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(header)
+            f.write(payload)
+        os.replace(tmp_path, path)
+        return len(header) + len(payload)
+
+    def restore(self, path):
+        """Load a snapshot written by snapshot(), replacing the cache contents"""
+        with open(path, "rb") as f:
+            data = f.read()
+        if len(data) < SNAPSHOT_HEADER.size:
+            raise SnapshotError("truncated header")
+        magic, version, length, digest = SNAPSHOT_HEADER.unpack_from(data)
+        if magic != SNAPSHOT_MAGIC:
+            raise SnapshotError("not a stats snapshot")
+        if version != SNAPSHOT_VERSION:
+            raise SnapshotError(f"unsupported version {version} (expected {SNAPSHOT_VERSION})")
+        payload = data[SNAPSHOT_HEADER.size:]
+        if len(payload) != length or hashlib.sha256(payload).digest() != digest:
+            raise SnapshotError("checksum mismatch")
+        try:
+            contents = json.loads(zlib.decompress(payload))
+            users = contents["users"]
+            deliveries = OrderedDict.fromkeys(contents["deliveries"])
+            restored = {
+                username: {
+                    "updated_at": entry["updated_at"],
+                    "calendar": _decode_calendar(entry["calendar"]) if entry["calendar"] is not None else None,
+                    "languages": entry["languages"],
+                    "repos": entry["repos"],
+                    "dirty": set(entry["dirty"]),
+                    "events": entry["events"],
+                    "cards": {
+                        name: {
+                            "svg": base64.b64decode(card["svg"]),
+                            "etag": card["etag"],
+                            "generated_at": card["generated_at"]
+                        }
+                        for name, card in entry["cards"].items()
+                    }
+                }
+                for username, entry in users.items()
+            }
+        except (ValueError, KeyError, TypeError, zlib.error) as e:
+            raise SnapshotError(f"malformed payload: {e}")
+        with self.cond:
+            self.users = restored
+            self.deliveries = deliveries
+            self.cond.notify_all()
+        return len(restored)
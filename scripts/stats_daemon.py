@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Long-running stats generator
+Keeps the HTTP session, ETag cache and stored calendar/languages in memory and
+regenerates both cards on an interval with jitter, so each cycle only pays for
+the incremental API calls. Cards are written atomically through a FileSink.
+"""
+import argparse
+import os
+import random
+import signal
+import sys
+import threading
+import time
+
+from activity_check import load_state
+from github_api import GitHubClient, HttpCache, RateBudget
+from stats_api import FileSink, StatsService
+from stats_cache import StatsCache
+
+
+class StatsDaemon:
+    """Regenerates the streak and languages cards of one user on a schedule"""
+
+    def __init__(self, client, state, username, additional_repos, output_dir, state_path):
+        self.service = StatsService(client, state, sink=FileSink(output_dir))
+        self.state = state
+        self.username = username
+        self.additional_repos = additional_repos
+        self.state_path = state_path
+        self.stopping = threading.Event()
+
+    def refresh_streak(self):
+        _, stats = self.service.streak_card(self.username)
+        print(f"  ✓ Streak: {stats['current_streak']} day streak, {stats['total_contributions']} total")
+
+    def refresh_languages(self):
+        _, sorted_languages = self.service.languages_card(self.username, self.additional_repos)
+        print(f"  ✓ Languages: {len(sorted_languages)} languages")
+
+    def run(self, interval, jitter):
+        """Refresh every card each `interval` seconds (± jitter share) until stopped"""
+        jobs = {"streak": self.refresh_streak, "languages": self.refresh_languages}
+        # Both cards start immediately, then drift apart through the jitter
+        due = {name: time.monotonic() for name in jobs}
+        while not self.stopping.is_set():
+            name = min(due, key=due.get)
+            if self.stopping.wait(max(0, due[name] - time.monotonic())):
+                break
+            started = time.monotonic()
+            try:
+                jobs[name]()
+            except Exception as e:
+                print(f"  ✗ {name} refresh failed: {e}")
+            else:
+                if self.state_path:
+                    self.state.snapshot(self.state_path)
+            # Jitter keeps many daemons sharing a token from polling in lockstep
+            due[name] = started + interval * (1 + random.uniform(-jitter, jitter))
+
+    def stop(self, *args):
+        self.stopping.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regenerate the stats cards of one user on an interval")
+    parser.add_argument("--interval", type=float, default=3600, help="seconds between refreshes of each card")
+    parser.add_argument("--jitter", type=float, default=0.1, help="random share of the interval added or removed")
+    parser.add_argument("--output-dir", default=".", help="directory the cards are written to")
+    parser.add_argument("--cache-dir", default=".http-cache", help="HTTP ETag cache directory")
+    args = parser.parse_args()
+
+    username = os.environ.get("GITHUB_USERNAME", "Andreas-Garcia")
+    token = os.environ.get("GH_PAT") or os.environ.get("GITHUB_TOKEN")
+    if not token:
+        print("Error: No GitHub token found. Set GH_PAT or GITHUB_TOKEN environment variable.")
+        sys.exit(1)
+    additional_repos = [repo.strip() for repo in os.environ.get("ADDITIONAL_REPOS", "").split(",") if repo.strip()]
+    # The state is loaded once and kept in memory; the file only survives restarts
+    state_path = os.environ.get("STATE_FILE", ".stats-state.snapshot") or None
+    state = load_state(state_path) if state_path else StatsCache()
+
+    headers = {
+        "Authorization": f"Bearer {token}",
+        "Accept": "application/vnd.github.v3+json"
+    }
+    client = GitHubClient(headers, RateBudget(), HttpCache(args.cache_dir))
+    os.makedirs(args.output_dir, exist_ok=True)
+    daemon = StatsDaemon(client, state, username, additional_repos, args.output_dir, state_path)
+    signal.signal(signal.SIGTERM, daemon.stop)
+    signal.signal(signal.SIGINT, daemon.stop)
+
+    print(f"Refreshing cards for {username} every {args.interval:.0f}s (±{args.jitter:.0%})")
+    daemon.run(args.interval, args.jitter)
+    print("Stopped")
+
+if __name__ == "__main__":
+    main()
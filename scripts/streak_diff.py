@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+Differential test of streak and calendar-merge implementations
+Generates randomized calendars, including empty and all-zero history, gaps,
+leap days, ties between longest streaks, and streaks ending today or yesterday.
+It runs a frozen copy of the original generator's streak code and overlap
+max() merge next to a candidate engine (by default the current
+streak_stats.compute_streaks and local_calendar.merge_calendars), and reports
+every mismatch and the relative speed. The card must not change when the code
+gets faster.
+"""
+import argparse
+import importlib
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+CHUNK_SIZE = 5000
+MAX_REPORTED = 20  # Mismatches kept per kind, with their inputs, for reproduction
+
+# Shapes of generated calendars, drawn uniformly
+KINDS = ("empty", "zeros", "dense", "sparse", "gappy", "leap", "ends_today", "ends_yesterday", "ends_two_days_ago", "tie")
+
+
+def load_function(spec):
+    """Import "module:function" (modules are looked up next to this script)"""
+    module_name, _, function_name = spec.partition(":")
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+# Frozen reference: the streak and merge code of the original generate_streak_stats.py
+# main(), copied verbatim so the refactored engines are checked against the behaviour
+# the card had, not against themselves. Do not edit or "fix" these functions.
+
+def baseline_merge_weeks(all_weeks):
+    # Combine all weeks and deduplicate by date (in case of overlaps)
+    contributions_by_date = {}
+    for week in all_weeks:
+        for day in week["contributionDays"]:
+            date_str = day["date"]
+            try:
+                date_obj = datetime.strptime(date_str, "%Y-%m-%d").date()
+            except:
+                date_obj = datetime.fromisoformat(date_str.replace("Z", "")).date()
+            count = day["contributionCount"]
+            # If date already exists, use the maximum count (handles overlaps)
+            if date_obj in contributions_by_date:
+                contributions_by_date[date_obj] = max(contributions_by_date[date_obj], count)
+            else:
+                contributions_by_date[date_obj] = count
+    return contributions_by_date
+
+
+def baseline_compute_streaks(contributions_by_date, today):
+    # Recalculate total from combined data
+    manual_total = sum(contributions_by_date.values())
+    total_contributions = manual_total
+
+    # Calculate current streak
+    # `today` is a parameter here; the baseline read datetime.now().date()
+    current_streak = 0
+    longest_streak = 0
+
+    # contributions_by_date is already built from combined data
+    all_dates = sorted(contributions_by_date.keys())
+
+    if not all_dates:
+        raise Exception("No contribution data found")
+
+    # all_dates is already sorted from the combined data
+    most_recent_date = all_dates[-1]
+    
+    # Find the most recent day with contributions
+    most_recent_contrib_date = None
+    for date_obj in reversed(all_dates):
+        if contributions_by_date[date_obj] > 0:
+            most_recent_contrib_date = date_obj
+            break
+    
+    if most_recent_contrib_date:
+        # Calculate current streak starting from the most recent contribution date
+        # Only consider it a "current" streak if it's within the last 2 days (today or yesterday)
+        days_since_last_contrib = (today - most_recent_contrib_date).days
+        
+        if days_since_last_contrib <= 1:
+            # There's an active streak - count backwards from most recent contribution
+            check_date = most_recent_contrib_date
+            current_streak = 0
+            
+            while check_date >= all_dates[0]:
+                if check_date in contributions_by_date and contributions_by_date[check_date] > 0:
+                    current_streak += 1
+                    check_date = check_date - timedelta(days=1)
+                else:
+                    # Check if this is just a missing date in our data (weekend gap, etc.)
+                    # Allow up to 1 day gap
+                    next_check = check_date - timedelta(days=1)
+                    if next_check in contributions_by_date and contributions_by_date[next_check] > 0:
+                        # There's a contribution the day after this gap, but this specific day has none
+                        # This breaks the streak
+                        break
+                    else:
+                        # This date is not in our data at all, treat as no contribution and break
+                        break
+
+    # Calculate longest streak: go through all dates chronologically
+    # Build a list of all dates with contributions
+    contrib_dates = [d for d in sorted(contributions_by_date.keys()) if contributions_by_date[d] > 0]
+    
+    if contrib_dates:
+        temp_streak = 1  # Start with 1 for the first contribution
+        longest_streak = 1
+        
+        for i in range(1, len(contrib_dates)):
+            prev_date = contrib_dates[i - 1]
+            curr_date = contrib_dates[i]
+            days_diff = (curr_date - prev_date).days
+            
+            if days_diff == 1:
+                # Consecutive day
+                temp_streak += 1
+                longest_streak = max(longest_streak, temp_streak)
+            else:
+                # Gap in streak
+                temp_streak = 1
+
+
+    # Calculate dates for display
+    # Current streak start date
+    current_streak_start = None
+    if current_streak > 0:
+        # Find the start date of current streak
+        check_date = today
+        days_back = 0
+        while days_back < current_streak and check_date >= all_dates[0]:
+            if check_date in contributions_by_date and contributions_by_date[check_date] > 0:
+                current_streak_start = check_date
+                check_date = check_date - timedelta(days=1)
+                days_back += 1
+            else:
+                break
+          
+    # Longest streak dates (find the most recent longest streak)
+    longest_streak_start = None
+    longest_streak_end = None
+    if longest_streak > 0:
+        temp_streak = 0
+        temp_start = None
+        for date_obj in sorted(contributions_by_date.keys()):
+            if contributions_by_date[date_obj] > 0:
+                if temp_streak == 0:
+                    temp_start = date_obj
+                temp_streak += 1
+                # Update if this matches the longest streak (will get the most recent one)
+                if temp_streak == longest_streak:
+                    longest_streak_start = temp_start
+                    longest_streak_end = date_obj
+            else:
+                temp_streak = 0
+                temp_start = None
+
+    # Format dates for display
+    def format_date(date_obj, include_year=True):
+        if date_obj is None:
+            return "N/A"
+        if include_year:
+            return date_obj.strftime("%b %d, %Y")
+        else:
+            return date_obj.strftime("%b %d")
+
+    # Calculate date ranges
+    # Use the most recent contribution date, not the API's last date (which might be tomorrow)
+    current_streak_end = most_recent_contrib_date if current_streak > 0 and most_recent_contrib_date else None
+    current_streak_date_str = f"{format_date(current_streak_start, include_year=False)} - {format_date(current_streak_end, include_year=False)}" if current_streak_start and current_streak_end else "N/A"
+
+    longest_streak_end_date = None
+    if longest_streak > 0 and longest_streak_start:
+        # Calculate end date of longest streak
+        temp_streak = 0
+        for date_obj in sorted(contributions_by_date.keys()):
+            if contributions_by_date[date_obj] > 0:
+                temp_streak += 1
+                if temp_streak == longest_streak and date_obj >= longest_streak_start:
+                    longest_streak_end_date = date_obj
+            else:
+                temp_streak = 0
+
+    longest_streak_date_str = f"{format_date(longest_streak_start, include_year=False)} - {format_date(longest_streak_end_date, include_year=True)}" if longest_streak_start and longest_streak_end_date else format_date(longest_streak_start) if longest_streak_start else "N/A"
+
+    # Get earliest contribution date for total contributions range
+    # Use the earliest date with actual contributions (> 0), not just the calendar start
+    earliest_with_contribs = None
+    for date_obj in all_dates:
+        if contributions_by_date[date_obj] > 0:
+            earliest_with_contribs = date_obj
+            break
+    
+    earliest_date_str = format_date(earliest_with_contribs if earliest_with_contribs else all_dates[0]) if all_dates else "N/A"
+    total_contributions_date_str = f"{earliest_date_str} - Present"
+
+    return {
+        "total_contributions": total_contributions,
+        "current_streak": current_streak,
+        "longest_streak": longest_streak,
+        "total_contributions_date_str": total_contributions_date_str,
+        "current_streak_date_str": current_streak_date_str,
+        "longest_streak_date_str": longest_streak_date_str,
+    }
+
+
+def random_calendar(rng, kind):
+    """Return ({date: count}, today) for one generated case"""
+    if kind == "empty":
+        return {}, date(2024, 1, 1) + timedelta(days=rng.randrange(3650))
+    if kind == "leap":
+        # Spans a February 29th
+        start = date(rng.choice([2000, 2004, 2012, 2016, 2020, 2024]), 2, 1) + timedelta(days=rng.randrange(28))
+    else:
+        start = date(2008, 1, 1) + timedelta(days=rng.randrange(6000))
+    length = rng.choice([1, 2, 3, 7, 30, 365, rng.randrange(1, 2000)])
+    density = {"zeros": 0.0, "dense": 0.95, "sparse": 0.1}.get(kind, rng.random())
+    calendar = {}
+    for offset in range(length):
+        day = start + timedelta(days=offset)
+        # Calendars merged from several sources can miss days entirely
+        if kind == "gappy" and rng.random() < 0.2:
+            continue
+        calendar[day] = rng.choice([1, 1, 2, 3, 5, 40]) if rng.random() < density else 0
+    last = start + timedelta(days=length - 1)
+    if kind == "tie" and length >= 7:
+        # Two longest streaks of the same length, separated by a gap
+        run = max(1, length // 4)
+        for day in calendar:
+            calendar[day] = 1 if (day - start).days < run or last - day < timedelta(days=run) else 0
+    if kind in ("ends_today", "ends_yesterday", "ends_two_days_ago"):
+        for back in range(rng.randrange(1, 10)):
+            day = last - timedelta(days=back)
+            if day >= start:
+                calendar[day] = rng.randint(1, 5)
+    today = last + timedelta(days={"ends_today": 0, "ends_yesterday": 1, "ends_two_days_ago": 2}.get(kind, rng.choice([0, 0, 1, 2, 30])))
+    # The API calendar usually runs up to today, with today's count still 0
+    if rng.random() < 0.3 and today not in calendar and today > last:
+        calendar[today] = 0
+    return calendar, today
+
+
+def random_windows(rng, calendar):
+    """Split a calendar into overlapping yearly windows whose shared days may disagree"""
+    days = sorted(calendar)
+    windows = []
+    start = 0
+    while start < len(days):
+        end = min(len(days), start + rng.choice([7, 180, 365, 366]))
+        window = {day: calendar[day] for day in days[start:end]}
+        if windows and rng.random() < 0.5:
+            # Re-fetched overlap: the newer window may see more contributions
+            for day in days[max(0, start - 7):start]:
+                window[day] = calendar[day] + rng.choice([0, 0, 1])
+        windows.append(window)
+        start = end
+    return windows
+
+
+def as_weeks(windows):
+    return [
+        {"contributionDays": [{"date": day.isoformat(), "contributionCount": count} for day, count in sorted(window.items())]}
+        for window in windows
+    ]
+
+
+def _outcome(function, *args):
+    try:
+        return function(*args)
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+
+
+def _serialize(calendar):
+    return {day.isoformat(): count for day, count in sorted(calendar.items())}
+
+
+def run_chunk(job):
+    """Compare the engines on one chunk of seeded cases; returns counts, timings and mismatches"""
+    seed, first, count, engine_spec, merge_spec = job
+    engine = load_function(engine_spec)
+    merge_engine = load_function(merge_spec)
+    result = {"cases": 0, "streak_mismatches": [], "merge_mismatches": [], "streak_mismatch_count": 0,
+              "merge_mismatch_count": 0, "seconds": {"reference": 0.0, "engine": 0.0, "reference_merge": 0.0, "merge_engine": 0.0}}
+    seconds = result["seconds"]
+    for case in range(first, first + count):
+        rng = random.Random(f"{seed}:{case}")
+        kind = rng.choice(KINDS)
+        calendar, today = random_calendar(rng, kind)
+
+        started = time.perf_counter()
+        expected = _outcome(baseline_compute_streaks, calendar, today)
+        seconds["reference"] += time.perf_counter() - started
+        started = time.perf_counter()
+        actual = _outcome(engine, dict(calendar), today)
+        seconds["engine"] += time.perf_counter() - started
+        if actual != expected:
+            result["streak_mismatch_count"] += 1
+            if len(result["streak_mismatches"]) < MAX_REPORTED:
+                result["streak_mismatches"].append({
+                    "case": case, "kind": kind, "today": today.isoformat(), "calendar": _serialize(calendar),
+                    "expected": expected, "actual": actual
+                })
+
+        windows = random_windows(rng, calendar)
+        weeks = as_weeks(windows)
+        started = time.perf_counter()
+        expected = _outcome(baseline_merge_weeks, weeks)
+        seconds["reference_merge"] += time.perf_counter() - started
+        started = time.perf_counter()
+        actual = _outcome(merge_engine, *windows)
+        seconds["merge_engine"] += time.perf_counter() - started
+        if actual != expected:
+            result["merge_mismatch_count"] += 1
+            if len(result["merge_mismatches"]) < MAX_REPORTED:
+                result["merge_mismatches"].append({
+                    "case": case, "kind": kind, "windows": [_serialize(window) for window in windows],
+                    "expected": _serialize(expected) if "error" not in expected else expected,
+                    "actual": _serialize(actual) if "error" not in actual else actual
+                })
+        result["cases"] += 1
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare streak and calendar-merge engines against the reference on random calendars")
+    parser.add_argument("--engine", default="streak_stats:compute_streaks",
+                        help="candidate streak engine as module:function, called as f(calendar, today)")
+    parser.add_argument("--merge-engine", default="local_calendar:merge_calendars",
+                        help="candidate merge as module:function, called as f(*calendars)")
+    parser.add_argument("--cases", type=int, default=1_000_000, help="random calendars to generate")
+    parser.add_argument("--seed", default="0", help="seed of the generated calendars")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="processes comparing chunks in parallel")
+    parser.add_argument("--output", default="streak-diff-mismatches.json", help="file the mismatching inputs are written to")
+    args = parser.parse_args()
+
+    jobs = [
+        (args.seed, first, min(CHUNK_SIZE, args.cases - first), args.engine, args.merge_engine)
+        for first in range(0, args.cases, CHUNK_SIZE)
+    ]
+    totals = {"cases": 0, "streak_mismatches": [], "merge_mismatches": [], "streak_mismatch_count": 0, "merge_mismatch_count": 0,
+              "seconds": {"reference": 0.0, "engine": 0.0, "reference_merge": 0.0, "merge_engine": 0.0}}
+    print(f"Comparing {args.engine} and {args.merge_engine} on {args.cases:,} calendars...")
+    started = time.perf_counter()
+    with multiprocessing.Pool(args.workers) as pool:
+        for result in pool.imap_unordered(run_chunk, jobs):
+            totals["cases"] += result["cases"]
+            for key in ("streak_mismatch_count", "merge_mismatch_count"):
+                totals[key] += result[key]
+            for key in ("streak_mismatches", "merge_mismatches"):
+                totals[key].extend(result[key][:MAX_REPORTED - len(totals[key])])
+            for key, value in result["seconds"].items():
+                totals["seconds"][key] += value
+    elapsed = time.perf_counter() - started
+
+    seconds = totals["seconds"]
+    print(f"\n=== Differential run: {totals['cases']:,} cases in {elapsed:.1f}s ===")
+    for label, reference, candidate, mismatches in (
+        ("Streaks", "reference", "engine", "streak_mismatch_count"),
+        ("Merge", "reference_merge", "merge_engine", "merge_mismatch_count"),
+    ):
+        speedup = seconds[reference] / seconds[candidate] if seconds[candidate] else float("inf")
+        status = "✓" if totals[mismatches] == 0 else "✗"
+        print(f"{status} {label}: {totals[mismatches]:,} mismatches; reference {seconds[reference]:.2f}s, "
+              f"candidate {seconds[candidate]:.2f}s ({speedup:.2f}x)")
+
+    if totals["streak_mismatch_count"] or totals["merge_mismatch_count"]:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({key: totals[key] for key in ("streak_mismatches", "merge_mismatches")}, f, indent=2)
+        print(f"Mismatching inputs written to {args.output}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
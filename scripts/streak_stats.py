@@ -0,0 +1,904 @@
+#!/usr/bin/env python3
+"""
+GitHub streak stats
+Fetches the contribution calendar from the GitHub API, computes the current and
+longest streaks, and renders the streak card SVG.
+"""
+import time
+from datetime import datetime, timedelta
+from collections import defaultdict
+
+from activity_check import check_activity, commit_activity
+from github_api import GRAPHQL_URL, DeadlineExceeded
+from tracing import span
+
+def get_contributions_per_repo(client, username, from_date, to_date):
+    """Get contributions per repository using GraphQL API"""
+    query = """
+    query($username: String!, $from: DateTime!, $to: DateTime!) {
+      user(login: $username) {
+        contributionsCollection(from: $from, to: $to) {
+          commitContributionsByRepository(maxRepositories: 100) {
+            repository {
+              nameWithOwner
+              isPrivate
+            }
+            contributions {
+              totalCount
+            }
+          }
+          issueContributionsByRepository(maxRepositories: 100) {
+            repository {
+              nameWithOwner
+            }
+            contributions {
+              totalCount
+            }
+          }
+          pullRequestContributionsByRepository(maxRepositories: 100) {
+            repository {
+              nameWithOwner
+            }
+            contributions {
+              totalCount
+            }
+          }
+          pullRequestReviewContributionsByRepository(maxRepositories: 100) {
+            repository {
+              nameWithOwner
+            }
+            contributions {
+              totalCount
+            }
+          }
+        }
+      }
+    }
+    """
+    
+    try:
+        response = client.post(
+            GRAPHQL_URL,
+            json={
+                "query": query,
+                "variables": {
+                    "username": username,
+                    "from": from_date,
+                    "to": to_date
+                }
+            }
+        )
+        response.raise_for_status()
+        data = response.json()
+        
+        if "errors" in data:
+            return {}, {"commits": 0, "issues": 0, "pull_requests": 0, "pr_reviews": 0}
+        
+        if "data" not in data or "user" not in data["data"]:
+            return {}, {"commits": 0, "issues": 0, "pull_requests": 0, "pr_reviews": 0}
+        
+        contributions_by_repo = defaultdict(int)
+        collection = data["data"]["user"]["contributionsCollection"]
+        
+        # Track counts per contribution type for diagnostics
+        type_counts = {
+            "commits": 0,
+            "issues": 0,
+            "pull_requests": 0,
+            "pr_reviews": 0
+        }
+        
+        # Commits
+        commit_repos = collection.get("commitContributionsByRepository", [])
+        for repo_data in commit_repos:
+            repo_name = repo_data["repository"]["nameWithOwner"]
+            count = repo_data["contributions"]["totalCount"]
+            contributions_by_repo[repo_name] += count
+            type_counts["commits"] += count
+        
+        # Issues
+        issue_repos = collection.get("issueContributionsByRepository", [])
+        for repo_data in issue_repos:
+            repo_name = repo_data["repository"]["nameWithOwner"]
+            count = repo_data["contributions"]["totalCount"]
+            contributions_by_repo[repo_name] += count
+            type_counts["issues"] += count
+        
+        # Pull Requests
+        pr_repos = collection.get("pullRequestContributionsByRepository", [])
+        for repo_data in pr_repos:
+            repo_name = repo_data["repository"]["nameWithOwner"]
+            count = repo_data["contributions"]["totalCount"]
+            contributions_by_repo[repo_name] += count
+            type_counts["pull_requests"] += count
+        
+        # PR Reviews
+        review_repos = collection.get("pullRequestReviewContributionsByRepository", [])
+        for repo_data in review_repos:
+            repo_name = repo_data["repository"]["nameWithOwner"]
+            count = repo_data["contributions"]["totalCount"]
+            contributions_by_repo[repo_name] += count
+            type_counts["pr_reviews"] += count
+        
+        return contributions_by_repo, type_counts
+    except Exception as e:
+        return {}, {"commits": 0, "issues": 0, "pull_requests": 0, "pr_reviews": 0}
+
+
+# Note: The GitHub contributionsCollection API automatically includes contributions
+# from ALL repositories the user has access to (based on token permissions),
+# including private organization repos. No need to specify additional repos here.
+# 
+# IMPORTANT LIMITATIONS of GitHub's Contribution Calendar API:
+# 1. It does NOT count ALL commits - only "contributions" which include:
+#    - Commits to the default branch (usually main/master)
+#    - Commits that are part of merged pull requests
+#    - Issues and pull requests opened
+#    - Pull request reviews
+# 2. It does NOT count:
+#    - Commits in branches that aren't merged to default
+#    - Commits in forks that aren't merged upstream
+#    - Commits in branches that are later deleted
+#    - Some commits in private repos (depending on settings)
+# 
+# This means the total contributions count will be LOWER than the actual commit count
+# in repositories. The contribution calendar is designed to show "meaningful" contributions,
+# not every single commit.
+#
+# GitHub's contribution calendar API limitation: max 1 year per query
+# To get all-time data, we query multiple 1-year ranges and combine them
+MAX_YEARS_BACK = 15  # Query up to 15 years back (increased to catch older contributions)
+MAX_CONSECUTIVE_EMPTY = 2  # Stop after 2 consecutive empty years
+ALIASED_BATCH_SIZE = 5  # 1-year windows per aliased calendar query, after the current year
+
+CALENDAR_QUERY = """
+query($username: String!, $from: DateTime!, $to: DateTime!) {
+  user(login: $username) {
+    contributionsCollection(from: $from, to: $to) {
+      contributionCalendar {
+        totalContributions
+        weeks {
+          contributionDays {
+            date
+            contributionCount
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+CALENDAR_QUERY_NO_DATES = """
+query($username: String!) {
+  user(login: $username) {
+    contributionsCollection {
+      contributionCalendar {
+        totalContributions
+        weeks {
+          contributionDays {
+            date
+            contributionCount
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+def year_ranges(now, max_years_back=MAX_YEARS_BACK):
+    """Yield (from, to) ISO timestamps of 1-year windows, most recent first"""
+    to_date = (now + timedelta(days=1)).isoformat() + "Z"
+    for year_offset in range(max_years_back):
+        from_date_obj = now - timedelta(days=365 * (year_offset + 1))
+        from_date = from_date_obj.isoformat() + "Z"
+        
+        # For the first query (most recent year), use today as end date
+        # For older queries, use the start of the next year as end date
+        if year_offset == 0:
+            query_to_date = to_date
+        else:
+            query_to_date = (now - timedelta(days=365 * year_offset)).isoformat() + "Z"
+        yield from_date, query_to_date
+
+def fetch_contribution_weeks(client, username, max_years_back=MAX_YEARS_BACK, planner=None):
+    """Fetch the raw calendar weeks of every 1-year range with contributions"""
+    # Query multiple 1-year ranges going back in time
+    # Start from today and go back in 1-year increments
+    all_weeks = []
+    consecutive_empty_years = 0  # Track consecutive years with no contributions
+
+    for year_offset, (from_date, query_to_date) in enumerate(year_ranges(datetime.now(), max_years_back)):
+        try:
+            started = time.monotonic()
+            response = client.post(
+                GRAPHQL_URL,
+                json={
+                    "query": CALENDAR_QUERY,
+                    "variables": {
+                        "username": username,
+                        "from": from_date,
+                        "to": query_to_date
+                    }
+                }
+            )
+            if planner is not None:
+                planner.observe("calendar", "calendar_yearly", time.monotonic() - started, 1)
+            
+            response.raise_for_status()
+            with span("parse", window=from_date[:10]):
+                data = response.json()
+            
+            if "errors" in data:
+                error_msg = data["errors"][0].get("message", "")
+                if "must not exceed 1 year" in error_msg:
+                    consecutive_empty_years += 1
+                    if consecutive_empty_years >= MAX_CONSECUTIVE_EMPTY:
+                        break
+                    continue
+                consecutive_empty_years += 1
+                if consecutive_empty_years >= MAX_CONSECUTIVE_EMPTY:
+                    break
+                continue
+            
+            contributions_collection = data["data"]["user"]["contributionsCollection"]
+            calendar = contributions_collection["contributionCalendar"]
+            year_weeks = calendar["weeks"]
+            year_total = calendar["totalContributions"]
+            
+            if not year_weeks or year_total == 0:
+                consecutive_empty_years += 1
+                if consecutive_empty_years >= MAX_CONSECUTIVE_EMPTY:
+                    break
+                continue
+            
+            # Reset consecutive empty years counter if we found contributions
+            consecutive_empty_years = 0
+            
+            all_weeks.extend(year_weeks)
+            
+        except DeadlineExceeded:
+            if not all_weeks:
+                raise
+            # Out of time: keep the most recent years fetched so far
+            break
+        except Exception as e:
+            if year_offset == 0:
+                # If the first query fails, fall back to query without dates
+                response2 = client.post(
+                    GRAPHQL_URL,
+                    json={"query": CALENDAR_QUERY_NO_DATES, "variables": {"username": username}}
+                )
+                response2.raise_for_status()
+                data2 = response2.json()
+                if "errors" not in data2:
+                    contributions_collection = data2["data"]["user"]["contributionsCollection"]
+                    calendar = contributions_collection["contributionCalendar"]
+                    all_weeks = calendar["weeks"]
+                break
+            else:
+                # For older years, just skip if there's an error
+                break
+
+    if not all_weeks:
+        raise Exception("No contribution data found")
+    return all_weeks
+
+def calendar_windows_query(window_count):
+    """Build one query with an aliased contribution calendar per 1-year window"""
+    variables = ", ".join(f"$from{i}: DateTime!, $to{i}: DateTime!" for i in range(window_count))
+    windows = "\n".join(
+        f"""    y{i}: contributionsCollection(from: $from{i}, to: $to{i}) {{
+      contributionCalendar {{
+        totalContributions
+        weeks {{
+          contributionDays {{
+            date
+            contributionCount
+          }}
+        }}
+      }}
+    }}"""
+        for i in range(window_count)
+    )
+    return f"""
+query($username: String!, {variables}) {{
+  user(login: $username) {{
+{windows}
+  }}
+  rateLimit {{
+    cost
+  }}
+}}
+"""
+
+def aliased_batches(ranges, batch_size=ALIASED_BATCH_SIZE):
+    """Split year ranges into query batches: the current year alone, then up to batch_size years each"""
+    batches = [ranges[:1]] if ranges else []
+    batches.extend(ranges[start:start + batch_size] for start in range(1, len(ranges), batch_size))
+    return batches
+
+def fetch_contribution_weeks_aliased(client, username, max_years_back=MAX_YEARS_BACK, batch_size=ALIASED_BATCH_SIZE, planner=None):
+    """Fetch the same 1-year windows as fetch_contribution_weeks, several per aliased query"""
+    ranges = list(year_ranges(datetime.now(), max_years_back))
+    all_weeks = []
+    consecutive_empty_years = 0
+    # The current year comes back on its own first, so a deadline still leaves a card to render
+    for batch in aliased_batches(ranges, batch_size):
+        variables = {"username": username}
+        for i, (from_date, to_date) in enumerate(batch):
+            variables[f"from{i}"] = from_date
+            variables[f"to{i}"] = to_date
+        started = time.monotonic()
+        try:
+            response = client.post(GRAPHQL_URL, json={"query": calendar_windows_query(len(batch)), "variables": variables})
+        except DeadlineExceeded:
+            if not all_weeks:
+                raise
+            # Out of time: keep the most recent years fetched so far
+            if client.deadline is not None:
+                client.deadline.partial = True
+            break
+        response.raise_for_status()
+        with span("parse", windows=len(batch)):
+            data = response.json().get("data") or {}
+        if planner is not None:
+            planner.observe("calendar", "calendar_aliased", time.monotonic() - started, (data.get("rateLimit") or {}).get("cost", 1))
+        user = data.get("user") or {}
+        # Same stopping rule as the yearly path: two empty (or failed) windows in a row
+        for i in range(len(batch)):
+            calendar = (user.get(f"y{i}") or {}).get("contributionCalendar")
+            if not calendar or not calendar["weeks"] or calendar["totalContributions"] == 0:
+                consecutive_empty_years += 1
+                if consecutive_empty_years >= MAX_CONSECUTIVE_EMPTY:
+                    break
+                continue
+            consecutive_empty_years = 0
+            all_weeks.extend(calendar["weeks"])
+        if consecutive_empty_years >= MAX_CONSECUTIVE_EMPTY:
+            break
+
+    if not all_weeks:
+        raise Exception("No contribution data found")
+    return all_weeks
+
+def merge_contribution_weeks(all_weeks):
+    """Combine all weeks and deduplicate by date (in case of overlaps)"""
+    contributions_by_date = {}
+    for week in all_weeks:
+        for day in week["contributionDays"]:
+            date_str = day["date"]
+            try:
+                date_obj = datetime.strptime(date_str, "%Y-%m-%d").date()
+            except:
+                date_obj = datetime.fromisoformat(date_str.replace("Z", "")).date()
+            count = day["contributionCount"]
+            # If date already exists, use the maximum count (handles overlaps)
+            if date_obj in contributions_by_date:
+                contributions_by_date[date_obj] = max(contributions_by_date[date_obj], count)
+            else:
+                contributions_by_date[date_obj] = count
+    return contributions_by_date
+
+def fetch_contribution_calendar(client, username, max_years_back=MAX_YEARS_BACK, planner=None):
+    """Fetch the all-time contribution calendar as a {date: count} mapping"""
+    if planner is None:
+        all_weeks = fetch_contribution_weeks(client, username, max_years_back)
+        with span("aggregate", weeks=len(all_weeks)):
+            return merge_contribution_weeks(all_weeks)
+
+    # The yearly path stops as soon as history runs out; the aliased path needs fewer
+    # round trips but pays for whole batches. Size both from last run's history length
+    years = min(max_years_back, planner.hint(f"calendar_years/{username}", 5) + MAX_CONSECUTIVE_EMPTY)
+    access_path = planner.choose("calendar", {
+        "calendar_yearly": years,
+        "calendar_aliased": len(aliased_batches(range(years)))
+    })
+    if access_path == "calendar_aliased":
+        try:
+            all_weeks = fetch_contribution_weeks_aliased(client, username, max_years_back, planner=planner)
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            print(f"  Aliased calendar query failed ({e}), falling back to yearly queries")
+            all_weeks = fetch_contribution_weeks(client, username, max_years_back, planner)
+    else:
+        all_weeks = fetch_contribution_weeks(client, username, max_years_back, planner)
+    planner.report("calendar")
+    with span("aggregate", weeks=len(all_weeks)):
+        contributions_by_date = merge_contribution_weeks(all_weeks)
+    active_days = [day for day, count in contributions_by_date.items() if count > 0]
+    # A calendar cut short by the deadline would understate the history length
+    if active_days and not (client.deadline is not None and client.deadline.partial):
+        first_year = (datetime.now().date() - min(active_days)).days // 365 + 1
+        planner.set_hint(f"calendar_years/{username}", min(max_years_back, first_year))
+    return contributions_by_date
+
+def fetch_calendar_range(client, username, from_day, to_day):
+    """Fetch the calendar of a span of at most one year as a {date: count} mapping"""
+    response = client.post(
+        GRAPHQL_URL,
+        json={
+            "query": CALENDAR_QUERY,
+            "variables": {
+                "username": username,
+                "from": f"{from_day.isoformat()}T00:00:00Z",
+                "to": f"{to_day.isoformat()}T23:59:59Z"
+            }
+        }
+    )
+    response.raise_for_status()
+    data = response.json()
+    if "errors" in data:
+        raise Exception(data["errors"][0].get("message", "GraphQL error"))
+    return merge_contribution_weeks(data["data"]["user"]["contributionsCollection"]["contributionCalendar"]["weeks"])
+
+def refresh_contribution_calendar(client, username, state, planner=None):
+    """Update the calendar kept in `state` using the events feed, fetching only what changed"""
+    cached = state.get_calendar(username)
+    activity = check_activity(client, state, username, "streak")
+    if cached is not None and activity["complete"] and not activity["changed"]:
+        print("No new activity since the last run, using the stored calendar")
+        contributions_by_date = cached
+    elif cached is not None and activity["complete"] and activity["days"]:
+        # Event times are UTC while the calendar uses the user's timezone, so pad a day on each side
+        from_day = min(activity["days"]) - timedelta(days=1)
+        to_day = max(activity["days"]) + timedelta(days=1)
+        if activity["pushed"]:
+            # Commits are counted on their author date, which can be days before the push
+            # and is not in the feed: refetch the whole last year, still a single request
+            from_day = min(from_day, to_day - timedelta(days=364))
+        if (to_day - from_day).days < 365:
+            print(f"Refreshing the calendar from {from_day} to {to_day}")
+            contributions_by_date = dict(cached)
+            contributions_by_date.update(fetch_calendar_range(client, username, from_day, to_day))
+        else:
+            contributions_by_date = fetch_contribution_calendar(client, username, planner=planner)
+    else:
+        contributions_by_date = fetch_contribution_calendar(client, username, planner=planner)
+    if client.deadline is not None and client.deadline.partial:
+        # Older years the deadline cut off keep their stored counts, and the feed
+        # position is not committed so the next run backfills with a full fetch
+        contributions_by_date = {**(cached or {}), **contributions_by_date}
+        state.put_calendar(username, contributions_by_date)
+        return contributions_by_date
+    state.put_calendar(username, contributions_by_date)
+    commit_activity(state, username, "streak", activity)
+    return contributions_by_date
+
+def rebuild_weeks(contributions_by_date):
+    """Rebuild weeks structure from combined data, grouped by week (starting from Monday)"""
+    weeks = []
+    if contributions_by_date:
+        sorted_dates = sorted(contributions_by_date.keys())
+        first_date = sorted_dates[0]
+        # Find the Monday of the week containing the first date
+        days_since_monday = first_date.weekday()
+        week_start = first_date - timedelta(days=days_since_monday)
+        
+        current_week_start = week_start
+        current_week_days = []
+        
+        for date_obj in sorted_dates:
+            # If this date is beyond the current week, start a new week
+            while date_obj >= current_week_start + timedelta(days=7):
+                if current_week_days:
+                    weeks.append({"contributionDays": current_week_days})
+                current_week_start += timedelta(days=7)
+                current_week_days = []
+            
+            # Add this day to the current week
+            current_week_days.append({
+                "date": date_obj.isoformat(),
+                "contributionCount": contributions_by_date[date_obj]
+            })
+        
+        # Add the last week
+        if current_week_days:
+            weeks.append({"contributionDays": current_week_days})
+    return weeks
+
+def fetch_repo_contributions(client, username, max_years_back=MAX_YEARS_BACK):
+    """Get contributions per repository for all time (query per year range and combine)"""
+    repo_contributions = defaultdict(int)
+    total_type_counts = {
+        "commits": 0,
+        "issues": 0,
+        "pull_requests": 0,
+        "pr_reviews": 0
+    }
+    
+    for from_date, query_to_date in year_ranges(datetime.now(), max_years_back):
+        try:
+            result = get_contributions_per_repo(client, username, from_date, query_to_date)
+            if result:
+                year_repo_contribs, year_type_counts = result
+                if year_repo_contribs:
+                    for repo_name, count in year_repo_contribs.items():
+                        repo_contributions[repo_name] += count
+                    # Aggregate type counts
+                    for contrib_type, count in year_type_counts.items():
+                        total_type_counts[contrib_type] += count
+        except Exception as e:
+            # Continue with other years even if one fails
+            pass
+    return repo_contributions, total_type_counts
+
+# Format dates for display
+def format_date(date_obj, include_year=True):
+    if date_obj is None:
+        return "N/A"
+    if include_year:
+        return date_obj.strftime("%b %d, %Y")
+    else:
+        return date_obj.strftime("%b %d")
+
+def compute_streaks(contributions_by_date, today=None):
+    """Compute the card values (totals, streaks and their date ranges) from a calendar"""
+    # Recalculate total from combined data
+    total_contributions = sum(contributions_by_date.values())
+
+    # Calculate current streak
+    if today is None:
+        today = datetime.now().date()
+    current_streak = 0
+    longest_streak = 0
+
+    # contributions_by_date is already built from combined data
+    all_dates = sorted(contributions_by_date.keys())
+
+    if not all_dates:
+        raise Exception("No contribution data found")
+
+    # all_dates is already sorted from the combined data
+    most_recent_date = all_dates[-1]
+    
+    # Find the most recent day with contributions
+    most_recent_contrib_date = None
+    for date_obj in reversed(all_dates):
+        if contributions_by_date[date_obj] > 0:
+            most_recent_contrib_date = date_obj
+            break
+    
+    if most_recent_contrib_date:
+        # Calculate current streak starting from the most recent contribution date
+        # Only consider it a "current" streak if it's within the last 2 days (today or yesterday)
+        days_since_last_contrib = (today - most_recent_contrib_date).days
+        
+        if days_since_last_contrib <= 1:
+            # There's an active streak - count backwards from most recent contribution
+            check_date = most_recent_contrib_date
+            current_streak = 0
+            
+            while check_date >= all_dates[0]:
+                if check_date in contributions_by_date and contributions_by_date[check_date] > 0:
+                    current_streak += 1
+                    check_date = check_date - timedelta(days=1)
+                else:
+                    # Check if this is just a missing date in our data (weekend gap, etc.)
+                    # Allow up to 1 day gap
+                    next_check = check_date - timedelta(days=1)
+                    if next_check in contributions_by_date and contributions_by_date[next_check] > 0:
+                        # There's a contribution the day after this gap, but this specific day has none
+                        # This breaks the streak
+                        break
+                    else:
+                        # This date is not in our data at all, treat as no contribution and break
+                        break
+
+    # Calculate longest streak: go through all dates chronologically
+    # Build a list of all dates with contributions
+    contrib_dates = [d for d in sorted(contributions_by_date.keys()) if contributions_by_date[d] > 0]
+    
+    if contrib_dates:
+        temp_streak = 1  # Start with 1 for the first contribution
+        longest_streak = 1
+        
+        for i in range(1, len(contrib_dates)):
+            prev_date = contrib_dates[i - 1]
+            curr_date = contrib_dates[i]
+            days_diff = (curr_date - prev_date).days
+            
+            if days_diff == 1:
+                # Consecutive day
+                temp_streak += 1
+                longest_streak = max(longest_streak, temp_streak)
+            else:
+                # Gap in streak
+                temp_streak = 1
+
+
+    # Calculate dates for display
+    # Current streak start date
+    current_streak_start = None
+    if current_streak > 0:
+        # Find the start date of current streak
+        check_date = today
+        days_back = 0
+        while days_back < current_streak and check_date >= all_dates[0]:
+            if check_date in contributions_by_date and contributions_by_date[check_date] > 0:
+                current_streak_start = check_date
+                check_date = check_date - timedelta(days=1)
+                days_back += 1
+            else:
+                break
+          
+    # Longest streak dates (find the most recent longest streak)
+    longest_streak_start = None
+    longest_streak_end = None
+    if longest_streak > 0:
+        temp_streak = 0
+        temp_start = None
+        for date_obj in sorted(contributions_by_date.keys()):
+            if contributions_by_date[date_obj] > 0:
+                if temp_streak == 0:
+                    temp_start = date_obj
+                temp_streak += 1
+                # Update if this matches the longest streak (will get the most recent one)
+                if temp_streak == longest_streak:
+                    longest_streak_start = temp_start
+                    longest_streak_end = date_obj
+            else:
+                temp_streak = 0
+                temp_start = None
+
+    # Calculate date ranges
+    # Use the most recent contribution date, not the API's last date (which might be tomorrow)
+    current_streak_end = most_recent_contrib_date if current_streak > 0 and most_recent_contrib_date else None
+    current_streak_date_str = f"{format_date(current_streak_start, include_year=False)} - {format_date(current_streak_end, include_year=False)}" if current_streak_start and current_streak_end else "N/A"
+
+    longest_streak_end_date = None
+    if longest_streak > 0 and longest_streak_start:
+        # Calculate end date of longest streak
+        temp_streak = 0
+        for date_obj in sorted(contributions_by_date.keys()):
+            if contributions_by_date[date_obj] > 0:
+                temp_streak += 1
+                if temp_streak == longest_streak and date_obj >= longest_streak_start:
+                    longest_streak_end_date = date_obj
+            else:
+                temp_streak = 0
+
+    longest_streak_date_str = f"{format_date(longest_streak_start, include_year=False)} - {format_date(longest_streak_end_date, include_year=True)}" if longest_streak_start and longest_streak_end_date else format_date(longest_streak_start) if longest_streak_start else "N/A"
+
+    # Get earliest contribution date for total contributions range
+    # Use the earliest date with actual contributions (> 0), not just the calendar start
+    earliest_with_contribs = None
+    for date_obj in all_dates:
+        if contributions_by_date[date_obj] > 0:
+            earliest_with_contribs = date_obj
+            break
+    
+    earliest_date_str = format_date(earliest_with_contribs if earliest_with_contribs else all_dates[0]) if all_dates else "N/A"
+    total_contributions_date_str = f"{earliest_date_str} - Present"
+
+    return {
+        "total_contributions": total_contributions,
+        "current_streak": current_streak,
+        "longest_streak": longest_streak,
+        "total_contributions_date_str": total_contributions_date_str,
+        "current_streak_date_str": current_streak_date_str,
+        "longest_streak_date_str": longest_streak_date_str,
+    }
+
+def render_svg(stats, partial=False):
+    """Build the streak card SVG document and return it as UTF-8 bytes"""
+    # Imported here so runs that stop before rendering never load the XML stack
+    import xml.etree.ElementTree as ET
+
+    total_contributions = stats["total_contributions"]
+    current_streak = stats["current_streak"]
+    longest_streak = stats["longest_streak"]
+    total_contributions_date_str = stats["total_contributions_date_str"]
+    current_streak_date_str = stats["current_streak_date_str"]
+    longest_streak_date_str = stats["longest_streak_date_str"]
+
+    # Theme colors (matching image design)
+    colors = {
+        "bg": "#0d1117",
+        "text": "#ff6e96",
+        "text_yellow": "#ffd700",
+        "text_blue": "#58a6ff",
+        "date": "#58a6ff",
+        "title": "#ff6e96"
+    }
+
+    # Generate SVG with 3 columns - matching reference design
+    svg_width = 700
+    svg_height = 200
+    column_width = svg_width // 3
+    column_center_x = [column_width // 2, column_width + column_width // 2, 2 * column_width + column_width // 2]
+    content_y_start = 115
+
+    svg = ET.Element("svg", {
+        "width": str(svg_width),
+        "height": str(svg_height),
+        "xmlns": "http://www.w3.org/2000/svg"
+    })
+
+    # Background with subtle gradient effect
+    bg = ET.SubElement(svg, "rect", {
+        "width": str(svg_width),
+        "height": str(svg_height),
+        "fill": colors["bg"],
+        "rx": "8"
+    })
+
+    # Title with better styling - positioned higher to avoid overlap
+    title = ET.SubElement(svg, "text", {
+        "x": str(svg_width // 2),
+        "y": "35",
+        "text-anchor": "middle",
+        "font-family": "Segoe UI, -apple-system, BlinkMacSystemFont, sans-serif",
+        "font-size": "28",
+        "font-weight": "700",
+        "fill": colors["title"],
+        "letter-spacing": "0.5"
+    })
+    title.text = "GitHub Streak"
+
+    # Vertical dividers between columns
+    divider1 = ET.SubElement(svg, "line", {
+        "x1": str(column_width),
+        "y1": str(content_y_start - 20),
+        "x2": str(column_width),
+        "y2": str(content_y_start + 80),
+        "stroke": colors["text"],
+        "stroke-width": "1",
+        "opacity": "0.3"
+    })
+
+    divider2 = ET.SubElement(svg, "line", {
+        "x1": str(2 * column_width),
+        "y1": str(content_y_start - 20),
+        "x2": str(2 * column_width),
+        "y2": str(content_y_start + 80),
+        "stroke": colors["text"],
+        "stroke-width": "1",
+        "opacity": "0.3"
+    })
+
+    # Column 1: Total Contributions (left)
+    col1_x = column_center_x[0]
+
+    total_value = ET.SubElement(svg, "text", {
+        "x": str(col1_x),
+        "y": str(content_y_start),
+        "text-anchor": "middle",
+        "font-family": "Segoe UI, -apple-system, BlinkMacSystemFont, sans-serif",
+        "font-size": "48",
+        "font-weight": "700",
+        "fill": colors["text"]
+    })
+    total_value.text = f"{total_contributions:,}"
+
+    total_label = ET.SubElement(svg, "text", {
+        "x": str(col1_x),
+        "y": str(content_y_start + 35),
+        "text-anchor": "middle",
+        "font-family": "Segoe UI, -apple-system, BlinkMacSystemFont, sans-serif",
+        "font-size": "14",
+        "fill": colors["text"],
+        "font-weight": "500"
+    })
+    total_label.text = "Total Contributions"
+
+    total_date = ET.SubElement(svg, "text", {
+        "x": str(col1_x),
+        "y": str(content_y_start + 55),
+        "text-anchor": "middle",
+        "font-family": "Segoe UI, -apple-system, BlinkMacSystemFont, sans-serif",
+        "font-size": "11",
+        "fill": colors["date"]
+    })
+    total_date.text = total_contributions_date_str
+
+    # Column 2: Current Streak (middle) - with circular element and flame
+    col2_x = column_center_x[1]
+    # Align circle center with the visual center of numbers in other columns
+    # For 48px font, visual center is approximately 20px above baseline
+    circle_center_y = content_y_start - 20
+    circle_radius = 35
+
+    # Draw circle for current streak
+    circle = ET.SubElement(svg, "circle", {
+        "cx": str(col2_x),
+        "cy": str(circle_center_y),
+        "r": str(circle_radius),
+        "fill": "none",
+        "stroke": colors["text"],
+        "stroke-width": "6"
+    })
+
+    # Draw flame icon (simplified SVG path)
+    flame_path = f"M {col2_x} {circle_center_y - circle_radius - 8} L {col2_x - 4} {circle_center_y - circle_radius - 2} L {col2_x} {circle_center_y - circle_radius + 2} L {col2_x + 4} {circle_center_y - circle_radius - 2} Z"
+    flame = ET.SubElement(svg, "path", {
+        "d": flame_path,
+        "fill": colors["text"]
+    })
+
+    # Number inside circle (yellow) - centered vertically
+    streak_value = ET.SubElement(svg, "text", {
+        "x": str(col2_x),
+        "y": str(circle_center_y),
+        "text-anchor": "middle",
+        "dominant-baseline": "central",
+        "font-family": "Segoe UI, -apple-system, BlinkMacSystemFont, sans-serif",
+        "font-size": "36",
+        "font-weight": "700",
+        "fill": colors["text_yellow"]
+    })
+    streak_value.text = f"{current_streak}"
+
+    streak_label = ET.SubElement(svg, "text", {
+        "x": str(col2_x),
+        "y": str(circle_center_y + circle_radius + 28),
+        "text-anchor": "middle",
+        "font-family": "Segoe UI, -apple-system, BlinkMacSystemFont, sans-serif",
+        "font-size": "14",
+        "fill": colors["text_yellow"],
+        "font-weight": "500"
+    })
+    streak_label.text = "Current Streak"
+
+    streak_date = ET.SubElement(svg, "text", {
+        "x": str(col2_x),
+        "y": str(circle_center_y + circle_radius + 48),
+        "text-anchor": "middle",
+        "font-family": "Segoe UI, -apple-system, BlinkMacSystemFont, sans-serif",
+        "font-size": "11",
+        "fill": colors["date"]
+    })
+    streak_date.text = current_streak_date_str
+
+    # Column 3: Longest Streak (right)
+    col3_x = column_center_x[2]
+
+    longest_value = ET.SubElement(svg, "text", {
+        "x": str(col3_x),
+        "y": str(content_y_start),
+        "text-anchor": "middle",
+        "font-family": "Segoe UI, -apple-system, BlinkMacSystemFont, sans-serif",
+        "font-size": "48",
+        "font-weight": "700",
+        "fill": colors["text"]
+    })
+    longest_value.text = f"{longest_streak}"
+
+    longest_label = ET.SubElement(svg, "text", {
+        "x": str(col3_x),
+        "y": str(content_y_start + 35),
+        "text-anchor": "middle",
+        "font-family": "Segoe UI, -apple-system, BlinkMacSystemFont, sans-serif",
+        "font-size": "14",
+        "fill": colors["text"],
+        "font-weight": "500"
+    })
+    longest_label.text = "Longest Streak"
+
+    longest_date = ET.SubElement(svg, "text", {
+        "x": str(col3_x),
+        "y": str(content_y_start + 55),
+        "text-anchor": "middle",
+        "font-family": "Segoe UI, -apple-system, BlinkMacSystemFont, sans-serif",
+        "font-size": "11",
+        "fill": colors["date"]
+    })
+    longest_date.text = longest_streak_date_str
+
+    if partial:
+        # Rendered from incomplete data after the deadline; the next run backfills
+        partial_note = ET.SubElement(svg, "text", {
+            "x": str(svg_width - 12),
+            "y": str(svg_height - 10),
+            "text-anchor": "end",
+            "font-family": "Segoe UI, -apple-system, BlinkMacSystemFont, sans-serif",
+            "font-size": "10",
+            "fill": colors["date"]
+        })
+        partial_note.text = "partial data"
+
+    tree = ET.ElementTree(svg)
+    ET.indent(tree, space="  ")
+    return ET.tostring(svg, encoding="utf-8", xml_declaration=True)
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Run tracing
+Records nested spans (run, phases, pages, API requests, parsing) with attributes
+and writes them in Chrome trace-event format, which chrome://tracing and Perfetto
+open as a per-thread timeline. Enabled with TRACE_FILE; span() is a no-op otherwise.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+import phases
+from metrics import endpoint_label
+
+_tracer = None
+
+
+class Tracer:
+    """Collects complete ("X") trace events from every thread of the process"""
+
+    def __init__(self, path):
+        self.path = path
+        self.pid = os.getpid()
+        self.origin = time.perf_counter()
+        self.lock = threading.Lock()
+        self.events = []
+        self.threads = {}
+        self._phase_starts = {}
+
+    def _us(self, perf_time):
+        return (perf_time - self.origin) * 1_000_000
+
+    def add(self, name, category, started, ended, args=None):
+        """Record a span from two time.perf_counter() readings"""
+        tid = threading.get_ident()
+        event = {
+            "name": name, "cat": category, "ph": "X", "pid": self.pid, "tid": tid,
+            "ts": self._us(started), "dur": self._us(ended) - self._us(started)
+        }
+        if args:
+            event["args"] = args
+        with self.lock:
+            self.threads.setdefault(tid, threading.current_thread().name)
+            self.events.append(event)
+
+    def observe_phase(self, event, name):
+        key = (threading.get_ident(), name)
+        if event == "start":
+            self._phase_starts[key] = time.perf_counter()
+            return
+        started = self._phase_starts.pop(key, None)
+        if started is not None:
+            self.add(name, "phase", started, time.perf_counter())
+
+    def observe_request(self, method, url, response, seconds):
+        ended = time.perf_counter()
+        path = urlparse(url).path
+        args = {
+            "url": path,
+            "status": response.status_code,
+            "cache": "hit" if getattr(response, "from_cache", False) else "miss",
+            "bytes": len(response.content)
+        }
+        if path.startswith("/repos/"):
+            args["repo"] = "/".join(path.split("/")[2:4])
+        self.add(f"{method} {endpoint_label(url)}", "request", ended - seconds, ended, args)
+
+    def write(self):
+        """Write the trace, with the whole run as the outermost span"""
+        self.add("run", "run", self.origin, time.perf_counter())
+        with self.lock:
+            metadata = [
+                {"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid, "args": {"name": name}}
+                for tid, name in self.threads.items()
+            ]
+            trace = {"traceEvents": metadata + sorted(self.events, key=lambda event: event["ts"]), "displayTimeUnit": "ms"}
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(trace, f)
+        os.replace(tmp_path, self.path)
+
+
+def tracer_from_env():
+    """Start tracing into TRACE_FILE if it is set; returns the Tracer or None"""
+    global _tracer
+    path = os.environ.get("TRACE_FILE")
+    if not path:
+        return None
+    _tracer = Tracer(path)
+    phases.add_observer(_tracer.observe_phase)
+    return _tracer
+
+
+@contextmanager
+def span(name, **args):
+    """Trace a block as a span with attributes, when tracing is on"""
+    if _tracer is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _tracer.add(name, "span", started, time.perf_counter(), args)
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Webhook-driven incremental updates
+Applies GitHub push, pull_request and repository events to the stats cache: new
+contributions are added to the affected calendar day right away, and only the
+touched repositories are refetched for language data. Saved payloads can be
+replayed against a cache snapshot to test the whole path locally.
+"""
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import queue
+import sys
+import threading
+from datetime import datetime
+
+import stats_api
+from github_api import GitHubClient
+from languages_stats import fetch_repo_languages
+from stats_cache import SnapshotError, StatsCache
+
+EVENTS = ("push", "pull_request", "repository")
+
+
+def verify_signature(secret, body, signature):
+    """Check an X-Hub-Signature-256 header against the raw request body"""
+    if not signature or not signature.startswith("sha256="):
+        return False
+    expected = hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature[len("sha256="):])
+
+
+def load_payload_file(path):
+    """Read a saved delivery: {"event": "<X-GitHub-Event>", "delivery": "<X-GitHub-Delivery>", "payload": {...}}"""
+    with open(path, encoding="utf-8") as f:
+        delivery = json.load(f)
+    return delivery["event"], delivery["payload"], delivery.get("delivery")
+
+
+def _day(timestamp):
+    return datetime.fromisoformat(timestamp.replace("Z", "+00:00")).date()
+
+
+def _repo_holders(cache, users, repo):
+    # Cached users whose language totals include the repository
+    return {username for username in users if cache.has_repo(username, repo)}
+
+
+def apply_event(cache, event, payload):
+    """Apply one event to the cache and return (users with new contributions, users with dirty repos)"""
+    users = set(cache.updated_at())
+    calendar_users = set()
+    dirty_users = set()
+    repository = payload.get("repository") or {}
+    repo = repository.get("full_name")
+    owner = (repository.get("owner") or {}).get("login")
+
+    def mark(username):
+        if repo and username in users and cache.mark_dirty(username, repo):
+            dirty_users.add(username)
+
+    if event == "push":
+        # The calendar only counts commits that land on the default branch
+        if payload.get("ref") != f"refs/heads/{repository.get('default_branch')}":
+            return calendar_users, dirty_users
+        authors = set()
+        for commit in payload.get("commits", []):
+            author = (commit.get("author") or {}).get("username")
+            if not commit.get("distinct", True) or author not in users:
+                continue
+            if cache.add_contributions(author, _day(commit["timestamp"])) is not None:
+                calendar_users.add(author)
+            authors.add(author)
+        targets = _repo_holders(cache, users, repo) | authors
+        if owner and not repository.get("fork"):
+            targets.add(owner)
+        for username in targets:
+            mark(username)
+
+    elif event == "pull_request":
+        pull_request = payload.get("pull_request") or {}
+        author = (pull_request.get("user") or {}).get("login")
+        if payload.get("action") == "opened" and author in users:
+            if cache.add_contributions(author, _day(pull_request["created_at"])) is not None:
+                calendar_users.add(author)
+        if payload.get("action") == "closed" and pull_request.get("merged"):
+            for username in _repo_holders(cache, users, repo) | ({author} - {None}):
+                mark(username)
+
+    elif event == "repository":
+        holders = _repo_holders(cache, users, repo)
+        if payload.get("action") == "deleted":
+            for username in holders:
+                cache.update_repo_languages(username, repo, None)
+                dirty_users.add(username)
+        elif not repository.get("fork"):
+            for username in holders | ({owner} - {None}):
+                mark(username)
+
+    return calendar_users, dirty_users
+
+
+def refetch_dirty(client, cache, username):
+    """Refetch language data for the user's dirty repositories and return the new totals"""
+    languages_data = cache.get_languages(username)
+    for repo in sorted(cache.take_dirty(username)):
+        try:
+            repo_langs = fetch_repo_languages(client, repo)
+        except Exception as e:
+            # Keep the repository dirty so the next event or refresh retries it
+            cache.mark_dirty(username, repo)
+            print(f"  ✗ Failed to refetch languages for {repo}: {e}")
+            continue
+        languages_data = cache.update_repo_languages(username, repo, repo_langs)
+        print(f"  ✓ Refetched: {repo}")
+    return languages_data
+
+
+def render_streak(cache, username):
+    return stats_api.streak_card_from_calendar(cache.get_calendar(username))[0]
+
+
+def render_languages(cache, username):
+    return stats_api.languages_card_from_totals(cache.get_languages(username))[0]
+
+
+class WebhookIngest:
+    """Applies events as they arrive and refetches dirty repositories in the background"""
+
+    def __init__(self, client, cache, on_streak, on_languages):
+        self.client = client
+        self.cache = cache
+        self.on_streak = on_streak
+        self.on_languages = on_languages
+        self.pending = queue.Queue()
+        self.thread = None
+
+    def handle(self, event, payload, delivery_id=None):
+        """Apply an event; returns False for event types that are ignored"""
+        if event not in EVENTS:
+            return False
+        # A redelivered push would count its contributions twice; applied delivery
+        # IDs live in the cache, so they survive restarts through its snapshot
+        if self.cache.seen_delivery(delivery_id):
+            return True
+        calendar_users, dirty_users = apply_event(self.cache, event, payload)
+        # Calendar updates need no API call, so the streak card is rebuilt immediately
+        for username in calendar_users:
+            self.on_streak(username)
+        for username in dirty_users:
+            self.pending.put(username)
+        return True
+
+    def _work(self):
+        while True:
+            username = self.pending.get()
+            if username is None:
+                return
+            try:
+                refetch_dirty(self.client, self.cache, username)
+                self.on_languages(username)
+            except Exception as e:
+                print(f"  ✗ Webhook refresh failed for {username}: {e}")
+
+    def start(self):
+        self.thread = threading.Thread(target=self._work, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if self.thread is not None:
+            self.pending.put(None)
+            self.thread.join()
+            self.thread = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay saved webhook payloads against a stats cache snapshot")
+    parser.add_argument("payloads", nargs="+", help='saved deliveries: {"event": ..., "payload": ...}')
+    parser.add_argument("--snapshot", default="stats-cache.snapshot", help="cache snapshot to update")
+    parser.add_argument("--output-dir", help="also write the affected users' cards to <output-dir>/<username>/")
+    args = parser.parse_args()
+
+    cache = StatsCache()
+    try:
+        cache.restore(args.snapshot)
+    except (OSError, SnapshotError) as e:
+        print(f"Error: cannot read snapshot {args.snapshot}: {e}")
+        sys.exit(1)
+
+    calendar_users = set()
+    dirty_users = set()
+    for path in args.payloads:
+        event, payload, delivery_id = load_payload_file(path)
+        if event not in EVENTS:
+            print(f"  ⊘ Ignored {event} event: {path}")
+            continue
+        # Deliveries applied by an earlier run are recorded in the snapshot
+        if cache.seen_delivery(delivery_id):
+            print(f"  ⊘ Skipped redelivery {delivery_id}: {path}")
+            continue
+        calendar, dirty = apply_event(cache, event, payload)
+        calendar_users |= calendar
+        dirty_users |= dirty
+        print(f"  ✓ Applied {event} event: {path}")
+
+    # Dirty repositories stay flagged in the snapshot when there is no token to refetch them
+    token = os.environ.get("GH_PAT") or os.environ.get("GITHUB_TOKEN")
+    if dirty_users and token:
+        client = GitHubClient({"Authorization": f"Bearer {token}", "Accept": "application/vnd.github.v3+json"})
+        for username in sorted(dirty_users):
+            refetch_dirty(client, cache, username)
+    elif dirty_users:
+        print(f"No GitHub token found; {len(dirty_users)} users keep dirty repositories for the next refresh")
+
+    cards = {"streak-stats.svg": (calendar_users, render_streak)}
+    if token:
+        cards["languages-stats.svg"] = (dirty_users, render_languages)
+    for name, (usernames, render) in cards.items():
+        for username in usernames:
+            svg = render(cache, username)
+            cache.put_card(username, name, svg)
+            if args.output_dir:
+                os.makedirs(os.path.join(args.output_dir, username), exist_ok=True)
+                with open(os.path.join(args.output_dir, username, name), "wb") as f:
+                    f.write(svg)
+
+    cache.snapshot(args.snapshot)
+    print(f"Updated {len(calendar_users)} calendars, {len(dirty_users)} users with changed repositories")
+
+if __name__ == "__main__":
+    main()
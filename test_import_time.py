@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Import-time budget of the generators
+Runs each generator under `python -X importtime`, for --help and for a run from
+local git data. Neither may load the HTTP stack, and --help must stay within the
+budget of import time and wall time on top of a bare interpreter.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS = os.path.join(ROOT, "scripts")
+BUDGET_MS = 50  # Import time added to interpreter startup
+WALL_BUDGET_MS = 100  # Wall time of a no-op run on top of a bare interpreter
+# Never needed by runs that only read local data
+HTTP_STACK = ("requests", "urllib3", "http.client", "ssl")
+# Nor by --help, which renders and scans nothing
+HELP_FORBIDDEN = HTTP_STACK + ("xml.etree.ElementTree", "sqlite3", "pstats", "multiprocessing")
+
+
+def imported_modules(args, env=None, cwd=None):
+    """Return {module: self microseconds} and wall seconds of `python -X importtime args`"""
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        env=env, cwd=cwd, capture_output=True, text=True
+    )
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        raise Exception(f"{' '.join(args)} failed: {result.stdout[-500:]}{result.stderr[-500:]}")
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(self_us)
+    return modules, elapsed
+
+
+def check(label, args, baseline, baseline_wall, forbidden, env=None, cwd=None, budget=True):
+    modules, elapsed = imported_modules(args, env, cwd)
+    added = {name: us for name, us in modules.items() if name not in baseline}
+    import_ms = sum(added.values()) / 1000
+    wall_ms = (elapsed - baseline_wall) * 1000
+    loaded = [name for name in forbidden if name in modules]
+    failures = []
+    if loaded:
+        failures.append(f"loads {', '.join(loaded)}")
+    if budget and import_ms > BUDGET_MS:
+        slowest = sorted(added.items(), key=lambda item: item[1], reverse=True)[:5]
+        failures.append(f"imports take {import_ms:.1f} ms (> {BUDGET_MS} ms; slowest: {slowest})")
+    if budget and wall_ms > WALL_BUDGET_MS:
+        failures.append(f"runs {wall_ms:.0f} ms longer than a bare interpreter (> {WALL_BUDGET_MS} ms)")
+    status = "✗" if failures else "✓"
+    print(f"{status} {label}: {import_ms:.1f} ms of imports, +{wall_ms:.0f} ms wall{': ' + '; '.join(failures) if failures else ''}")
+    return not failures
+
+
+def run_checks():
+    """Run every check and return True when all of them pass"""
+    baseline, baseline_wall = imported_modules(["-c", "pass"])
+    ok = True
+    for script in ("generate_streak_stats.py", "generate_languages_stats.py"):
+        ok &= check(f"{script} --help", [os.path.join(SCRIPTS, script), "--help"], baseline, baseline_wall, HELP_FORBIDDEN)
+
+    # Runs from local clones do real work (git, process pools) but never load the HTTP stack
+    with tempfile.TemporaryDirectory() as workdir:
+        env = dict(os.environ, LOCAL_REPOS=ROOT, PLANNER_STATS="", LOCAL_LANGUAGES_CACHE="")
+        env.pop("STATE_FILE", None)
+        ok &= check(
+            "generate_streak_stats.py from local history",
+            [os.path.join(SCRIPTS, "generate_streak_stats.py")],
+            baseline, baseline_wall, HTTP_STACK, dict(env, CALENDAR_SOURCE="local", GIT_AUTHORS="."), workdir, budget=False
+        )
+        ok &= check(
+            "generate_languages_stats.py from local checkouts",
+            [os.path.join(SCRIPTS, "generate_languages_stats.py")],
+            baseline, baseline_wall, HTTP_STACK, env, workdir, budget=False
+        )
+    return ok
+
+
+if __name__ == "__main__":
+    if not run_checks():
+        sys.exit(1)
+    print("✓ Import-time budget met")
@@ -1,6 +1,13 @@
 #!/usr/bin/env python3
+import os
+import tempfile
 import xml.etree.ElementTree as ET
 
+if __name__ != "__main__":
+    # A manual script, not a pytest module: importing it would render and write a preview card
+    import pytest
+    pytest.skip("manual script, run it with python directly", allow_module_level=True)
+
 # Test data (matching the image)
 languages_data = [
     ("Python", 90.61),
@@ -122,10 +129,11 @@ for idx, (lang, percentage) in enumerate(languages_data):
 # Save SVG
 tree = ET.ElementTree(svg)
 ET.indent(tree, space="  ")
-tree.write("test-languages-stats.svg", encoding="utf-8", xml_declaration=True)
-tree.write("languages-stats.svg", encoding="utf-8", xml_declaration=True)
+# Written outside the repository, so previews never overwrite the tracked cards
+output_path = os.path.join(tempfile.gettempdir(), "test-languages-stats.svg")
+tree.write(output_path, encoding="utf-8", xml_declaration=True)
 
-print("Generated test-languages-stats.svg and languages-stats.svg")
+print(f"Generated {output_path}")
 for lang, pct in languages_data:
     print(f"  {lang}: {pct:.2f}%")
 
@@ -1,7 +1,14 @@
 #!/usr/bin/env python3
+import os
+import tempfile
 from datetime import datetime, timedelta
 import xml.etree.ElementTree as ET
 
+if __name__ != "__main__":
+    # A manual script, not a pytest module: importing it would render and write a preview card
+    import pytest
+    pytest.skip("manual script, run it with python directly", allow_module_level=True)
+
 # Test values
 current_streak = 14
 longest_streak = 19
@@ -226,9 +233,11 @@ longest_date.text = longest_streak_date_str
 # Save SVG
 tree = ET.ElementTree(svg)
 ET.indent(tree, space="  ")
-tree.write("test-streak-stats.svg", encoding="utf-8", xml_declaration=True)
+# Written outside the repository, so previews never overwrite the tracked cards
+output_path = os.path.join(tempfile.gettempdir(), "test-streak-stats.svg")
+tree.write(output_path, encoding="utf-8", xml_declaration=True)
 
-print("Generated test-streak-stats.svg")
+print(f"Generated {output_path}")
 print(f"Current Streak: {current_streak}")
 print(f"Longest Streak: {longest_streak}")
 print(f"Total Contributions: {total_contributions:,}")
@@ -0,0 +1,37 @@
+"""Recording and replaying API exchanges"""
+import pytest
+
+from github_api import Cassette, CassetteMiss
+
+
+class RecordedResponse:
+    status_code = 200
+    headers = {"Content-Type": "application/json"}
+
+    def __init__(self, body):
+        self.content = body.encode("utf-8")
+
+
+def calendar_request(username, day):
+    return {"json": {"query": "query($username: String!, $from: DateTime!) { ... }", "variables": {"username": username, "from": day}}}
+
+
+@pytest.fixture
+def cassette_path(tmp_path):
+    path = str(tmp_path / "run.cassette.json.gz")
+    cassette = Cassette(path, "record", secrets=["token"])
+    cassette.record("POST", "/graphql", calendar_request("alice", "2026-01-01T00:00:00Z"), RecordedResponse('{"user": "alice"}'))
+    cassette.save()
+    return path
+
+
+def test_replay_matches_a_moved_date_window(cassette_path):
+    cassette = Cassette(cassette_path, "replay")
+    response = cassette.replay("POST", "/graphql", calendar_request("alice", "2026-02-01T00:00:00Z"))
+    assert response.json() == {"user": "alice"}
+
+
+def test_replay_under_another_user_misses(cassette_path):
+    cassette = Cassette(cassette_path, "replay")
+    with pytest.raises(CassetteMiss):
+        cassette.replay("POST", "/graphql", calendar_request("bob", "2026-01-01T00:00:00Z"))
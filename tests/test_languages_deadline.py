@@ -0,0 +1,76 @@
+"""Language totals of runs cut short by the deadline"""
+from github_api import Deadline, DeadlineExceeded
+import languages_stats
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200):
+        self.payload = payload
+        self.status_code = status_code
+        self.headers = {}
+
+    def json(self):
+        return self.payload
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise Exception(f"HTTP {self.status_code}")
+
+
+class ExpiringClient:
+    """Answers `allowed` requests, then behaves like a client whose deadline passed"""
+
+    def __init__(self, allowed, get=None, post=None):
+        self.allowed = allowed
+        self.deadline = Deadline(60)
+        self.answer_get = get
+        self.answer_post = post
+
+    def _spend(self):
+        if self.allowed == 0:
+            self.deadline.partial = True
+            raise DeadlineExceeded("deadline reached")
+        self.allowed -= 1
+
+    def get(self, url, headers=None):
+        self._spend()
+        return self.answer_get(url)
+
+    def post(self, url, json=None):
+        self._spend()
+        return self.answer_post(json)
+
+
+def test_partial_run_counts_only_fetched_repositories():
+    def answer(url):
+        if "/users/alice/repos" in url:
+            return FakeResponse([{"full_name": f"alice/repo-{i}", "fork": False, "size": 10 - i} for i in range(3)])
+        return FakeResponse({"Python": 100})
+
+    # The repository list and one repository's languages come back in time
+    client = ExpiringClient(2, get=answer)
+    languages_data, processed_repos = languages_stats.fetch_languages(client, "alice")
+
+    assert client.deadline.partial
+    assert dict(languages_data) == {"Python": 100}
+    assert processed_repos == {"alice/repo-0"}
+
+
+def test_org_languages_stop_at_the_deadline_and_keep_the_checkpoint(tmp_path):
+    def answer(body):
+        cursor = body["variables"]["cursor"]
+        page = int(cursor or 0)
+        return FakeResponse({"data": {"organization": {"repositories": {
+            "nodes": [{"languages": {"edges": [{"size": 10, "node": {"name": "Go"}}]}}],
+            "pageInfo": {"hasNextPage": True, "endCursor": str(page + 1)}
+        }}}})
+
+    checkpoint = tmp_path / "org.checkpoint.json"
+    client = ExpiringClient(2, post=answer)
+    languages_data, repo_count = languages_stats.fetch_org_languages(client, "acme", str(checkpoint))
+
+    assert client.deadline.partial
+    assert repo_count == 2
+    assert dict(languages_data) == {"Go": 20}
+    # The next run resumes after the pages already counted
+    assert checkpoint.exists()
@@ -0,0 +1,51 @@
+"""Background refresh scheduling, backoff and eviction"""
+import time
+
+import refresh_scheduler
+from refresh_scheduler import RefreshScheduler, UnknownUser
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.02)
+    return True
+
+
+def test_idle_scheduler_still_sweeps(monkeypatch):
+    monkeypatch.setattr(refresh_scheduler, "EVICTION_SWEEP_INTERVAL", 0.1)
+
+    def refresh(username):
+        raise UnknownUser(username)
+
+    evicted = []
+    scheduler = RefreshScheduler(refresh, workers=1, unknown_ttl=0.2, on_evict=evicted.append)
+    scheduler.start()
+    try:
+        scheduler.record_request("ghost")
+        assert wait_for(lambda: scheduler.is_unknown("ghost"))
+        # Nothing is queued any more, yet the expired negative result is swept
+        assert wait_for(lambda: evicted == ["ghost"])
+    finally:
+        scheduler.stop()
+    assert "ghost" not in scheduler.states
+
+
+def test_failures_back_off_exponentially():
+    calls = []
+
+    def refresh(username):
+        calls.append(time.monotonic())
+        raise Exception("boom")
+
+    scheduler = RefreshScheduler(refresh, workers=1, min_interval=0.05, max_interval=10)
+    scheduler.start()
+    try:
+        scheduler.record_request("flaky")
+        assert wait_for(lambda: len(calls) >= 4)
+    finally:
+        scheduler.stop()
+    gaps = [later - earlier for earlier, later in zip(calls, calls[1:])]
+    assert gaps[1] > gaps[0] * 1.5 and gaps[2] > gaps[1] * 1.5
@@ -0,0 +1,24 @@
+"""The streak and merge engines against the frozen copy of the original generator"""
+import streak_stats
+import streak_diff
+
+ENGINES = ("streak_stats:compute_streaks", "local_calendar:merge_calendars")
+
+
+def off_by_one_streaks(calendar, today):
+    stats = streak_stats.compute_streaks(calendar, today)
+    if stats["longest_streak"] > 3:
+        stats["longest_streak"] -= 1
+    return stats
+
+
+def test_engines_match_the_original_generator():
+    result = streak_diff.run_chunk(("tests", 0, 2000, *ENGINES))
+    assert result["cases"] == 2000
+    assert result["streak_mismatches"] == []
+    assert result["merge_mismatches"] == []
+
+
+def test_a_wrong_engine_is_caught():
+    result = streak_diff.run_chunk(("tests", 0, 500, "test_streak_diff:off_by_one_streaks", ENGINES[1]))
+    assert result["streak_mismatch_count"] > 0
@@ -0,0 +1,111 @@
+"""Refreshing a stored calendar through the events feed"""
+from datetime import date, datetime, timedelta
+
+import activity_check
+from github_api import Deadline, DeadlineExceeded
+from stats_cache import StatsCache
+import streak_stats
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200, headers=None):
+        self.payload = payload
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def json(self):
+        return self.payload
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise Exception(f"HTTP {self.status_code}")
+
+
+class CalendarClient:
+    """Serves the events feed and the first `years` yearly calendar windows, then runs out of time"""
+
+    def __init__(self, events, counts, years):
+        self.events = events
+        self.counts = counts
+        self.years = years
+        self.posts = 0
+        self.deadline = Deadline(60)
+
+    def get(self, url, headers=None):
+        return FakeResponse(self.events, headers={"ETag": '"feed"'})
+
+    def post(self, url, json=None):
+        if self.posts >= self.years:
+            self.deadline.partial = True
+            raise DeadlineExceeded("deadline reached")
+        self.posts += 1
+        variables = json["variables"]
+        start = datetime.fromisoformat(variables["from"].rstrip("Z")).date()
+        end = datetime.fromisoformat(variables["to"].rstrip("Z")).date()
+        days = [
+            {"date": day.isoformat(), "contributionCount": count}
+            for day, count in self.counts.items() if start <= day <= end
+        ]
+        calendar = {"totalContributions": sum(d["contributionCount"] for d in days), "weeks": [{"contributionDays": days}]}
+        return FakeResponse({"data": {"user": {"contributionsCollection": {"contributionCalendar": calendar}}}})
+
+
+def feed(count, start_id=1000):
+    now = datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ")
+    return [
+        {"id": str(start_id + count - i), "type": "WatchEvent", "repo": {"name": "x/y"}, "created_at": now}
+        for i in range(count)
+    ]
+
+
+def test_deadline_mid_calendar_keeps_stored_older_years():
+    today = date.today()
+    recent, old = today - timedelta(days=10), today - timedelta(days=3 * 365)
+    state = StatsCache()
+    state.put_calendar("alice", {recent: 1, old: 7})
+    # A first run has no feed position, so the whole calendar is refetched
+    client = CalendarClient(feed(3), {recent: 4, old: 9}, years=1)
+
+    calendar = streak_stats.refresh_contribution_calendar(client, "alice", state)
+
+    assert client.deadline.partial
+    # The year fetched in time wins, older years keep their stored counts
+    assert calendar[recent] == 4
+    assert calendar[old] == 7
+    assert state.get_calendar("alice") == calendar
+    # The feed position is not committed, so the next run backfills
+    assert state.get_events_state("alice", "streak") is None
+
+
+def test_deadline_before_any_year_raises():
+    state = StatsCache()
+    state.put_calendar("alice", {date.today(): 1})
+    client = CalendarClient(feed(3), {}, years=0)
+    try:
+        streak_stats.refresh_contribution_calendar(client, "alice", state)
+    except DeadlineExceeded:
+        pass
+    else:
+        raise AssertionError("expected DeadlineExceeded")
+    assert state.get_calendar("alice") == {date.today(): 1}
+
+
+def test_stored_calendar_is_refetched_once_too_old():
+    today = date.today()
+    state = StatsCache()
+    events = feed(3)
+    client = CalendarClient(events, {today: 2}, years=15)
+    streak_stats.refresh_contribution_calendar(client, "alice", state)
+    first_posts = client.posts
+
+    # Nothing new in the feed: the stored calendar is reused without any query
+    client.counts = {today: 5}
+    assert streak_stats.refresh_contribution_calendar(client, "alice", state)[today] == 2
+    assert client.posts == first_posts
+
+    # Private contributions never show up in the public feed, so old data is refetched in full
+    feed_state = state.get_events_state("alice", "streak")
+    state.put_events_state("alice", "streak", dict(feed_state, full_refresh_at=feed_state["full_refresh_at"] - activity_check.MAX_STATE_AGE))
+    assert streak_stats.refresh_contribution_calendar(client, "alice", state)[today] == 5
+    assert client.posts > first_posts
+    assert state.get_events_state("alice", "streak")["full_refresh_at"] > feed_state["full_refresh_at"]